@@ -0,0 +1,122 @@
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup, Tag
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modarchive_page import ModArchivePage
+
+FIXTURE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tests",
+    "fixtures",
+    "modarchive",
+)
+
+
+def extract_with_soup(content: bytes) -> Dict[str, Any]:
+    # Full tree parsing as WebHelper used to do it, kept as the reference
+    soup = BeautifulSoup(content, "html.parser")
+
+    link = soup.find("a", href=True, string=True, class_="standard-link")
+    first_link = soup.find("a", class_="standard-link", href=True)
+    heading = soup.find("h1", class_="site-wide-page-head-title", string="Search Results")
+    pagination = soup.find("select", class_="pagination")
+    textarea = soup.find("textarea")
+
+    options: List[str] = []
+    if isinstance(pagination, Tag):
+        options = [option.text for option in pagination.find_all("option")]
+
+    ids: List[int] = []
+    for download_link in soup.find_all("a", title="Download"):
+        id_str = download_link["href"].split("=")[-1].split("#")[0]
+        if id_str.isdigit():
+            ids.append(int(id_str))
+
+    return {
+        "standard_link_with_text": link["href"] if isinstance(link, Tag) else None,
+        "standard_link": first_link["href"] if isinstance(first_link, Tag) else None,
+        "has_search_results": heading is not None,
+        "has_pagination": pagination is not None,
+        "last_page": int(options[-1]) if options else 1,
+        "download_link_ids": ids,
+        "textarea_text": textarea.text if textarea is not None else None,
+    }
+
+
+def extract_with_scanner(content: bytes) -> Dict[str, Any]:
+    page = ModArchivePage.parse(content)
+
+    return {
+        "standard_link_with_text": page.standard_link_with_text,
+        "standard_link": page.standard_link,
+        "has_search_results": page.has_search_results,
+        "has_pagination": page.has_pagination,
+        "last_page": page.get_last_page(),
+        "download_link_ids": page.get_download_link_ids(),
+        "textarea_text": page.textarea_text,
+    }
+
+
+def get_fixtures(fixture_dir: str) -> Dict[str, bytes]:
+    fixtures: Dict[str, bytes] = {}
+
+    for filename in sorted(os.listdir(fixture_dir)):
+        if filename.endswith(".html"):
+            with open(os.path.join(fixture_dir, filename), "rb") as f:
+                fixtures[filename] = f.read()
+    return fixtures
+
+
+def measure(function: Callable[[bytes], Any], content: bytes, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function(content)
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare ModArchive page extraction against full BeautifulSoup parsing."
+    )
+    parser.add_argument("-n", "--rounds", type=int, default=50)
+    parser.add_argument("-d", "--fixtures", default=FIXTURE_DIR)
+    args = parser.parse_args()
+
+    fixtures = get_fixtures(args.fixtures)
+    mismatches: List[str] = []
+    total_soup = 0.0
+    total_scanner = 0.0
+
+    print(f"{'page':<28}{'size':>8}{'soup ms':>10}{'scan ms':>10}{'speedup':>9}")
+
+    for filename, content in fixtures.items():
+        if extract_with_soup(content) != extract_with_scanner(content):
+            mismatches.append(filename)
+
+        soup_time = measure(extract_with_soup, content, args.rounds)
+        scanner_time = measure(extract_with_scanner, content, args.rounds)
+        total_soup += soup_time
+        total_scanner += scanner_time
+
+        print(
+            f"{filename:<28}{len(content) // 1024:>6}KB{soup_time * 1000:>10.2f}"
+            f"{scanner_time * 1000:>10.2f}{soup_time / scanner_time:>8.1f}x"
+        )
+
+    print(
+        f"{'total':<28}{'':>8}{total_soup * 1000:>10.2f}{total_scanner * 1000:>10.2f}"
+        f"{total_soup / total_scanner:>8.1f}x"
+    )
+
+    if mismatches:
+        sys.exit(f"Results differ from BeautifulSoup for: {', '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
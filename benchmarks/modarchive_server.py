@@ -0,0 +1,251 @@
+import argparse
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "tests", "fixtures", "modarchive")
+MODULE_FILE = os.path.join(ROOT_DIR, "tests", "knallhatten.mod")
+
+# Module ID linked from the recorded random page, replaced by a random one on every request
+RANDOM_PAGE_MODULE_ID = "187345"
+
+
+class ModArchiveRequestHandler(BaseHTTPRequestHandler):
+    server: "StubHTTPServer"
+
+    def do_GET(self) -> None:
+        self.handle_request(True)
+
+    def do_HEAD(self) -> None:
+        self.handle_request(False)
+
+    def handle_request(self, send_body: bool) -> None:
+        stub = self.server.stub
+        stub.count_request()
+
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        if stub.should_fail():
+            self.send_error(503, "Injected error")
+            return
+
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        if parsed.path == "/downloads.php":
+            self.send_module(query.get("moduleid", ""), send_body)
+        elif parsed.path == "/index.php":
+            page = stub.get_page(query)
+            if page is None:
+                self.send_error(404)
+            else:
+                self.send_body(page, "text/html; charset=utf-8", send_body)
+        elif parsed.path == "/module.php" and "sha1" in query:
+            self.send_body(b"<html><body>Module found</body></html>", "text/html", send_body)
+        else:
+            self.send_error(404)
+
+    def send_module(self, module_id: str, send_body: bool) -> None:
+        if not module_id.isdigit():
+            self.send_error(404)
+            return
+
+        data, filename = self.server.stub.get_module(int(module_id))
+        start = 0
+
+        # Honour simple "bytes=<start>-" ranges, enough for resuming downloads
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.end_headers()
+                return
+
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Disposition", f"attachment; filename={filename}")
+        self.send_header("Content-Length", str(len(data) - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+
+        if send_body:
+            self.write_throttled(data[start:], self.server.stub.should_drop())
+
+    def send_body(self, body: bytes, content_type: str, send_body: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if send_body:
+            self.write_throttled(body, False)
+
+    def write_throttled(self, data: bytes, drop: bool) -> None:
+        stub = self.server.stub
+        chunk_size = 16 * 1024
+        end = len(data) // 2 if drop else len(data)
+
+        for offset in range(0, end, chunk_size):
+            chunk = data[offset : min(offset + chunk_size, end)]
+            self.wfile.write(chunk)
+
+            if stub.bandwidth:
+                time.sleep(len(chunk) / stub.bandwidth)
+
+        if drop:
+            # Cut the connection half way through to exercise resuming
+            self.close_connection = True
+            self.wfile.flush()
+            self.connection.shutdown(2)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.trace(f"Stand-in server: {format % args}")
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "ModArchiveStubServer"
+
+
+class ModArchiveStubServer:
+    def __init__(
+        self,
+        fixture_dir: str = FIXTURE_DIR,
+        module_files: Optional[List[str]] = None,
+        latency: float = 0.0,
+        bandwidth: float = 0.0,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        # Latency in seconds per request, bandwidth in bytes per second (0 is unlimited)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+
+        self.pages: Dict[str, bytes] = {}
+        for filename in os.listdir(fixture_dir):
+            if filename.endswith(".html"):
+                with open(os.path.join(fixture_dir, filename), "rb") as f:
+                    self.pages[filename[:-5]] = f.read()
+
+        self.modules: List[Tuple[bytes, str]] = []
+        for module_file in module_files or [MODULE_FILE]:
+            with open(module_file, "rb") as f:
+                self.modules.append((f.read(), os.path.basename(module_file)))
+
+        self.server = StubHTTPServer((host, port), ModArchiveRequestHandler)
+        self.server.stub = self
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="modarchive-stub", daemon=True
+        )
+        self.thread.start()
+        logger.info(f"ModArchive stand-in server running at {self.url}")
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def count_request(self) -> None:
+        with self.lock:
+            self.request_count += 1
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def should_drop(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.drop_rate
+
+    def get_page(self, query: Dict[str, str]) -> Optional[bytes]:
+        request = query.get("request")
+
+        if request == "view_player":
+            with self.lock:
+                module_id = str(self.random.randint(1, 200000))
+            return self.pages["random"].replace(
+                RANDOM_PAGE_MODULE_ID.encode(), module_id.encode()
+            )
+        elif request == "view_member_favourites_text":
+            return self.pages["favourites"]
+        elif request == "search":
+            if query.get("search_type") == "guessed_artist":
+                page = query.get("page", "1")
+                return self.pages["search_page_2" if page == "2" else "search"]
+            return self.pages["search_single_page"]
+        return None
+
+    def get_module(self, module_id: int) -> Tuple[bytes, str]:
+        data, filename = self.modules[module_id % len(self.modules)]
+        extension = filename.rsplit(".", 1)[-1]
+        return data, f"{module_id}.{extension}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve recorded Mod Archive responses locally for offline tests and benchmarks."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument(
+        "--bandwidth", type=float, default=0.0, help="Bytes per second, 0 is unlimited"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--module", action="append", help="Module file to serve, can be repeated"
+    )
+    args = parser.parse_args()
+
+    server = ModArchiveStubServer(
+        module_files=args.module,
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Run the player with MODARCHIVE_BASE_URL={server.url}")
+
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
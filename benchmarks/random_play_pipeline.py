@@ -0,0 +1,139 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.modarchive_server import ModArchiveStubServer
+from http_session import HttpSession
+from loaders.modarchive_downloader import ModArchiveDownloader
+from loaders.modarchive_random_module_fetcher import ModArchiveRandomModuleFetcher
+from network_engine import CancellationToken
+from player_backends.Song import Song
+from playing_modes import ModArchiveSource, PlayingMode, PlayingSource
+from web_helper import WebHelper
+
+SOURCES = {
+    "all": ModArchiveSource.ALL,
+    "favorites": ModArchiveSource.FAVORITES,
+    "artist": ModArchiveSource.ARTIST,
+}
+
+
+def fetch_and_download(
+    web_helper: WebHelper, source: ModArchiveSource, temp_dir: str
+) -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    song = Song()
+
+    started = time.perf_counter()
+    ModArchiveRandomModuleFetcher(
+        song,
+        PlayingMode.RANDOM,
+        PlayingSource.MODARCHIVE,
+        source,
+        web_helper,
+        "purple motion",
+        1,
+    ).fetch_random_module_id()
+    timings["fetch"] = time.perf_counter() - started
+
+    if not song.modarchive_id:
+        raise RuntimeError("No module ID fetched")
+
+    started = time.perf_counter()
+    ModArchiveDownloader(web_helper, song, temp_dir).load_module(CancellationToken())
+    timings["download"] = time.perf_counter() - started
+    timings["total"] = timings["fetch"] + timings["download"]
+    return timings
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark fetching and downloading random modules against the offline stand-in server."
+    )
+    parser.add_argument("-n", "--count", type=int, default=20)
+    parser.add_argument(
+        "-d", "--depth", type=int, default=3, help="Modules fetched in parallel"
+    )
+    parser.add_argument("-s", "--source", choices=SOURCES.keys(), default="all")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--bandwidth", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--base-url", help="Use an already running server instead of starting one"
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    server: Optional[ModArchiveStubServer] = None
+    base_url = args.base_url
+
+    if not base_url:
+        server = ModArchiveStubServer(
+            latency=args.latency,
+            bandwidth=args.bandwidth,
+            error_rate=args.error_rate,
+            drop_rate=args.drop_rate,
+        )
+        server.start()
+        base_url = server.url
+
+    web_helper = WebHelper(HttpSession(min_request_interval=0), base_url)
+    results: List[Dict[str, float]] = []
+    failures = 0
+
+    started = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with ThreadPoolExecutor(args.depth) as executor:
+            futures = [
+                executor.submit(
+                    fetch_and_download, web_helper, SOURCES[args.source], temp_dir
+                )
+                for _ in range(args.count)
+            ]
+
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.warning(f"Module failed: {e}")
+                    failures += 1
+
+    elapsed = time.perf_counter() - started
+
+    if server:
+        server.stop()
+
+    print(f"{len(results)} modules in {elapsed:.2f} s, {failures} failed")
+    print(f"{len(results) / elapsed:.1f} modules/s with {args.depth} in parallel")
+
+    if results:
+        print(f"{'stage':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for stage in ("fetch", "download", "total"):
+            values = [result[stage] for result in results]
+            print(
+                f"{stage:<10}{statistics.mean(values) * 1000:>10.1f}"
+                f"{percentile(values, 0.5) * 1000:>10.1f}"
+                f"{percentile(values, 0.95) * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_backends.Song import Song
+from player_backends.song_detail_store import SongDetailStore, set_song_detail_store
+from playlist.playlist import Playlist
+
+
+@dataclass
+class LegacySong:
+    # Song as it was before heavy fields moved to the detail store, kept as the reference
+    uid: str = field(default_factory=lambda: str(uuid.uuid4()))
+    filename: str = ""
+    backend_name: str = ""
+    modarchive_id: int = 0
+    is_ready: bool = False
+    artist: str = ""
+    duration: int = 0
+    container: str = ""
+    container_long: str = ""
+    date: str = ""
+    extensions: str = ""
+    formatname: str = ""
+    message: str = ""
+    message_raw: str = ""
+    md5: str = ""
+    modulebytes: int = 0
+    originaltype: str = ""
+    originaltype_long: str = ""
+    playername: str = ""
+    playerfname: str = ""
+    sha1: str = ""
+    subsongs: int = 0
+    title: str = ""
+    tracker: str = ""
+    type: str = ""
+    type_long: str = ""
+    warnings: str = ""
+    credits: Dict[str, Any] = field(default_factory=dict)
+
+
+def fill_song(song: Any, index: int) -> Any:
+    # Roughly what a probed Protracker module carries
+    instruments = [
+        {
+            "index": i + 1,
+            "name": f"sample {index % 1000:03} {i:02}".ljust(22),
+            "size": 4096 + i,
+            "vol": 64,
+            "fine": 0,
+            "lstart": 0,
+            "lsize": 2,
+        }
+        for i in range(31)
+    ]
+    message = "\n".join(instrument["name"] for instrument in instruments)
+
+    song.filename = f"/music/mods/artist_{index % 500}/module_{index}.mod"
+    song.backend_name = "LibUADE"
+    song.is_ready = True
+    song.artist = f"Artist {index % 500}"
+    song.duration = 180 + index % 120
+    song.extensions = "mod"
+    song.formatname = "Protracker"
+    song.message = message
+    song.md5 = f"{index:032x}"
+    song.modulebytes = 100000 + index
+    song.playername = "PTK-Prowiz"
+    song.playerfname = "PTK-Prowiz"
+    song.sha1 = f"{index:040x}"
+    song.subsongs = 1
+    song.title = f"Module {index}"
+    song.type = "Protracker"
+    song.message_raw = message
+    song.warnings = ""
+    song.credits = {
+        "song_title": f"Module {index}",
+        "artistname": "",
+        "file_length": f"{100000 + index} bytes",
+        "file_name": os.path.basename(song.filename),
+        "file_prefix": "MOD.*",
+        "max_positions": 64,
+        "modulename": "",
+        "specialinfo": "",
+        "instruments": instruments,
+    }
+    return song
+
+
+def measure(
+    count: int, create: Callable[[int], Any], keep: Callable[[List[Any]], Any]
+) -> int:
+    gc.collect()
+    tracemalloc.start()
+    songs = [fill_song(create(index), index) for index in range(count)]
+    kept = keep(songs)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del kept, songs
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure memory per song of a large library with heavy fields in memory and in the detail store."
+    )
+    parser.add_argument("-n", "--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    results: Dict[str, int] = {}
+    results["legacy dataclass"] = measure(args.count, lambda index: LegacySong(), list)
+    results["slotted, in memory"] = measure(args.count, lambda index: Song(), list)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = SongDetailStore(os.path.join(temp_dir, "song_details.db"))
+        set_song_detail_store(store)
+
+        # Songs in a playlist have their details moved out to the store
+        results["slotted, in playlist"] = measure(
+            args.count, lambda index: Song(), lambda songs: Playlist("Library", songs)
+        )
+        store.flush()
+        store_size = os.path.getsize(os.path.join(temp_dir, "song_details.db"))
+
+        set_song_detail_store(None)
+        store.close()
+
+    print(f"{args.count} songs")
+    print(f"{'representation':<24}{'total MB':>10}{'bytes/song':>12}")
+    for name, size in results.items():
+        print(f"{name:<24}{size / 1024 ** 2:>10.1f}{size / args.count:>12.0f}")
+    print(f"detail store on disk: {store_size / 1024 ** 2:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_backends.audio_backend import AudioBackend
+from benchmarks.modarchive_server import MODULE_FILE
+from benchmarks.random_play_pipeline import percentile
+from latency_metrics import get_latency_metrics
+from loaders.abstract_loader import AbstractLoader
+from player_backends.libgme.player_backend_libgme import PlayerBackendLibGME
+from player_backends.libopenmpt.player_backend_libopenmpt import PlayerBackendLibOpenMPT
+from player_backends.libuade.player_backend_libuade import PlayerBackendLibUADE
+from player_backends.player_backend import PlayerBackend
+from player_backends.Song import Song
+from player_thread import PlayerThread
+
+PLAYER_BACKENDS: Dict[str, type[PlayerBackend]] = {
+    "LibUADE": PlayerBackendLibUADE,
+    "LibOpenMPT": PlayerBackendLibOpenMPT,
+    "LibGME": PlayerBackendLibGME,
+}
+
+
+class NullAudioBackend(AudioBackend):
+    # Blocks for as long as a sound card would take to play each chunk
+    def __init__(self, samplerate: int, buffersize: int, realtime: bool) -> None:
+        super().__init__(samplerate, buffersize)
+        self.realtime = realtime
+
+    def write(self, data: bytes) -> None:
+        if self.realtime:
+            time.sleep(len(data) / 4 / self.samplerate)
+
+    def stop(self) -> None:
+        pass
+
+    def get_buffer(self) -> bytes:
+        return bytes(self.buffersize * 4)
+
+
+def load_song(filename: str) -> Song:
+    # A cached module has been downloaded and probed before it is played
+    song = Song()
+    song.filename = filename
+
+    loaded_song = AbstractLoader(PLAYER_BACKENDS).update_song_info(song)
+    if not loaded_song:
+        raise RuntimeError(f"No player backend can play {filename}")
+    return loaded_song
+
+
+def play_songs(
+    songs: List[Song], count: int, audio_backend: AudioBackend
+) -> Dict[str, List[float]]:
+    timings: Dict[str, List[float]] = {"blocked": [], "first_audio": []}
+    player_thread: Optional[PlayerThread] = None
+
+    for i in range(count):
+        song = songs[i % len(songs)]
+
+        # The part of play_module that runs on the GUI thread, while the previous song is still playing
+        started = time.perf_counter()
+        if player_thread:
+            player_thread.stop()
+        player_thread = PlayerThread(
+            song,
+            PLAYER_BACKENDS[song.backend_name],
+            audio_backend,
+            lambda: audio_backend,
+            player_thread,
+        )
+        player_thread.start()
+        timings["blocked"].append(time.perf_counter() - started)
+
+        while player_thread.time_to_first_audio is None and player_thread.isRunning():
+            time.sleep(0.001)
+
+        if player_thread.time_to_first_audio is None:
+            raise RuntimeError(f"{song.filename} did not start playing")
+        timings["first_audio"].append(player_thread.time_to_first_audio)
+
+        # Let the song play for a moment before skipping to the next one
+        time.sleep(0.05)
+
+    if player_thread:
+        player_thread.stop()
+        player_thread.wait()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the time from playing a cached module to its first audio chunk."
+    )
+    parser.add_argument("modules", nargs="*", default=[MODULE_FILE])
+    parser.add_argument("-n", "--count", type=int, default=50)
+    parser.add_argument(
+        "-b", "--buffer", type=int, default=8192, help="Audio buffer size"
+    )
+    parser.add_argument("--target", type=float, default=100.0, help="Target p95 in ms")
+    parser.add_argument(
+        "--no-realtime",
+        action="store_true",
+        help="Do not wait for the simulated sound card after each chunk",
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    songs = [load_song(filename) for filename in args.modules]
+    audio_backend = NullAudioBackend(44100, args.buffer, not args.no_realtime)
+    timings = play_songs(songs, args.count, audio_backend)
+
+    print(f"{args.count} plays of {len(songs)} cached modules")
+    print(f"{'stage':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for stage, values in timings.items():
+        print(
+            f"{stage:<12}{statistics.mean(values) * 1000:>10.1f}"
+            f"{percentile(values, 0.5) * 1000:>10.1f}"
+            f"{percentile(values, 0.95) * 1000:>10.1f}"
+            f"{max(values) * 1000:>10.1f}"
+        )
+
+    print()
+    print(f"{'player stage':<14}{'count':>8}{'mean ms':>10}{'p95 ms':>10}")
+    for stage, histogram in get_latency_metrics().summary().items():
+        print(
+            f"{stage:<14}{histogram['count']:>8}{histogram['average_ms']:>10.1f}"
+            f"{histogram['p95_ms']:>10.1f}"
+        )
+
+    p95 = percentile(timings["first_audio"], 0.95) * 1000
+    if p95 > args.target:
+        print(
+            f"FAIL: p95 time to first audio {p95:.1f} ms is over {args.target:.0f} ms"
+        )
+        sys.exit(1)
+    print(f"OK: p95 time to first audio {p95:.1f} ms is within {args.target:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
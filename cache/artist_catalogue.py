@@ -0,0 +1,29 @@
+import os
+from typing import List
+
+from cache.id_list_cache import IdListCache
+from network_engine import NetworkEngine
+from web_helper import WebHelper
+
+
+class ArtistCatalogue(IdListCache):
+    def __init__(
+        self,
+        web_helper: WebHelper,
+        network_engine: NetworkEngine,
+        cache_dir: str,
+        ttl: float = 7 * 24 * 3600,
+    ) -> None:
+        super().__init__(network_engine, os.path.join(cache_dir, "artists.json"), ttl)
+        self.web_helper = web_helper
+
+    @staticmethod
+    def get_key(artist: str) -> str:
+        return artist.strip().lower()
+
+    def fetch_ids(self, key: str) -> List[int]:
+        return self.web_helper.get_artist_module_id_list(key)
+
+    def get_ids(self, artist: str) -> List[int]:
+        # Crawled once in the background, afterwards picks need no network round trips
+        return self.get_list(self.get_key(artist))
@@ -0,0 +1,42 @@
+import os
+from typing import List, Optional
+
+from PySide6.QtCore import Signal
+
+from cache.id_list_cache import IdListCache
+from network_engine import NetworkEngine, Priority
+from web_helper import WebHelper
+
+
+class FavoritesCache(IdListCache):
+    favorites_updated = Signal(int)
+
+    # A single page, needed before the next favourite can be picked
+    priority = Priority.NEXT
+
+    def __init__(
+        self,
+        web_helper: WebHelper,
+        network_engine: NetworkEngine,
+        cache_dir: str,
+        ttl: float = 3600,
+    ) -> None:
+        super().__init__(network_engine, os.path.join(cache_dir, "favorites.json"), ttl)
+        self.web_helper = web_helper
+        self.ids_updated.connect(lambda key: self.favorites_updated.emit(int(key)))
+
+    def fetch_ids(self, key: str) -> List[int]:
+        return self.web_helper.get_member_module_id_list(int(key))
+
+    def is_favorite(self, member_id: int, module_id: int) -> Optional[bool]:
+        if not member_id:
+            return None
+        return self.lookup(str(member_id), module_id)
+
+    def get_ids(self, member_id: int) -> List[int]:
+        if not member_id:
+            return []
+        return self.get_list(str(member_id))
+
+    def set_favorite(self, member_id: int, module_id: int, is_favorite: bool) -> None:
+        self.update_membership(str(member_id), module_id, is_favorite)
@@ -0,0 +1,121 @@
+import time
+from abc import abstractmethod
+from typing import Dict, List, Optional, Set
+
+from loguru import logger
+from PySide6.QtCore import QObject, Signal, Slot
+
+from cache.json_cache import load_json, save_json
+from network_engine import NetworkEngine, Priority
+
+# Failed fetches are retried after this many seconds instead of after the ttl
+RETRY_INTERVAL = 60.0
+
+
+class CachedIdList:
+    def __init__(self, ids: List[int], fetched_at: float) -> None:
+        self.ids: List[int] = ids
+        self.id_set: Set[int] = set(ids)
+        self.fetched_at = fetched_at
+
+
+class IdListCache(QObject):
+    ids_updated = Signal(str)
+
+    # Lists are fetched because of something the user did, ahead of bulk crawls
+    priority: Priority = Priority.PREFETCH
+
+    def __init__(self, network_engine: NetworkEngine, filename: str, ttl: float) -> None:
+        super().__init__()
+        self.network_engine = network_engine
+        self.filename = filename
+        self.ttl = ttl
+        self.lists: Dict[str, CachedIdList] = {}
+        self.pending_keys: Set[str] = set()
+        self.failed_at: Dict[str, float] = {}
+
+        self.load()
+
+    @abstractmethod
+    def fetch_ids(self, key: str) -> List[int]:
+        # Runs on the network engine
+        pass
+
+    def load(self) -> None:
+        data = load_json(self.filename, self.filename) or {}
+
+        for key, list_data in data.items():
+            self.lists[key] = CachedIdList(list_data["ids"], list_data["fetched_at"])
+
+    def save(self) -> None:
+        data = {
+            key: {"ids": id_list.ids, "fetched_at": id_list.fetched_at}
+            for key, id_list in self.lists.items()
+        }
+        save_json(self.filename, data)
+
+    def is_stale(self, key: str) -> bool:
+        if time.time() - self.failed_at.get(key, 0.0) < RETRY_INTERVAL:
+            return False
+
+        id_list = self.lists.get(key)
+        return id_list is None or time.time() - id_list.fetched_at > self.ttl
+
+    def refresh(self, key: str, force: bool = False) -> None:
+        if not key or key in self.pending_keys:
+            return
+
+        if force or self.is_stale(key):
+            logger.debug(f'Refreshing module ids for "{key}" in the background')
+            self.pending_keys.add(key)
+            self.network_engine.submit(
+                self.fetch_ids,
+                key,
+                priority=self.priority,
+                on_finished=lambda ids: self.on_ids_fetched(key, ids),
+                on_failed=lambda error: self.on_fetch_failed(key, error),
+            )
+
+    def on_fetch_failed(self, key: str, error: str) -> None:
+        # The previous list is kept until a fetch succeeds
+        self.pending_keys.discard(key)
+        self.failed_at[key] = time.time()
+        logger.warning(f'Could not refresh module ids for "{key}": {error}')
+
+    @Slot(str, list)
+    def on_ids_fetched(self, key: str, ids: List[int]) -> None:
+        self.pending_keys.discard(key)
+        self.failed_at.pop(key, None)
+        self.lists[key] = CachedIdList(ids, time.time())
+        self.save()
+        logger.debug(f'Cached {len(ids)} module ids for "{key}"')
+        self.ids_updated.emit(key)
+
+    def lookup(self, key: str, module_id: int) -> Optional[bool]:
+        # Never blocks, unknown until the first fetch has finished
+        self.refresh(key)
+
+        id_list = self.lists.get(key)
+        if id_list is None:
+            return None
+        return module_id in id_list.id_set
+
+    def get_list(self, key: str) -> List[int]:
+        self.refresh(key)
+
+        id_list = self.lists.get(key)
+        return id_list.ids if id_list else []
+
+    def update_membership(self, key: str, module_id: int, member: bool) -> None:
+        id_list = self.lists.get(key)
+        if id_list is None:
+            return
+
+        # Replace the list instead of mutating it, fetcher threads may hold a reference
+        if member and module_id not in id_list.id_set:
+            id_list.ids = id_list.ids + [module_id]
+            id_list.id_set.add(module_id)
+        elif not member and module_id in id_list.id_set:
+            id_list.ids = [id for id in id_list.ids if id != module_id]
+            id_list.id_set.discard(module_id)
+        self.save()
@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from loguru import logger
+
+
+def load_json(filename: str, name: str) -> Optional[Any]:
+    # None if there is nothing usable yet, a broken file only means starting empty
+    if not os.path.exists(filename):
+        return None
+
+    try:
+        with open(filename, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read {name}, starting empty: {e}")
+        return None
+
+
+def save_json(filename: str, data: Any) -> None:
+    # Written next to the file and moved over it, so a crash never leaves half a file behind
+    temp_filename = f"{filename}.tmp"
+
+    with open(temp_filename, "w") as f:
+        json.dump(data, f)
+    os.replace(temp_filename, filename)
+
+
+class JsonCache(ABC):
+    # Entries changed from several threads and written now and then, unchanged caches are not written
+    name: str = "cache"
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.dirty: bool = False
+
+        self.load()
+
+    @abstractmethod
+    def from_json(self, data: Any) -> None:
+        pass
+
+    @abstractmethod
+    def to_json(self) -> Any:
+        # Called with the lock held
+        pass
+
+    def load(self) -> None:
+        data = load_json(self.filename, self.name)
+        if data is not None:
+            self.from_json(data)
+
+    def save(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return
+
+            data = self.to_json()
+            self.dirty = False
+
+        save_json(self.filename, data)
@@ -0,0 +1,117 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional, TypedDict
+
+from loguru import logger
+from PySide6.QtCore import QObject
+
+from cache.json_cache import load_json, save_json
+from network_engine import NetworkEngine, NetworkJob, Priority
+from player_backends.Song import Song
+from web_helper import WebHelper
+
+MODARCHIVE = "modarchive"
+MSM = "msm"
+
+
+class LookupEntry(TypedDict):
+    url: str
+    time: float
+
+
+class LookupCache(QObject):
+    def __init__(
+        self,
+        web_helper: WebHelper,
+        network_engine: NetworkEngine,
+        cache_dir: str,
+        negative_ttl: float = 24 * 3600,
+    ) -> None:
+        super().__init__()
+        self.web_helper = web_helper
+        self.network_engine = network_engine
+        self.filename = os.path.join(cache_dir, "lookups.json")
+
+        # Found URLs do not change, modules that were not found may be uploaded later
+        self.negative_ttl = negative_ttl
+
+        self.entries: Dict[str, LookupEntry] = {}
+        self.pending: Dict[str, List[Callable[[str], None]]] = {}
+        self.pending_jobs: Dict[str, NetworkJob] = {}
+        self.lookup_functions: Dict[str, Callable[[Song], str]] = {
+            MODARCHIVE: self.web_helper.lookup_modarchive_mod_url,
+            MSM: self.web_helper.lookup_msm_mod_url,
+        }
+
+        self.load()
+
+    def load(self) -> None:
+        self.entries = load_json(self.filename, "lookup cache") or {}
+
+    def save(self) -> None:
+        save_json(self.filename, self.entries)
+
+    def get_key(self, kind: str, song: Song) -> str:
+        return f"{kind}:{song.sha1}:{os.path.basename(song.filename)}"
+
+    def get_cached(self, kind: str, song: Song) -> Optional[str]:
+        entry = self.entries.get(self.get_key(kind, song))
+
+        if entry is None:
+            return None
+        if not entry["url"] and time.time() - entry["time"] > self.negative_ttl:
+            return None
+        return entry["url"]
+
+    def lookup(
+        self, kind: str, song: Song, callback: Optional[Callable[[str], None]] = None
+    ) -> None:
+        url = self.get_cached(kind, song)
+
+        if url is not None:
+            if callback:
+                callback(url)
+            return
+
+        key = self.get_key(kind, song)
+        callbacks = self.pending.get(key)
+
+        # Join a lookup that is already running, e.g. one started by prefetching
+        if callbacks is not None:
+            if callback:
+                callbacks.append(callback)
+                self.network_engine.set_priority(
+                    self.pending_jobs[key], Priority.NOW_PLAYING
+                )
+            return
+
+        self.pending[key] = [callback] if callback else []
+        self.pending_jobs[key] = self.network_engine.submit(
+            self.lookup_functions[kind],
+            song,
+            # A lookup with a callback was requested from the menu and is waited for
+            priority=Priority.NOW_PLAYING if callback else Priority.BULK,
+            on_finished=lambda url: self.on_lookup_finished(key, url),
+            on_failed=lambda error: self.on_lookup_failed(key, error),
+        )
+
+    def on_lookup_failed(self, key: str, error: Exception) -> None:
+        logger.warning(f"Lookup {key} failed: {error}")
+        self.pending_jobs.pop(key, None)
+
+        # Not cached, so the lookup is tried again next time
+        for callback in self.pending.pop(key, []):
+            callback("")
+
+    def on_lookup_finished(self, key: str, url: str) -> None:
+        self.pending_jobs.pop(key, None)
+        self.entries[key] = {"url": url, "time": time.time()}
+        self.save()
+
+        for callback in self.pending.pop(key, []):
+            callback(url)
+
+    def prefetch(self, song: Song) -> None:
+        if song.filename:
+            for kind in self.lookup_functions:
+                self.lookup(kind, song)
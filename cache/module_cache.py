@@ -0,0 +1,165 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Optional, TypedDict
+
+from loguru import logger
+
+from cache.json_cache import load_json, save_json
+
+# Access times only change the eviction order, the index is written for them at most this often, in seconds
+INDEX_SAVE_INTERVAL = 60.0
+
+
+class CacheEntry(TypedDict):
+    filename: str
+    size: int
+    last_access: float
+
+
+class ModuleCache:
+    def __init__(self, cache_dir: str, max_size: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.index_filename = os.path.join(self.cache_dir, "index.json")
+        self.entries: Dict[str, CacheEntry] = {}
+        self.ids: Dict[int, str] = {}
+        self.lock = threading.RLock()
+
+        # Index changes not written yet
+        self.dirty: bool = False
+        self.last_save: float = time.monotonic()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.load_index()
+
+    def load_index(self) -> None:
+        data = load_json(self.index_filename, "module cache index")
+        if data is None:
+            return
+
+        self.entries = data.get("entries", {})
+        self.ids = {int(id): sha1 for id, sha1 in data.get("ids", {}).items()}
+
+        # Drop entries whose files have been removed behind our back
+        for sha1 in list(self.entries):
+            if not os.path.exists(self.get_path(sha1)):
+                self.remove_entry(sha1)
+
+    def save_index(self) -> None:
+        save_json(self.index_filename, {"entries": self.entries, "ids": self.ids})
+
+        self.dirty = False
+        self.last_save = time.monotonic()
+
+    def save_index_throttled(self) -> None:
+        self.dirty = True
+        if time.monotonic() - self.last_save >= INDEX_SAVE_INTERVAL:
+            self.save_index()
+
+    def close(self) -> None:
+        with self.lock:
+            if self.dirty:
+                self.save_index()
+
+    def get_path(self, sha1: str) -> str:
+        return os.path.join(
+            self.cache_dir, sha1[:2], sha1, self.entries[sha1]["filename"]
+        )
+
+    def get_by_id(self, modarchive_id: int) -> Optional[str]:
+        with self.lock:
+            sha1 = self.ids.get(modarchive_id)
+            if sha1:
+                return self.get_by_sha1(sha1)
+        return None
+
+    def get_by_sha1(self, sha1: str) -> Optional[str]:
+        with self.lock:
+            if sha1 not in self.entries:
+                return None
+
+            path = self.get_path(sha1)
+            if not os.path.exists(path):
+                self.remove_entry(sha1)
+                self.save_index()
+                return None
+
+            self.entries[sha1]["last_access"] = time.time()
+            self.save_index_throttled()
+            logger.debug(f"Module cache hit: {path}")
+            return path
+
+    def store(self, filename: str, modarchive_id: int = 0) -> str:
+        sha1 = self.calculate_sha1(filename)
+
+        with self.lock:
+            if sha1 in self.entries and os.path.exists(self.get_path(sha1)):
+                os.remove(filename)
+            else:
+                self.entries[sha1] = {
+                    "filename": os.path.basename(filename),
+                    "size": os.path.getsize(filename),
+                    "last_access": time.time(),
+                }
+                path = self.get_path(sha1)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                shutil.move(filename, path)
+
+            self.entries[sha1]["last_access"] = time.time()
+            if modarchive_id:
+                self.ids[modarchive_id] = sha1
+
+            self.evict(keep=sha1)
+            self.save_index()
+            return self.get_path(sha1)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        with self.lock:
+            total_size = self.get_total_size()
+
+            # Least recently used entries go first
+            for sha1 in sorted(self.entries, key=lambda s: self.entries[s]["last_access"]):
+                if total_size <= self.max_size:
+                    break
+                if sha1 == keep:
+                    continue
+
+                total_size -= self.entries[sha1]["size"]
+                logger.debug(f"Evicting {self.entries[sha1]['filename']} from module cache")
+                self.delete_files(sha1)
+                self.remove_entry(sha1)
+
+    def delete_files(self, sha1: str) -> None:
+        shutil.rmtree(os.path.join(self.cache_dir, sha1[:2], sha1), ignore_errors=True)
+
+    def remove_entry(self, sha1: str) -> None:
+        self.entries.pop(sha1, None)
+        self.ids = {id: s for id, s in self.ids.items() if s != sha1}
+
+    def get_total_size(self) -> int:
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def set_max_size(self, max_size: int) -> None:
+        with self.lock:
+            self.max_size = max_size
+            self.evict()
+            self.save_index()
+
+    def clear(self) -> None:
+        with self.lock:
+            for sha1 in list(self.entries):
+                self.delete_files(sha1)
+                self.remove_entry(sha1)
+            self.save_index()
+
+    @staticmethod
+    def calculate_sha1(filename: str) -> str:
+        sha1 = hashlib.sha1()
+
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                sha1.update(chunk)
+        return sha1.hexdigest()
@@ -0,0 +1,99 @@
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from cache.json_cache import JsonCache
+from player_backends.Song import Song
+
+
+@dataclass(slots=True)
+class ModuleMetadata:
+    # Zero or empty if not known yet
+    format: str = ""
+    size: int = 0
+    duration: int = 0
+
+
+@dataclass
+class CandidateFilter:
+    # Limits of 0 are off, unknown metadata never rejects a module
+    max_duration: int = 0
+    max_size: int = 0
+    excluded_formats: Set[str] = field(default_factory=set)
+
+    def get_rejection(self, metadata: ModuleMetadata) -> Optional[str]:
+        if metadata.format and metadata.format in self.excluded_formats:
+            return f"format {metadata.format} is excluded"
+        if self.max_size and metadata.size > self.max_size:
+            return f"{metadata.size // 1024} KB is too large"
+        if self.max_duration and metadata.duration > self.max_duration:
+            return f"{metadata.duration} s is too long"
+        return None
+
+    def is_active(self) -> bool:
+        return bool(self.max_duration or self.max_size or self.excluded_formats)
+
+
+class ModuleMetadataCache(JsonCache):
+    # What is known about ModArchive modules before downloading them, from listed pages and earlier plays
+    name = "module metadata cache"
+
+    def __init__(self, cache_dir: str) -> None:
+        self.entries: Dict[int, ModuleMetadata] = {}
+        super().__init__(os.path.join(cache_dir, "module_metadata.json"))
+
+    def from_json(self, data: Any) -> None:
+        for module_id, entry in data.items():
+            self.entries[int(module_id)] = ModuleMetadata(**entry)
+
+    def to_json(self) -> Any:
+        return {
+            str(module_id): asdict(metadata)
+            for module_id, metadata in self.entries.items()
+        }
+
+    def get(self, module_id: int) -> Optional[ModuleMetadata]:
+        with self.lock:
+            return self.entries.get(module_id)
+
+    def update(
+        self, module_id: int, format: str = "", size: int = 0, duration: int = 0
+    ) -> None:
+        # Only known values are taken over, a listed page does not know the duration
+        with self.lock:
+            metadata = self.entries.setdefault(module_id, ModuleMetadata())
+
+            if format:
+                metadata.format = format.lower()
+            if size:
+                metadata.size = size
+            if duration:
+                metadata.duration = duration
+            self.dirty = True
+
+    def update_from_page(self, metadata: Dict[int, Tuple[str, int]]) -> None:
+        for module_id, (format, size) in metadata.items():
+            self.update(module_id, format, size)
+
+    def record_song(self, song: Song) -> None:
+        if song.modarchive_id:
+            extension = os.path.splitext(song.filename)[1].lstrip(".")
+            self.update(song.modarchive_id, extension, song.modulebytes, song.duration)
+
+    def get_rejection(
+        self, module_id: int, candidate_filter: CandidateFilter
+    ) -> Optional[str]:
+        metadata = self.get(module_id)
+        return candidate_filter.get_rejection(metadata) if metadata else None
+
+    def filter_ids(
+        self, module_ids: Iterable[int], candidate_filter: CandidateFilter
+    ) -> List[int]:
+        return [
+            module_id
+            for module_id in module_ids
+            if self.get_rejection(module_id, candidate_filter) is None
+        ]
+
+    def __len__(self) -> int:
+        return len(self.entries)
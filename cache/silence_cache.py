@@ -0,0 +1,40 @@
+import os
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+from cache.json_cache import JsonCache
+from silence_detector import SilenceBoundaries
+
+
+class SilenceCache(JsonCache):
+    # Silence found at the start and end of modules by sha1, so the next play can skip it right away
+    name = "silence cache"
+
+    def __init__(self, cache_dir: str) -> None:
+        self.entries: Dict[str, SilenceBoundaries] = {}
+        super().__init__(os.path.join(cache_dir, "silence.json"))
+
+    def from_json(self, data: Any) -> None:
+        for sha1, entry in data.items():
+            self.entries[sha1] = SilenceBoundaries(**entry)
+
+    def to_json(self) -> Any:
+        return {sha1: asdict(boundaries) for sha1, boundaries in self.entries.items()}
+
+    def get(self, sha1: str) -> Optional[SilenceBoundaries]:
+        with self.lock:
+            boundaries = self.entries.get(sha1)
+            return (
+                SilenceBoundaries(boundaries.start, boundaries.end)
+                if boundaries
+                else None
+            )
+
+    def store(self, sha1: str, boundaries: SilenceBoundaries) -> None:
+        # Called from the player thread
+        if not sha1:
+            return
+
+        with self.lock:
+            self.entries[sha1] = SilenceBoundaries(boundaries.start, boundaries.end)
+            self.dirty = True
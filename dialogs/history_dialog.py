@@ -1,5 +1,5 @@
 from PySide6.QtGui import QCloseEvent
-from PySide6.QtWidgets import QDialog, QVBoxLayout
+from PySide6.QtWidgets import QDialog, QPushButton, QVBoxLayout
 from player_backends.Song import Song
 from playing_engine import PlayingEngine
 from playlist.playlist import Playlist
@@ -10,6 +10,9 @@ from playlist.playlist_manager import PlaylistManager
 from playlist.playlist_tab_widget import PlaylistTabWidget
 from settings_manager import SettingsManager
 
+# Number of older songs read from the history log per click
+HISTORY_PAGE_SIZE = 100
+
 
 class HistoryDialog(QDialog):
     song_on_tab_double_clicked = Signal(Song)
@@ -30,12 +33,27 @@ class HistoryDialog(QDialog):
         self.tab_widget = PlaylistTabWidget(self, self.playing_engine.playlist_manager, False)
         self.tab_widget.song_double_clicked.connect(self.on_song_double_clicked)
 
+        self.load_older_button = QPushButton("Load Older")
+        self.load_older_button.clicked.connect(self.load_older_songs)
+
         self.main_layout = QVBoxLayout(self)
+        self.main_layout.addWidget(self.load_older_button)
         self.main_layout.addWidget(self.tab_widget)
 
         self.setLayout(self.main_layout)
 
-        self.tab_widget.add_tab(self.playing_engine.playlist_manager.get_history_playlist())
+        self.history_playlist = self.playing_engine.history_playlist
+        self.tree_view = self.tab_widget.add_tab(self.history_playlist)
+
+        # Rows of the whole history shown in the view, which keeps at most one window of them
+        self.first_row_index: int = self.history_playlist.window_start
+        self.last_row_index: int = self.history_playlist.get_length()
+        self.max_rows: int = self.history_playlist.window_size
+
+        self.load_newer_button = QPushButton("Load Newer")
+        self.load_newer_button.clicked.connect(self.load_newer_songs)
+        self.main_layout.addWidget(self.load_newer_button)
+        self.update_buttons()
 
         self.show()
 
@@ -45,8 +63,56 @@ class HistoryDialog(QDialog):
     def on_song_double_clicked(self, song: Song, row: int) -> None:
         self.song_on_tab_double_clicked.emit(song)
 
+    def update_buttons(self) -> None:
+        self.load_older_button.setEnabled(self.first_row_index > 0)
+        self.load_newer_button.setEnabled(
+            self.last_row_index < self.history_playlist.get_length()
+        )
+
+    def get_page_size(self) -> int:
+        return min(HISTORY_PAGE_SIZE, self.max_rows)
+
+    def load_older_songs(self) -> None:
+        start = max(0, self.first_row_index - self.get_page_size())
+        songs = self.history_playlist.get_songs(start, self.first_row_index)
+
+        self.tree_view.insert_songs(0, songs)
+        self.first_row_index = start
+        self.drop_newest_rows()
+        self.update_buttons()
+
+    def load_newer_songs(self) -> None:
+        stop = min(
+            self.last_row_index + self.get_page_size(),
+            self.history_playlist.get_length(),
+        )
+        songs = self.history_playlist.get_songs(self.last_row_index, stop)
+
+        self.tree_view.insert_songs(self.tree_view.playlist_model.rowCount(), songs)
+        self.last_row_index = stop
+        self.drop_oldest_rows()
+        self.update_buttons()
+
+    # Rows dropped from either end can be paged back in
+    def drop_newest_rows(self) -> None:
+        surplus = self.tree_view.playlist_model.rowCount() - self.max_rows
+        if surplus > 0:
+            self.tree_view.playlist_model.removeRows(self.max_rows, surplus)
+            self.last_row_index -= surplus
+
+    def drop_oldest_rows(self) -> None:
+        surplus = self.tree_view.playlist_model.rowCount() - self.max_rows
+        if surplus > 0:
+            self.tree_view.playlist_model.removeRows(0, surplus)
+            self.first_row_index += surplus
+
     def add_song(self, song: Song) -> None:
-        self.tab_widget.add_song(song)
+        # Only shown if the view is at the newest end, otherwise it is paged in with the next page
+        if self.last_row_index == self.history_playlist.get_length() - 1:
+            self.tree_view.add_song(song)
+            self.last_row_index += 1
+            self.drop_oldest_rows()
+        self.update_buttons()
 
     def update_song_info(self, song: Song) -> None:
         # self.tab_widget.update_song_info(song)
@@ -84,6 +84,213 @@ class SettingsDialog(QDialog):
         
         layout.addLayout(max_duration_layout)
 
+        self.max_play_time_label: QLabel = QLabel("Fade Out Songs After (seconds):")
+        self.max_play_time_input: QLineEdit = QLineEdit()
+        self.max_play_time_input.setPlaceholderText("0")
+        self.max_play_time_input.setValidator(QIntValidator(0, 86400))
+
+        # Load the max play time input data from settings
+        max_play_time: str = str(self.settings.value("max_play_time", "0"))
+        if max_play_time:
+            self.max_play_time_input.setText(max_play_time)
+
+        # Save the max play time input data when it changes
+        self.max_play_time_input.textChanged.connect(self.save_max_play_time_input)
+
+        max_play_time_layout: QHBoxLayout = QHBoxLayout()
+        max_play_time_layout.addWidget(self.max_play_time_label)
+        max_play_time_layout.addWidget(self.max_play_time_input)
+
+        layout.addLayout(max_play_time_layout)
+
+        self.trailing_silence_label: QLabel = QLabel(
+            "End Songs After Silence (seconds):"
+        )
+        self.trailing_silence_input: QLineEdit = QLineEdit()
+        self.trailing_silence_input.setPlaceholderText("10")
+        self.trailing_silence_input.setValidator(QIntValidator(0, 3600))
+
+        # Load the trailing silence input data from settings
+        trailing_silence: str = str(self.settings.value("trailing_silence", "10"))
+        if trailing_silence:
+            self.trailing_silence_input.setText(trailing_silence)
+
+        # Save the trailing silence input data when it changes
+        self.trailing_silence_input.textChanged.connect(
+            self.save_trailing_silence_input
+        )
+
+        trailing_silence_layout: QHBoxLayout = QHBoxLayout()
+        trailing_silence_layout.addWidget(self.trailing_silence_label)
+        trailing_silence_layout.addWidget(self.trailing_silence_input)
+
+        layout.addLayout(trailing_silence_layout)
+
+        self.skip_leading_silence_checkbox: QCheckBox = QCheckBox(
+            "Skip Silent Intros"
+        )
+        skip_leading_silence: bool = (
+            str(self.settings.value("skip_leading_silence", True)).lower() == "true"
+        )
+        self.skip_leading_silence_checkbox.setChecked(skip_leading_silence)
+        self.skip_leading_silence_checkbox.stateChanged.connect(
+            self.save_skip_leading_silence_preference
+        )
+
+        layout.addWidget(self.skip_leading_silence_checkbox)
+
+        self.max_module_size_label: QLabel = QLabel("Max Module Size (KB):")
+        self.max_module_size_input: QLineEdit = QLineEdit()
+        self.max_module_size_input.setPlaceholderText("0")
+        self.max_module_size_input.setValidator(QIntValidator(0, 1000000))
+
+        # Load the max module size input data from settings
+        max_module_size: str = str(self.settings.value("max_module_size", "0"))
+        if max_module_size:
+            self.max_module_size_input.setText(max_module_size)
+
+        # Save the max module size input data when it changes
+        self.max_module_size_input.textChanged.connect(
+            self.save_max_module_size_input
+        )
+
+        max_module_size_layout: QHBoxLayout = QHBoxLayout()
+        max_module_size_layout.addWidget(self.max_module_size_label)
+        max_module_size_layout.addWidget(self.max_module_size_input)
+
+        layout.addLayout(max_module_size_layout)
+
+        self.excluded_formats_label: QLabel = QLabel("Skip Formats:")
+        self.excluded_formats_input: QLineEdit = QLineEdit()
+        self.excluded_formats_input.setPlaceholderText("e.g. xm, it")
+
+        # Load the excluded formats input data from settings
+        excluded_formats: str = str(self.settings.value("excluded_formats", ""))
+        if excluded_formats:
+            self.excluded_formats_input.setText(excluded_formats)
+
+        # Save the excluded formats input data when it changes
+        self.excluded_formats_input.textChanged.connect(
+            self.save_excluded_formats_input
+        )
+
+        excluded_formats_layout: QHBoxLayout = QHBoxLayout()
+        excluded_formats_layout.addWidget(self.excluded_formats_label)
+        excluded_formats_layout.addWidget(self.excluded_formats_input)
+
+        layout.addLayout(excluded_formats_layout)
+
+        self.module_cache_size_label: QLabel = QLabel("Module Cache Size (MB):")
+        self.module_cache_size_input: QLineEdit = QLineEdit()
+        self.module_cache_size_input.setPlaceholderText("500")
+        self.module_cache_size_input.setValidator(QIntValidator(0, 1000000))
+
+        # Load the module cache size input data from settings
+        module_cache_size: str = str(self.settings.value("module_cache_size", "500"))
+        if module_cache_size:
+            self.module_cache_size_input.setText(module_cache_size)
+
+        # Save the module cache size input data when it changes
+        self.module_cache_size_input.textChanged.connect(
+            self.save_module_cache_size_input
+        )
+
+        module_cache_size_layout: QHBoxLayout = QHBoxLayout()
+        module_cache_size_layout.addWidget(self.module_cache_size_label)
+        module_cache_size_layout.addWidget(self.module_cache_size_input)
+
+        layout.addLayout(module_cache_size_layout)
+
+        self.prefetch_depth_label: QLabel = QLabel("Prefetched Random Modules:")
+        self.prefetch_depth_input: QLineEdit = QLineEdit()
+        self.prefetch_depth_input.setPlaceholderText("3")
+        self.prefetch_depth_input.setValidator(QIntValidator(1, 20))
+
+        # Load the prefetch depth input data from settings
+        prefetch_depth: str = str(self.settings.value("prefetch_depth", "3"))
+        if prefetch_depth:
+            self.prefetch_depth_input.setText(prefetch_depth)
+
+        # Save the prefetch depth input data when it changes
+        self.prefetch_depth_input.textChanged.connect(self.save_prefetch_depth_input)
+
+        prefetch_depth_layout: QHBoxLayout = QHBoxLayout()
+        prefetch_depth_layout.addWidget(self.prefetch_depth_label)
+        prefetch_depth_layout.addWidget(self.prefetch_depth_input)
+
+        layout.addLayout(prefetch_depth_layout)
+
+        self.background_bandwidth_label: QLabel = QLabel(
+            "Background Download Limit (KB/s):"
+        )
+        self.background_bandwidth_input: QLineEdit = QLineEdit()
+        self.background_bandwidth_input.setPlaceholderText("256")
+        self.background_bandwidth_input.setValidator(QIntValidator(0, 1000000))
+
+        # Load the background bandwidth input data from settings
+        background_bandwidth: str = str(
+            self.settings.value("background_bandwidth", "256")
+        )
+        if background_bandwidth:
+            self.background_bandwidth_input.setText(background_bandwidth)
+
+        # Save the background bandwidth input data when it changes
+        self.background_bandwidth_input.textChanged.connect(
+            self.save_background_bandwidth_input
+        )
+
+        background_bandwidth_layout: QHBoxLayout = QHBoxLayout()
+        background_bandwidth_layout.addWidget(self.background_bandwidth_label)
+        background_bandwidth_layout.addWidget(self.background_bandwidth_input)
+
+        layout.addLayout(background_bandwidth_layout)
+
+        self.uade_state_pool_size_label: QLabel = QLabel("Warm UADE Emulators:")
+        self.uade_state_pool_size_input: QLineEdit = QLineEdit()
+        self.uade_state_pool_size_input.setPlaceholderText("2")
+        self.uade_state_pool_size_input.setValidator(QIntValidator(0, 16))
+
+        # Load the UADE state pool size input data from settings
+        uade_state_pool_size: str = str(
+            self.settings.value("uade_state_pool_size", "2")
+        )
+        if uade_state_pool_size:
+            self.uade_state_pool_size_input.setText(uade_state_pool_size)
+
+        # Save the UADE state pool size input data when it changes
+        self.uade_state_pool_size_input.textChanged.connect(
+            self.save_uade_state_pool_size_input
+        )
+
+        uade_state_pool_size_layout: QHBoxLayout = QHBoxLayout()
+        uade_state_pool_size_layout.addWidget(self.uade_state_pool_size_label)
+        uade_state_pool_size_layout.addWidget(self.uade_state_pool_size_input)
+
+        layout.addLayout(uade_state_pool_size_layout)
+
+        self.history_window_size_label: QLabel = QLabel("History Songs in Memory:")
+        self.history_window_size_input: QLineEdit = QLineEdit()
+        self.history_window_size_input.setPlaceholderText("200")
+        self.history_window_size_input.setValidator(QIntValidator(1, 100000))
+
+        # Load the history window size input data from settings
+        history_window_size: str = str(
+            self.settings.value("history_window_size", "200")
+        )
+        if history_window_size:
+            self.history_window_size_input.setText(history_window_size)
+
+        # Save the history window size input data when it changes
+        self.history_window_size_input.textChanged.connect(
+            self.save_history_window_size_input
+        )
+
+        history_window_size_layout: QHBoxLayout = QHBoxLayout()
+        history_window_size_layout.addWidget(self.history_window_size_label)
+        history_window_size_layout.addWidget(self.history_window_size_input)
+
+        layout.addLayout(history_window_size_layout)
+
         button_layout: QHBoxLayout = QHBoxLayout()
         ok_button: QPushButton = QPushButton("OK")
         ok_button.clicked.connect(self.accept)
@@ -110,4 +317,59 @@ class SettingsDialog(QDialog):
 
     @Slot()
     def save_max_duration_input(self) -> None:
-        self.settings.setValue("max_duration", self.max_duration_input.text())
\ No newline at end of file
+        self.settings.setValue("max_duration", self.max_duration_input.text())
+
+    @Slot()
+    def save_max_play_time_input(self) -> None:
+        self.settings.setValue("max_play_time", self.max_play_time_input.text())
+
+    @Slot()
+    def save_trailing_silence_input(self) -> None:
+        self.settings.setValue("trailing_silence", self.trailing_silence_input.text())
+
+    @Slot()
+    def save_skip_leading_silence_preference(self) -> None:
+        self.settings.setValue(
+            "skip_leading_silence", self.skip_leading_silence_checkbox.isChecked()
+        )
+
+    @Slot()
+    def save_max_module_size_input(self) -> None:
+        self.settings.setValue("max_module_size", self.max_module_size_input.text())
+
+    @Slot()
+    def save_excluded_formats_input(self) -> None:
+        self.settings.setValue("excluded_formats", self.excluded_formats_input.text())
+
+    @Slot()
+    def save_prefetch_depth_input(self) -> None:
+        if self.prefetch_depth_input.text():
+            self.settings.setValue("prefetch_depth", self.prefetch_depth_input.text())
+
+    @Slot()
+    def save_background_bandwidth_input(self) -> None:
+        if self.background_bandwidth_input.text():
+            self.settings.setValue(
+                "background_bandwidth", self.background_bandwidth_input.text()
+            )
+
+    @Slot()
+    def save_uade_state_pool_size_input(self) -> None:
+        if self.uade_state_pool_size_input.text():
+            self.settings.setValue(
+                "uade_state_pool_size", self.uade_state_pool_size_input.text()
+            )
+
+    @Slot()
+    def save_history_window_size_input(self) -> None:
+        if self.history_window_size_input.text():
+            self.settings.setValue(
+                "history_window_size", self.history_window_size_input.text()
+            )
+
+    @Slot()
+    def save_module_cache_size_input(self) -> None:
+        if self.module_cache_size_input.text():
+            self.settings.setValue(
+                "module_cache_size", self.module_cache_size_input.text()
+            )
\ No newline at end of file
@@ -0,0 +1,185 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class RateLimiter:
+    def __init__(self, min_interval: float) -> None:
+        self.min_interval = min_interval
+        self.next_allowed: float = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> float:
+        # Reserve the next free slot under the lock, sleep outside of it
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed)
+            self.next_allowed = slot + self.min_interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class BandwidthLimiter:
+    def __init__(self, rate: float) -> None:
+        # Bytes per second, 0 is unlimited
+        self.rate = rate
+        self.next_allowed: float = 0.0
+        self.lock = threading.Lock()
+
+    def consume(self, size: int) -> float:
+        if self.rate <= 0:
+            return 0.0
+
+        # Space transfers out so all callers together stay below the rate
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed)
+            self.next_allowed = slot + size / self.rate
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+@dataclass
+class RequestStats:
+    count: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    last_time: float = 0.0
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self.stats: Dict[str, RequestStats] = {}
+        self.lock = threading.Lock()
+
+    def record(self, key: str, elapsed: float, failed: bool = False) -> None:
+        with self.lock:
+            stats = self.stats.setdefault(key, RequestStats())
+            stats.count += 1
+            stats.errors += int(failed)
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.last_time = elapsed
+
+    def get_stats(self, key: str) -> Optional[RequestStats]:
+        with self.lock:
+            return self.stats.get(key)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {
+                key: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "average_ms": stats.average_time * 1000,
+                    "max_ms": stats.max_time * 1000,
+                    "last_ms": stats.last_time * 1000,
+                }
+                for key, stats in self.stats.items()
+            }
+
+
+class HttpSession:
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        min_request_interval: float = 0.2,
+        pool_size: int = 8,
+    ) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.rate_limiter = RateLimiter(min_request_interval)
+        self.metrics = RequestMetrics()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+
+        # requests.Session keeps connections alive and reuses them per host
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        key = self.get_metrics_key(url)
+
+        self.rate_limiter.wait()
+        started = time.monotonic()
+
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            elapsed = time.monotonic() - started
+            self.metrics.record(key, elapsed, True)
+            logger.error(f"{method} {url} failed after {elapsed * 1000:.0f} ms: {e}")
+            raise
+
+        elapsed = time.monotonic() - started
+        self.metrics.record(key, elapsed, response.status_code >= 400)
+        logger.debug(
+            f"{method} {url} -> {response.status_code} in {elapsed * 1000:.0f} ms"
+        )
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    def get_metrics_key(self, url: str) -> str:
+        parsed = urlparse(url)
+
+        # ModArchive routes everything through index.php, so tell pages apart by request type
+        for parameter in parsed.query.split("&"):
+            if parameter.startswith("request="):
+                return f"{parsed.netloc}{parsed.path}?{parameter}"
+        return f"{parsed.netloc}{parsed.path}"
+
+    def close(self) -> None:
+        self.session.close()
+
+
+shared_session: Optional[HttpSession] = None
+shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> HttpSession:
+    global shared_session
+
+    with shared_session_lock:
+        if shared_session is None:
+            shared_session = HttpSession()
+        return shared_session
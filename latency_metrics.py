@@ -0,0 +1,143 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Stages of a song's life, from picking a random module to hearing it
+FETCH = "fetch"
+DOWNLOAD = "download"
+PROBE = "probe"
+SONG_INFO = "song_info"
+BACKEND = "backend"
+PREPARE = "prepare"
+FIRST_CHUNK = "first_chunk"
+FIRST_WRITE = "first_write"
+FIRST_AUDIO = "first_audio"
+PLAY_TO_AUDIO = "play_to_audio"
+
+STAGES = [
+    FETCH,
+    DOWNLOAD,
+    PROBE,
+    SONG_INFO,
+    BACKEND,
+    PREPARE,
+    FIRST_CHUNK,
+    FIRST_WRITE,
+    FIRST_AUDIO,
+    PLAY_TO_AUDIO,
+]
+
+# Upper bucket bounds in milliseconds, roughly logarithmic, the last bucket is open
+BUCKET_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.buckets: List[int] = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count: int = 0
+        self.total_time: float = 0.0
+        self.min_time: float = 0.0
+        self.max_time: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, seconds * 1000)] += 1
+
+        if self.count == 0 or seconds < self.min_time:
+            self.min_time = seconds
+        self.max_time = max(self.max_time, seconds)
+        self.count += 1
+        self.total_time += seconds
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    def get_percentile(self, fraction: float) -> float:
+        # Upper bound of the bucket holding the percentile, in seconds
+        if self.count == 0:
+            return 0.0
+
+        rank = max(1, round(self.count * fraction))
+        seen = 0
+
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return min(BUCKET_BOUNDS_MS[index] / 1000, self.max_time)
+                break
+        return self.max_time
+
+    def to_dict(self) -> Dict[str, object]:
+        labels = [f"<={bound}ms" for bound in BUCKET_BOUNDS_MS]
+        labels.append(f">{BUCKET_BOUNDS_MS[-1]}ms")
+
+        return {
+            "count": self.count,
+            "average_ms": self.average_time * 1000,
+            "min_ms": self.min_time * 1000,
+            "max_ms": self.max_time * 1000,
+            "p50_ms": self.get_percentile(0.5) * 1000,
+            "p95_ms": self.get_percentile(0.95) * 1000,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class LatencyMetrics:
+    def __init__(self) -> None:
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            self.histograms.setdefault(stage, LatencyHistogram()).record(seconds)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        # Failed stages are not recorded, they would skew the histogram towards zero
+        started = time.perf_counter()
+        yield
+        self.record(stage, time.perf_counter() - started)
+
+    def get_histogram(self, stage: str) -> Optional[LatencyHistogram]:
+        with self.lock:
+            return self.histograms.get(stage)
+
+    def summary(self) -> Dict[str, Dict[str, object]]:
+        with self.lock:
+            ordered = sorted(
+                self.histograms,
+                key=lambda stage: (
+                    STAGES.index(stage) if stage in STAGES else len(STAGES),
+                    stage,
+                ),
+            )
+            return {stage: self.histograms[stage].to_dict() for stage in ordered}
+
+    def dump(self, filename: str) -> None:
+        temp_filename = f"{filename}.tmp"
+
+        with open(temp_filename, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        os.replace(temp_filename, filename)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.histograms.clear()
+
+
+shared_metrics: Optional[LatencyMetrics] = None
+shared_metrics_lock = threading.Lock()
+
+
+def get_latency_metrics() -> LatencyMetrics:
+    global shared_metrics
+
+    with shared_metrics_lock:
+        if shared_metrics is None:
+            shared_metrics = LatencyMetrics()
+        return shared_metrics
@@ -1,4 +1,7 @@
+import time
+
 from PySide6.QtCore import QObject, Signal, Slot
+from latency_metrics import PROBE, SONG_INFO, get_latency_metrics
 from player_backends.player_backend import PlayerBackend
 from player_backends.Song import Song
 from typing import Optional
@@ -7,6 +10,7 @@ from loguru import logger
 
 class AbstractLoader(QObject):
     song_loaded = Signal(Song)
+    song_load_failed = Signal(Song)
 
     def __init__(self, player_backends: dict[str, type[PlayerBackend]]) -> None:
         super().__init__()
@@ -17,29 +21,59 @@ class AbstractLoader(QObject):
 
     @Slot()
     def on_module_loaded(self, song: Optional[Song]) -> None:
-        if song:
-            filename = song.filename
-            updated_song = self.update_song_info(song)
-
-            song = updated_song
-            if not song:
-                logger.warning(
-                    f'No backend could load the module "{filename}"'
-                )
+        # The song info has already been retrieved by the loading thread
         self.song_loaded.emit(song)
 
+    @Slot()
+    def on_module_load_failed(self, song: Song) -> None:
+        self.song_load_failed.emit(song)
+
+    def probe_header(self, header: bytes, filename: str) -> bool:
+        # Reject a download early only if every backend is sure it cannot play it
+        for backend_name, backend_class in self.player_backends.items():
+            player_backend = backend_class(backend_name)
+            try:
+                result = player_backend.probe_header(header, filename)
+            except Exception as e:
+                logger.warning(f"Header probe with {backend_name} failed: {e}")
+                return True
+            finally:
+                player_backend.cleanup()
+
+            if result is None or result:
+                return True
+        logger.debug(f'No player backend recognizes the header of "{filename}"')
+        return False
+
+    def load_song_info(self, song: Song) -> Optional[Song]:
+        # Runs off the GUI thread, the player backends load the whole module to probe it
+        filename = song.filename
+        updated_song = self.update_song_info(song)
+
+        if not updated_song:
+            logger.warning(f'No backend could load the module "{filename}"')
+        return updated_song
+
     def update_song_info(self, song: Song) -> Optional[Song]:
         # Try to load the module by going through the available player backends
+        metrics = get_latency_metrics()
+        started = time.perf_counter()
+
         for backend_name, backend_class in self.player_backends.items():
             logger.debug(f"Trying player backend: {backend_name}")
 
             player_backend = backend_class(backend_name)
-            if player_backend is not None:
+            try:
                 player_backend.song = song
                 if player_backend.check_module():
+                    metrics.record(PROBE, time.perf_counter() - started)
                     logger.debug(f"Module loaded with player backend: {backend_name}")
                     song.backend_name = backend_name
                     player_backend.song = song
-                    player_backend.retrieve_song_info()
+                    with metrics.measure(SONG_INFO):
+                        player_backend.retrieve_song_info()
                     return player_backend.song
+            finally:
+                # Native allocations and pooled emulator states are only needed for the probe
+                player_backend.cleanup()
         return None
@@ -45,6 +45,9 @@ class ModuleTester:
                     player_backend.cleanup()
                     player_backend = None
                     break
+
+                # Hand pooled emulator states back right away, an import tries thousands of files
+                player_backend.cleanup()
         self.emitter.song_checked(self.song)
 
 
@@ -1,5 +1,5 @@
 from PySide6.QtCore import Signal
-from typing import Optional
+from typing import Callable, Optional
 
 from loguru import logger
 
@@ -10,8 +10,10 @@ from loaders.module_loader_thread import ModuleLoaderThread
 class LocalLoaderThread(ModuleLoaderThread):
     module_loaded = Signal(Song)
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(
+        self, song_info_loader: Optional[Callable[[Song], Optional[Song]]] = None
+    ) -> None:
+        super().__init__(song_info_loader)
 
         self.filename: Optional[str] = None
 
@@ -0,0 +1,133 @@
+import os
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from cache.module_cache import ModuleCache
+from latency_metrics import DOWNLOAD, get_latency_metrics
+from network_engine import CancellationToken, OperationCancelled
+from player_backends.Song import Song
+from web_helper import WebHelper
+
+# Seconds between checks for cancellation while waiting for another download
+WAIT_INTERVAL = 0.1
+
+
+class ModArchiveDownloader:
+    # Downloads in flight by module id, shared by all downloaders so a module is only fetched once at a time
+    in_flight: Dict[int, "Future[Optional[str]]"] = {}
+    in_flight_lock = threading.Lock()
+
+    def __init__(
+        self,
+        web_helper: WebHelper,
+        song: Song,
+        temp_dir: str,
+        module_cache: Optional[ModuleCache] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        header_check: Optional[Callable[[bytes, str], bool]] = None,
+        throttle: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.web_helper = web_helper
+        self.song = song
+        self.temp_dir = temp_dir
+        self.module_cache = module_cache
+        self.progress_callback = progress_callback
+        self.header_check = header_check
+        self.throttle = throttle
+
+    def load_module(self, token: CancellationToken) -> Optional[Song]:
+        # Runs on the network engine
+        if not self.song.modarchive_id:
+            raise ValueError("Song ID not set")
+
+        filename = self.get_module_file(token)
+
+        if filename:
+            self.song.filename = filename
+            self.song.is_ready = True
+            return self.song
+        return None
+
+    def get_module_file(self, token: CancellationToken) -> Optional[str]:
+        module_id = self.song.modarchive_id
+
+        while True:
+            with self.in_flight_lock:
+                future = self.in_flight.get(module_id)
+                owner = future is None
+                if future is None:
+                    future = self.in_flight[module_id] = Future()
+
+            if owner:
+                try:
+                    filename = self.fetch_module_file(token)
+                except BaseException as e:
+                    self.finish(module_id, future, None, e)
+                    raise
+                self.finish(module_id, future, filename, None)
+                return filename
+
+            logger.debug(f"Module {module_id} is already downloading, waiting for it")
+            try:
+                return self.wait_for(future, token)
+            except OperationCancelled:
+                # Only the other download was cancelled, take it over
+                token.raise_if_cancelled()
+
+    def finish(
+        self,
+        module_id: int,
+        future: "Future[Optional[str]]",
+        filename: Optional[str],
+        error: Optional[BaseException],
+    ) -> None:
+        # Removed first, so waiters taking over a cancelled download start a new one
+        with self.in_flight_lock:
+            del self.in_flight[module_id]
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(filename)
+
+    def wait_for(
+        self, future: "Future[Optional[str]]", token: CancellationToken
+    ) -> Optional[str]:
+        while True:
+            try:
+                return future.result(WAIT_INTERVAL)
+            except TimeoutError:
+                token.raise_if_cancelled()
+
+    def fetch_module_file(self, token: CancellationToken) -> Optional[str]:
+        filename: Optional[str] = None
+
+        if self.module_cache:
+            filename = self.module_cache.get_by_id(self.song.modarchive_id)
+
+        if not filename:
+            token.raise_if_cancelled()
+            with get_latency_metrics().measure(DOWNLOAD):
+                filename = self.web_helper.download_module_file(
+                    self.song.modarchive_id,
+                    self.temp_dir,
+                    token,
+                    self.progress_callback,
+                    self.header_check,
+                    self.throttle,
+                )
+
+            if filename and self.module_cache:
+                download_dir = os.path.dirname(filename)
+                filename = self.module_cache.store(filename, self.song.modarchive_id)
+
+                # The download directory is empty once the module has moved to the cache
+                try:
+                    os.rmdir(download_dir)
+                except OSError:
+                    pass
+
+        return filename
@@ -1,15 +1,18 @@
-from PySide6.QtCore import QThread, Signal
-from typing import Optional
+import random
+from typing import Callable, List, Optional
 
+from cache.module_metadata_cache import CandidateFilter, ModuleMetadataCache
+from latency_metrics import FETCH, get_latency_metrics
 from player_backends.Song import Song
 from playing_modes import ModArchiveSource, PlayingMode, PlayingSource
 from web_helper import WebHelper
 from loguru import logger
 
+# Random picks rejected by cached metadata before settling for the last one
+MAX_CANDIDATE_TRIES = 5
 
-class ModArchiveRandomModuleFetcherThread(QThread):
-    module_fetched = Signal(Song)
 
+class ModArchiveRandomModuleFetcher:
     def __init__(
         self,
         song: Song,
@@ -19,9 +22,11 @@ class ModArchiveRandomModuleFetcherThread(QThread):
         web_helper: WebHelper,
         artist_name: str | None = None,
         member_id: int | None = None,
+        favorite_ids: Optional[List[int]] = None,
+        artist_ids: Optional[List[int]] = None,
+        metadata_cache: Optional[ModuleMetadataCache] = None,
+        candidate_filter: Optional[CandidateFilter] = None,
     ) -> None:
-        super().__init__()
-
         self.song = song
         self.playing_mode = current_playing_mode
         self.playing_source = current_playing_source
@@ -29,14 +34,16 @@ class ModArchiveRandomModuleFetcherThread(QThread):
         self.web_helper = web_helper
         self.artist_name = artist_name
         self.member_id = member_id
+        self.favorite_ids = favorite_ids
+        self.artist_ids = artist_ids
+        self.metadata_cache = metadata_cache
+        self.candidate_filter = candidate_filter
 
-    def run(self) -> None:
-        self.fetch_random_module_id()
-
-        if self.song:
-            self.module_fetched.emit(self.song)
-        else:
-            self.module_fetched.emit({})
+    def fetch_random_module(self) -> Song:
+        # Runs on the network engine
+        with get_latency_metrics().measure(FETCH):
+            self.fetch_random_module_id()
+        return self.song
 
     def fetch_random_module_id(self) -> None:
         id: int | None = None
@@ -46,22 +53,60 @@ class ModArchiveRandomModuleFetcherThread(QThread):
                 match self.modarchive_source:
                     case ModArchiveSource.ALL:
                         logger.info("Getting random module")
-                        id = self.web_helper.get_random_module_id()
+                        id = self.pick_candidate(self.web_helper.get_random_module_id)
                     case ModArchiveSource.FAVORITES:
-                        if self.member_id:
+                        if self.favorite_ids:
+                            logger.info("Getting random favorite module from cache")
+                            id = random.choice(self.filter_ids(self.favorite_ids))
+                        elif self.member_id:
                             logger.info("Getting random favorite module")
-                            id = self.web_helper.get_random_favorite_module_id(
-                                self.member_id
+                            member_id = self.member_id
+                            id = self.pick_candidate(
+                                lambda: self.web_helper.get_random_favorite_module_id(
+                                    member_id
+                                )
                             )
                     case ModArchiveSource.ARTIST:
-                        if self.artist_name:
+                        if self.artist_ids:
+                            logger.info("Getting random artist module from catalogue")
+                            id = random.choice(self.filter_ids(self.artist_ids))
+                        elif self.artist_name:
                             logger.info("Getting random artist module")
-                            id = self.web_helper.get_random_artist_module_id(
-                                self.artist_name
+                            artist_name = self.artist_name
+                            id = self.pick_candidate(
+                                lambda: self.web_helper.get_random_artist_module_id(
+                                    artist_name
+                                )
                             )
             if id:
                 self.song.modarchive_id = id
 
-    def terminate(self) -> None:
-        logger.info("Terminating ModArchiveRandomModuleFetcherThread")
-        return super().terminate()
+    def get_rejection(self, module_id: int) -> Optional[str]:
+        if self.metadata_cache and self.candidate_filter:
+            return self.metadata_cache.get_rejection(module_id, self.candidate_filter)
+        return None
+
+    def filter_ids(self, module_ids: List[int]) -> List[int]:
+        # Modules known to be unwanted are skipped, unless that leaves nothing to pick
+        if self.metadata_cache and self.candidate_filter:
+            wanted = self.metadata_cache.filter_ids(module_ids, self.candidate_filter)
+            if wanted:
+                return wanted
+        return module_ids
+
+    def pick_candidate(
+        self, get_candidate: Callable[[], Optional[int]]
+    ) -> Optional[int]:
+        # Each try is another page request, but far cheaper than downloading and probing the module
+        module_id: Optional[int] = None
+
+        for _ in range(MAX_CANDIDATE_TRIES):
+            module_id = get_candidate()
+            if module_id is None:
+                return None
+
+            rejection = self.get_rejection(module_id)
+            if rejection is None:
+                return module_id
+            logger.debug(f"Skipping random module {module_id}: {rejection}")
+        return module_id
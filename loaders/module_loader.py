@@ -1,11 +1,13 @@
 from loguru import logger
-from typing import List, Dict
-from PySide6.QtCore import QObject
+from typing import List, Dict, Optional
+from PySide6.QtCore import QObject, Signal
 
+from cache.module_cache import ModuleCache
+from network_engine import CancellationToken, NetworkEngine, NetworkJob, Priority
 from playing_modes import PlayingSource
 from loaders.abstract_loader import AbstractLoader
 from loaders.local_loader_thread import LocalLoaderThread
-from loaders.modarchive_downloader_thread import ModArchiveDownloaderThread
+from loaders.modarchive_downloader import ModArchiveDownloader
 from player_backends.player_backend import PlayerBackend
 from playing_settings import PlayingSettings
 from web_helper import WebHelper
@@ -13,35 +15,105 @@ from player_backends.Song import Song
 
 
 class ModuleLoader(AbstractLoader):
+    # Emitted from the network engine while a module is downloading: song, received bytes, total bytes
+    download_progress = Signal(Song, int, int)
+
     def __init__(
         self,
         playing_settings: PlayingSettings,
         local_file: str,
-        web_helper: object,
+        web_helper: WebHelper,
         temp_dir: str,
         player_backends: Dict[str, type[PlayerBackend]],
+        network_engine: NetworkEngine,
+        module_cache: Optional[ModuleCache] = None,
     ) -> None:
         super().__init__(player_backends)
         self.playing_settings = playing_settings
         self.local_file = local_file
         self.web_helper = web_helper
         self.temp_dir = temp_dir
+        self.network_engine = network_engine
+        self.module_cache = module_cache
         self.module_loader_threads: List[QObject] = []
         self.player_backends = player_backends
 
-    def load_modules(self, song: Song) -> None:
+        # Downloads in flight by song uid, so they can be reprioritized
+        self.download_jobs: Dict[str, NetworkJob] = {}
+
+    def load_modules(
+        self,
+        song: Song,
+        token: Optional[CancellationToken] = None,
+        priority: Priority = Priority.NOW_PLAYING,
+    ) -> None:
         logger.debug("Loading module")
 
-        if self.playing_settings.playing_source == PlayingSource.LOCAL:
-            module_loader_thread = LocalLoaderThread()
+        if (
+            self.playing_settings.playing_source == PlayingSource.LOCAL
+            and not song.modarchive_id
+        ):
+            module_loader_thread = LocalLoaderThread(self.load_song_info)
             module_loader_thread.filename = self.local_file
-        elif self.playing_settings.playing_source == PlayingSource.MODARCHIVE:
-            module_loader_thread = ModArchiveDownloaderThread()
-            module_loader_thread.song = song
-            module_loader_thread.web_helper = WebHelper()
-            module_loader_thread.temp_dir = self.temp_dir
 
-        self.module_loader_threads.append(module_loader_thread)
+            self.module_loader_threads.append(module_loader_thread)
+
+            module_loader_thread.module_loaded.connect(self.on_module_loaded)
+            module_loader_thread.module_load_failed.connect(self.on_module_load_failed)
+            module_loader_thread.start()
+        else:
+            downloader = ModArchiveDownloader(
+                self.web_helper,
+                song,
+                self.temp_dir,
+                self.module_cache,
+                lambda received, total: self.download_progress.emit(
+                    song, received, total
+                ),
+                self.probe_header,
+                self.network_engine.throttle,
+            )
+            token = token or CancellationToken()
+
+            self.download_jobs[song.uid] = self.network_engine.submit(
+                self.download_module,
+                downloader,
+                token,
+                token=token,
+                priority=priority,
+                on_finished=lambda loaded_song: self.on_module_downloaded(
+                    song, loaded_song
+                ),
+                on_failed=lambda error: self.on_download_failed(song),
+            )
+
+    def download_module(
+        self, downloader: ModArchiveDownloader, token: CancellationToken
+    ) -> Optional[Song]:
+        # Runs on the network engine, the downloaded module is probed there as well
+        song = downloader.load_module(token)
+        if not song:
+            return None
+
+        token.raise_if_cancelled()
+        return self.load_song_info(song)
+
+    def set_priority(self, song: Song, priority: Priority) -> None:
+        job = self.download_jobs.get(song.uid)
+        if job:
+            self.network_engine.set_priority(job, priority)
+
+    def clear_download_jobs(self) -> None:
+        self.download_jobs.clear()
+
+    def on_download_failed(self, song: Song) -> None:
+        self.download_jobs.pop(song.uid, None)
+        self.on_module_load_failed(song)
+
+    def on_module_downloaded(self, song: Song, loaded_song: Optional[Song]) -> None:
+        self.download_jobs.pop(song.uid, None)
 
-        module_loader_thread.module_loaded.connect(self.on_module_loaded)
-        module_loader_thread.start()
+        if loaded_song:
+            self.on_module_loaded(loaded_song)
+        else:
+            self.on_module_load_failed(song)
@@ -1,23 +1,44 @@
 from abc import abstractmethod
 from PySide6.QtCore import QThread, Signal
-from typing import Optional
+from typing import Callable, Optional
+
+from loguru import logger
 
 from player_backends.Song import Song
 
 
 class ModuleLoaderThread(QThread):
     module_loaded = Signal(Song)
+    module_load_failed = Signal(Song)
 
-    def __init__(self) -> None:
+    def __init__(
+        self, song_info_loader: Optional[Callable[[Song], Optional[Song]]] = None
+    ) -> None:
         super().__init__()
+        self.song: Optional[Song] = None
+        self.song_info_loader = song_info_loader
 
     def run(self) -> None:
-        song: Optional[Song] = self.load_module()
+        song: Optional[Song] = None
+
+        try:
+            song = self.load_module()
+
+            if song and self.song_info_loader:
+                # Reported as failed if no player backend can load it
+                self.song = song
+                song = self.song_info_loader(song)
+        except Exception as e:
+            logger.error(f"Loading module failed: {e}")
+
         if song:
             self.module_loaded.emit(song)
         else:
             self.module_loaded.emit({})
 
+            if self.song:
+                self.module_load_failed.emit(self.song)
+
     @abstractmethod
     def load_module(self) -> Optional[Song]:
         pass
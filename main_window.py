@@ -7,6 +7,7 @@ from PySide6.QtCore import QSettings, Qt, Slot
 from PySide6.QtGui import QAction, QCursor
 from PySide6.QtWidgets import QMainWindow, QMenu, QSystemTrayIcon
 
+from cache.lookup_cache import MODARCHIVE, MSM
 from icons import Icons
 from dialogs.history_dialog import HistoryDialog
 from dialogs.meta_data_dialog import MetaDataDialog
@@ -14,12 +15,12 @@ from playing_engine import PlayingEngine
 from playlist.playlists_dialog import PlaylistsDialog
 from player_backends.libopenmpt.player_backend_libopenmpt import PlayerBackendLibOpenMPT
 from player_backends.libuade.player_backend_libuade import PlayerBackendLibUADE
+from player_backends.libuade.uade_state_pool import get_uade_state_pool
 from player_backends.libgme.player_backend_libgme import PlayerBackendLibGME
 from player_backends.player_backend import PlayerBackend
 from dialogs.settings_dialog import SettingsDialog
 from settings_manager import SettingsManager
 from ui_manager import UIManager
-from web_helper import WebHelper
 
 
 class MainWindow(QMainWindow):
@@ -36,6 +37,9 @@ class MainWindow(QMainWindow):
         }
 
         self.settings_manager = SettingsManager(self.settings)
+        get_uade_state_pool().set_max_size(
+            self.settings_manager.get_uade_state_pool_size()
+        )
 
         self.icons = Icons(self.settings, self.style())
         self.icon = self.icons.pixmap_icons["application_icon"]
@@ -63,31 +67,38 @@ class MainWindow(QMainWindow):
         self.ui_manager.set_local_source(
             self.playing_engine.playing_settings.local_source
         )
+        self.ui_manager.set_shuffle_mode(
+            self.playing_engine.playing_settings.shuffle_mode
+        )
 
         self.history_dialog = None
         self.playlist_dialog = None
         self.settings_dialog = None
         self.meta_data_dialog = None
 
-        self.web_helper = WebHelper()
+        self.web_helper = self.playing_engine.web_helper
 
     @Slot()
     def set_window_title(self, title: str) -> None:
         self.setWindowTitle(f"{self.name} - {title}")
 
     def add_favorite_button_clicked(self) -> None:
-        if self.playing_engine.get_current_song:
-            action = (
-                "add_favourite"
-                if not self.current_module_is_favorite
-                else "remove_favourite"
-            )
+        song = self.playing_engine.get_current_song()
+
+        if song:
+            is_favorite = self.playing_engine.current_module_is_favorite
+            action = "add_favourite" if not is_favorite else "remove_favourite"
             webbrowser.open(
-                f"https://modarchive.org/interactive.php?request={action}&query={self.playing_engine.get_current_song.modarchive_id}"
+                f"{self.web_helper.base_url}/interactive.php?request={action}&query={song.modarchive_id}"
             )
 
-            self.current_module_is_favorite = not self.current_module_is_favorite
-            self.ui_manager.set_favorite_button_state(self.current_module_is_favorite)
+            self.playing_engine.current_module_is_favorite = not is_favorite
+            self.playing_engine.favorites_cache.set_favorite(
+                self.settings_manager.get_member_id(),
+                song.modarchive_id,
+                not is_favorite,
+            )
+            self.ui_manager.set_favorite_button_state(not is_favorite)
 
     def open_settings_dialog(self) -> None:
         if self.settings_dialog:
@@ -98,6 +109,21 @@ class MainWindow(QMainWindow):
             self.settings_dialog.exec()
 
             self.ui_manager.update_source_input()
+            self.playing_engine.module_cache.set_max_size(
+                self.settings_manager.get_module_cache_size() * 1024 * 1024
+            )
+            self.playing_engine.prefetch_policy.set_max_depth(
+                self.settings_manager.get_prefetch_depth()
+            )
+            self.playing_engine.network_engine.set_background_bandwidth(
+                self.settings_manager.get_background_bandwidth() * 1024
+            )
+            get_uade_state_pool().set_max_size(
+                self.settings_manager.get_uade_state_pool_size()
+            )
+            self.playing_engine.history_playlist.set_window_size(
+                self.settings_manager.get_history_window_size()
+            )
 
     @Slot()
     def on_play_pause_pressed(self) -> None:
@@ -135,10 +161,7 @@ class MainWindow(QMainWindow):
             song = self.playing_engine.get_current_song()
 
             if song:
-                url: str = self.web_helper.lookup_msm_mod_url(song)
-
-                if url:
-                    webbrowser.open(url)
+                self.playing_engine.lookup_cache.lookup(MSM, song, self.open_lookup_url)
 
     @Slot()
     def on_lookup_modarchive(self) -> None:
@@ -146,10 +169,15 @@ class MainWindow(QMainWindow):
             song = self.playing_engine.get_current_song()
 
             if song:
-                url: str = self.web_helper.lookup_modarchive_mod_url(song)
+                self.playing_engine.lookup_cache.lookup(
+                    MODARCHIVE, song, self.open_lookup_url
+                )
 
-                if url:
-                    webbrowser.open(url)
+    def open_lookup_url(self, url: str) -> None:
+        if url:
+            webbrowser.open(url)
+        else:
+            logger.info("Module not found")
 
     def open_history_dialog(self) -> None:
         if self.history_dialog:
@@ -211,6 +239,7 @@ class MainWindow(QMainWindow):
     @Slot()
     def closeEvent(self, event) -> None:
         self.playing_engine.close()
+        get_uade_state_pool().close()
         self.settings_manager.close()
         self.ui_manager.close()
 
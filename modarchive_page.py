@@ -0,0 +1,176 @@
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+
+def get_module_id_from_url(url: str) -> Optional[int]:
+    id_str = url.split("=")[-1].split("#")[0]
+    if id_str.isdigit():
+        return int(id_str)
+    return None
+
+
+def get_module_format_from_url(url: str) -> str:
+    # Download links end in the module filename, like #space_debris.mod
+    filename = url.split("#")[-1] if "#" in url else ""
+    return filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+
+
+def parse_module_size(text: str) -> int:
+    # Sizes are listed like 248KB or 1.2MB
+    text = text.strip().upper()
+
+    for unit, factor in (("KB", 1024), ("MB", 1024 * 1024), ("B", 1)):
+        if text.endswith(unit):
+            try:
+                return int(float(text[: -len(unit)]) * factor)
+            except ValueError:
+                return 0
+    return 0
+
+
+class ModArchivePage(HTMLParser):
+    # Single pass tag scanner that only keeps what WebHelper needs, instead of building a full BeautifulSoup tree
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+
+        self.standard_link: Optional[str] = None
+        self.standard_link_with_text: Optional[str] = None
+        self.has_search_results: bool = False
+        self.has_pagination: bool = False
+        self.pagination_options: List[str] = []
+        self.download_links: List[str] = []
+        self.textarea_text: Optional[str] = None
+
+        # Listed size of the module of the last download link
+        self.module_sizes: Dict[int, int] = {}
+
+        # Element whose text is being collected: tag name, text parts, whether it has child tags
+        self.capture: Optional[Tuple[str, List[str], List[bool]]] = None
+        self.capture_href: str = ""
+        self.in_pagination: bool = False
+        self.option_text: Optional[List[str]] = None
+        self.textarea_parts: Optional[List[str]] = None
+        self.size_tag: Optional[str] = None
+        self.size_parts: List[str] = []
+
+    @classmethod
+    def parse(cls, content: bytes) -> "ModArchivePage":
+        page = cls()
+        page.feed(content.decode("utf-8", errors="replace"))
+        page.close()
+        return page
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self.capture:
+            self.capture[2][0] = True
+
+        if tag == "a":
+            self.handle_link(dict(attrs))
+        elif tag == "option" and self.in_pagination:
+            self.finish_option()
+            self.option_text = []
+        elif tag == "select" and not self.has_pagination:
+            if "pagination" in self.get_classes(dict(attrs)):
+                self.has_pagination = True
+                self.in_pagination = True
+        elif tag == "h1" and not self.has_search_results and not self.capture:
+            if "site-wide-page-head-title" in self.get_classes(dict(attrs)):
+                self.capture = ("h1", [], [False])
+        elif tag == "textarea" and self.textarea_text is None:
+            self.textarea_parts = []
+        elif "module-size" in self.get_classes(dict(attrs)):
+            self.size_tag = tag
+            self.size_parts = []
+
+    def handle_link(self, attrs: Dict[str, Optional[str]]) -> None:
+        href = attrs.get("href")
+
+        if attrs.get("title") == "Download" and href is not None:
+            self.download_links.append(href)
+
+        if href is None or "standard-link" not in self.get_classes(attrs):
+            return
+
+        if self.standard_link is None:
+            self.standard_link = href
+
+        # Only links with a single text child count, like BeautifulSoup's string=True
+        if self.standard_link_with_text is None and not self.capture:
+            self.capture = ("a", [], [False])
+            self.capture_href = href
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.capture and self.capture[0] == tag:
+            name, parts, has_children = self.capture
+            text = "".join(parts) if len(parts) == 1 and not has_children[0] else None
+            self.capture = None
+
+            if text is not None:
+                if name == "a":
+                    self.standard_link_with_text = self.capture_href
+                elif name == "h1" and text == "Search Results":
+                    self.has_search_results = True
+        elif tag == "option":
+            self.finish_option()
+        elif tag == "select" and self.in_pagination:
+            self.finish_option()
+            self.in_pagination = False
+        elif tag == "textarea" and self.textarea_parts is not None:
+            self.textarea_text = "".join(self.textarea_parts)
+            self.textarea_parts = None
+        elif tag == self.size_tag:
+            self.size_tag = None
+            module_id = (
+                get_module_id_from_url(self.download_links[-1])
+                if self.download_links
+                else None
+            )
+            if module_id is not None:
+                self.module_sizes[module_id] = parse_module_size(
+                    "".join(self.size_parts)
+                )
+
+    def handle_data(self, data: str) -> None:
+        if self.capture:
+            self.capture[1].append(data)
+        if self.option_text is not None:
+            self.option_text.append(data)
+        if self.textarea_parts is not None:
+            self.textarea_parts.append(data)
+        if self.size_tag is not None:
+            self.size_parts.append(data)
+
+    def finish_option(self) -> None:
+        if self.option_text is not None:
+            self.pagination_options.append("".join(self.option_text))
+            self.option_text = None
+
+    def get_classes(self, attrs: Dict[str, Optional[str]]) -> List[str]:
+        return (attrs.get("class") or "").split()
+
+    def get_last_page(self) -> int:
+        if self.pagination_options:
+            return int(self.pagination_options[-1])
+        return 1
+
+    def get_download_link_ids(self) -> List[int]:
+        ids: List[int] = []
+
+        for download_link in self.download_links:
+            module_id = get_module_id_from_url(download_link)
+            if module_id is not None:
+                ids.append(module_id)
+        return ids
+
+    def get_module_metadata(self) -> Dict[int, Tuple[str, int]]:
+        # Format and size of every listed module, size is 0 if not shown
+        metadata: Dict[int, Tuple[str, int]] = {}
+
+        for download_link in self.download_links:
+            module_id = get_module_id_from_url(download_link)
+            if module_id is not None:
+                metadata[module_id] = (
+                    get_module_format_from_url(download_link),
+                    self.module_sizes.get(module_id, 0),
+                )
+        return metadata
@@ -0,0 +1,278 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "libopenmpt_py")
+)
+
+from loaders.local_file_loader import ModuleTester, SongEmitter
+from player_backends.player_backend import PlayerBackend
+from player_backends.Song import Song
+from playlist.file_fetcher import FileFetcher
+
+
+def get_player_backends() -> Dict[str, type[PlayerBackend]]:
+    # Imported lazily so every worker process loads the native libraries itself
+    from player_backends.libgme.player_backend_libgme import PlayerBackendLibGME
+    from player_backends.libopenmpt.player_backend_libopenmpt import (
+        PlayerBackendLibOpenMPT,
+    )
+    from player_backends.libuade.player_backend_libuade import PlayerBackendLibUADE
+
+    return {
+        "LibUADE": PlayerBackendLibUADE,
+        "LibOpenMPT": PlayerBackendLibOpenMPT,
+        "LibGME": PlayerBackendLibGME,
+    }
+
+
+worker_backends: Dict[str, type[PlayerBackend]] = {}
+
+
+def init_worker(log_level: str, uade_states: int) -> None:
+    global worker_backends
+
+    logger.remove()
+    logger.add(sys.stderr, level=log_level)
+    worker_backends = get_player_backends()
+
+    # Each worker probes files one after another, reusing its UADE emulator between them
+    from player_backends.libuade.uade_state_pool import get_uade_state_pool
+
+    get_uade_state_pool().set_max_size(uade_states)
+
+
+def probe_file(path: str) -> Dict[str, Any]:
+    song = Song(filename=path, is_ready=True)
+    emitter = SongEmitter(lambda song: None, lambda song: None)
+    record: Dict[str, Any] = {"path": path, "ok": False, "song": None}
+
+    try:
+        stat = os.stat(path)
+        record["mtime"] = stat.st_mtime
+        record["size"] = stat.st_size
+
+        tester = ModuleTester(song, worker_backends, emitter)
+        tester.test_backends()
+
+        if tester.song.backend_name:
+            record["ok"] = True
+            record["song"] = tester.song.to_dict()
+    except Exception as e:
+        logger.warning(f'Failed to probe "{path}": {e}')
+        record["error"] = str(e)
+
+    return record
+
+
+class JsonLinesWriter:
+    def __init__(self, filename: str, resume: bool = True) -> None:
+        self.filename = filename
+        self.file = open(filename, "a" if resume else "w", encoding="utf-8")
+
+        # Terminate a line truncated by an interrupted run before appending
+        if self.file.tell() > 0:
+            with open(filename, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")
+
+    def processed_paths(self) -> Set[str]:
+        paths: Set[str] = set()
+
+        with open(self.filename, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    paths.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    # Last line of an interrupted run may be truncated
+                    continue
+        return paths
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.file.write(json.dumps(record) + "\n")
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class SQLiteWriter:
+    def __init__(self, filename: str, resume: bool = True) -> None:
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS modules (
+                path TEXT PRIMARY KEY,
+                ok INTEGER NOT NULL,
+                mtime REAL,
+                size INTEGER,
+                backend_name TEXT,
+                title TEXT,
+                artist TEXT,
+                duration INTEGER,
+                sha1 TEXT,
+                song TEXT
+            )
+            """
+        )
+        if not resume:
+            self.connection.execute("DELETE FROM modules")
+        self.connection.commit()
+
+    def processed_paths(self) -> Set[str]:
+        return {row[0] for row in self.connection.execute("SELECT path FROM modules")}
+
+    def write(self, record: Dict[str, Any]) -> None:
+        song: Dict[str, Any] = record["song"] or {}
+        self.connection.execute(
+            "INSERT OR REPLACE INTO modules VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record["path"],
+                int(record["ok"]),
+                record.get("mtime"),
+                record.get("size"),
+                song.get("backend_name"),
+                song.get("title"),
+                song.get("artist"),
+                song.get("duration"),
+                song.get("sha1"),
+                json.dumps(song) if song else None,
+            ),
+        )
+
+    def flush(self) -> None:
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.commit()
+        self.connection.close()
+
+
+def create_writer(filename: str, output_format: Optional[str], resume: bool) -> Any:
+    if output_format is None:
+        output_format = (
+            "sqlite" if filename.endswith((".db", ".sqlite", ".sqlite3")) else "jsonl"
+        )
+
+    if output_format == "sqlite":
+        return SQLiteWriter(filename, resume)
+    return JsonLinesWriter(filename, resume)
+
+
+def get_pending_files(files: Iterable[str], writer: Any) -> List[str]:
+    # Files indexed by an earlier, possibly interrupted run are skipped
+    processed = writer.processed_paths()
+    if processed:
+        logger.info(f"Resuming, skipping {len(processed)} already indexed files")
+    return [file for file in files if file not in processed]
+
+
+def log_progress(done: int, total: int, ok: int, started: float) -> None:
+    elapsed = time.monotonic() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    logger.info(f"{done}/{total} files, {ok} modules, {rate:.1f} files/s")
+
+
+def index_files(
+    files: Iterable[str],
+    writer: Any,
+    jobs: int,
+    log_level: str,
+    uade_states: int = 1,
+    progress_interval: float = 2.0,
+) -> None:
+    file_list = list(files)
+    total = len(file_list)
+    done = 0
+    ok = 0
+    started = time.monotonic()
+    last_report = started
+
+    # Fresh processes keep crashes and leaks of the native libraries contained
+    with multiprocessing.Pool(
+        jobs,
+        initializer=init_worker,
+        initargs=(log_level, uade_states),
+        maxtasksperchild=500,
+    ) as pool:
+        for record in pool.imap_unordered(probe_file, file_list, chunksize=8):
+            writer.write(record)
+            done += 1
+            ok += int(record["ok"])
+
+            now = time.monotonic()
+            if now - last_report >= progress_interval:
+                writer.flush()
+                log_progress(done, total, ok, started)
+                last_report = now
+
+    writer.flush()
+    log_progress(done, total, ok, started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Scan a directory tree and extract module meta data without a GUI."
+    )
+    parser.add_argument("paths", nargs="+", help="Files or directories to scan")
+    parser.add_argument(
+        "-o", "--output", required=True, help="Output file (.jsonl or .db)"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["jsonl", "sqlite"],
+        help="Output format, guessed from the output file name if omitted",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Probe all files again instead of skipping already indexed ones",
+    )
+    parser.add_argument(
+        "--uade-states",
+        type=int,
+        default=1,
+        help="Idle UADE emulator instances each worker keeps for reuse",
+    )
+    parser.add_argument("--log-level", default="WARNING", help="Worker log level")
+    args = parser.parse_args()
+
+    writer = create_writer(args.output, args.format, not args.no_resume)
+
+    file_fetcher = FileFetcher()
+    files = file_fetcher.get_files_recursively_from_path_list(args.paths)
+
+    if not args.no_resume:
+        files = get_pending_files(files, writer)
+
+    logger.info(f"Indexing {len(files)} files with {args.jobs} workers")
+
+    try:
+        index_files(files, writer, max(1, args.jobs), args.log_level, args.uade_states)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted, run again to resume")
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
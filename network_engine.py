@@ -0,0 +1,289 @@
+import asyncio
+import heapq
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from PySide6.QtCore import QObject, Signal, Slot
+
+from http_session import BandwidthLimiter
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class Priority(IntEnum):
+    NOW_PLAYING = 0
+    NEXT = 1
+    PREFETCH = 2
+    BULK = 3
+
+
+DEFAULT_PRIORITY_LIMITS: Dict[Priority, int] = {
+    Priority.NOW_PLAYING: 4,
+    Priority.NEXT: 2,
+    Priority.PREFETCH: 2,
+    Priority.BULK: 1,
+}
+
+
+class CancellationToken:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+
+    def cancel(self) -> None:
+        self.event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.event.is_set():
+            raise OperationCancelled()
+
+
+class NetworkJob:
+    def __init__(
+        self,
+        function: Callable[..., Any],
+        args: tuple,
+        token: CancellationToken,
+        priority: Priority,
+        sequence: int,
+        on_finished: Optional[Callable[[Any], None]],
+        on_failed: Optional[Callable[[str], None]],
+    ) -> None:
+        self.function = function
+        self.args = args
+        self.token = token
+        self.priority = priority
+        self.sequence = sequence
+        self.on_finished = on_finished
+        self.on_failed = on_failed
+
+        # Class the job was counted against when it started running
+        self.running_priority: Optional[Priority] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class NetworkEngine(QObject):
+    # Emitted on the event loop thread, delivered to the Qt thread as queued signals
+    job_finished = Signal(object, object)
+    job_failed = Signal(object, str)
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        priority_limits: Optional[Dict[Priority, int]] = None,
+        background_bandwidth: float = 0,
+    ) -> None:
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.priority_limits = dict(priority_limits or DEFAULT_PRIORITY_LIMITS)
+
+        # Caps prefetch and bulk downloads while more urgent downloads are running
+        self.bandwidth_limiter = BandwidthLimiter(background_bandwidth)
+
+        # requests is blocking, so the loop hands the calls to a bounded executor
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="network"
+        )
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        self.jobs: Set[NetworkJob] = set()
+        self.jobs_lock = threading.Lock()
+        self.sequence = itertools.count()
+        self.local = threading.local()
+
+        # Only touched on the event loop thread
+        self.waiting: List[Tuple[Priority, int, NetworkJob]] = []
+        self.running_counts: Dict[Priority, int] = {
+            priority: 0 for priority in Priority
+        }
+
+        self.job_finished.connect(self.on_job_finished)
+        self.job_failed.connect(self.on_job_failed)
+
+        self.thread = threading.Thread(
+            target=self.run_loop, name="network-engine", daemon=True
+        )
+        self.loop_started = threading.Event()
+        self.thread.start()
+        self.loop_started.wait()
+
+    def run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self.loop_started.set)
+        self.loop.run_forever()
+        self.loop.close()
+
+    def submit(
+        self,
+        function: Callable[..., Any],
+        *args: Any,
+        token: Optional[CancellationToken] = None,
+        priority: Priority = Priority.BULK,
+        on_finished: Optional[Callable[[Any], None]] = None,
+        on_failed: Optional[Callable[[str], None]] = None,
+    ) -> NetworkJob:
+        job = NetworkJob(
+            function,
+            args,
+            token or CancellationToken(),
+            priority,
+            next(self.sequence),
+            on_finished,
+            on_failed,
+        )
+
+        with self.jobs_lock:
+            self.jobs.add(job)
+
+        self.loop.call_soon_threadsafe(self.enqueue, job)
+        return job
+
+    def set_priority(self, job: NetworkJob, priority: Priority) -> None:
+        if job.priority != priority:
+            job.priority = priority
+            self.loop.call_soon_threadsafe(self.reorder)
+
+    def enqueue(self, job: NetworkJob) -> None:
+        heapq.heappush(self.waiting, (job.priority, job.sequence, job))
+        self.dispatch()
+
+    def reorder(self) -> None:
+        for _, _, job in self.waiting:
+            if job.token.cancelled:
+                self.remove_job(job)
+
+        self.waiting = [
+            (job.priority, job.sequence, job)
+            for _, _, job in self.waiting
+            if not job.token.cancelled
+        ]
+        heapq.heapify(self.waiting)
+        self.dispatch()
+
+    def discard_cancelled(self) -> None:
+        self.loop.call_soon_threadsafe(self.reorder)
+
+    def dispatch(self) -> None:
+        deferred: List[Tuple[Priority, int, NetworkJob]] = []
+
+        while self.waiting and sum(self.running_counts.values()) < self.max_concurrency:
+            entry = heapq.heappop(self.waiting)
+            job = entry[2]
+
+            if job.token.cancelled:
+                logger.debug(
+                    f"Network job {job.function.__name__} cancelled while queued"
+                )
+                self.remove_job(job)
+                continue
+
+            if self.running_counts[job.priority] >= self.priority_limits[job.priority]:
+                deferred.append(entry)
+                continue
+
+            job.running_priority = job.priority
+            self.running_counts[job.priority] += 1
+            job.task = self.loop.create_task(self.run_job(job))
+
+        for entry in deferred:
+            heapq.heappush(self.waiting, entry)
+
+    async def run_job(self, job: NetworkJob) -> None:
+        try:
+            job.token.raise_if_cancelled()
+            result = await self.loop.run_in_executor(
+                self.executor, self.run_in_thread, job
+            )
+            job.token.raise_if_cancelled()
+
+            self.job_finished.emit(job, result)
+        except (OperationCancelled, asyncio.CancelledError):
+            logger.debug(f"Network job {job.function.__name__} cancelled")
+            self.remove_job(job)
+        except Exception as e:
+            logger.error(f"Network job {job.function.__name__} failed: {e}")
+            self.job_failed.emit(job, str(e))
+        finally:
+            if job.running_priority is not None:
+                self.running_counts[job.running_priority] -= 1
+            self.dispatch()
+
+    def run_in_thread(self, job: NetworkJob) -> Any:
+        self.local.job = job
+        try:
+            return job.function(*job.args)
+        finally:
+            self.local.job = None
+
+    def throttle(self, size: int) -> None:
+        # Called by transfers on the executor threads after every chunk
+        job: Optional[NetworkJob] = getattr(self.local, "job", None)
+
+        if job is None or job.priority < Priority.PREFETCH:
+            return
+
+        if (
+            self.running_counts[Priority.NOW_PLAYING]
+            or self.running_counts[Priority.NEXT]
+        ):
+            self.bandwidth_limiter.consume(size)
+
+    def set_background_bandwidth(self, rate: float) -> None:
+        self.bandwidth_limiter.rate = rate
+
+    def remove_job(self, job: NetworkJob) -> None:
+        with self.jobs_lock:
+            self.jobs.discard(job)
+
+    @Slot(object, object)
+    def on_job_finished(self, job: NetworkJob, result: Any) -> None:
+        self.remove_job(job)
+
+        # The token may have been cancelled while the result was queued
+        if not job.token.cancelled and job.on_finished:
+            job.on_finished(result)
+
+    @Slot(object, str)
+    def on_job_failed(self, job: NetworkJob, error: str) -> None:
+        self.remove_job(job)
+
+        if not job.token.cancelled and job.on_failed:
+            job.on_failed(error)
+
+    def get_pending_count(self) -> int:
+        with self.jobs_lock:
+            return len(self.jobs)
+
+    def close(self) -> None:
+        with self.jobs_lock:
+            jobs = list(self.jobs)
+
+        for job in jobs:
+            job.token.cancel()
+
+        self.loop.call_soon_threadsafe(self.cancel_tasks)
+        self.thread.join(5)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def cancel_tasks(self) -> None:
+        self.waiting.clear()
+
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+
+        self.loop.create_task(self.stop_after(tasks))
+
+    async def stop_after(self, tasks: Set["asyncio.Task[Any]"]) -> None:
+        # Cancelled jobs get to clean up before the loop stops
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loop.stop()
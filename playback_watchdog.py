@@ -0,0 +1,271 @@
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+# Loudness values per second kept of the rendered output
+ENVELOPE_RATE = 20
+
+# Output is checked for repeats this often, in seconds
+LOOP_CHECK_INTERVAL = 5.0
+
+# Length of the latest output that has to match an earlier part, in seconds
+LOOP_MATCH_LENGTH = 45.0
+
+# Shorter repeats are rhythm, not a song starting over
+MIN_LOOP_LENGTH = 10.0
+
+# Only this much output is searched for repeats, in seconds
+MAX_LOOP_HISTORY = 1200.0
+
+# Correlation of the loudness envelopes for the output to count as repeated
+LOOP_SIMILARITY = 0.99
+
+# Envelope values further apart than this in dB do not belong to the repeat
+LOOP_TOLERANCE_DB = 6.0
+
+# Output varying less than this in dB is too flat to tell a repeat from a drone or silence
+MIN_ENVELOPE_SPREAD_DB = 1.0
+
+# Reported positions moving back further than this in seconds mean the player started over
+POSITION_TOLERANCE = 1.0
+
+FADE_DURATION = 5.0
+
+BYTES_PER_FRAME = 4
+
+
+class OutputLoopDetector:
+    # Finds repeats in the loudness envelope of the output, for players that do not know where a song loops
+    def __init__(self, samplerate: int) -> None:
+        self.samplerate = samplerate
+        self.hop = samplerate // ENVELOPE_RATE
+
+        self.match_length = int(LOOP_MATCH_LENGTH * ENVELOPE_RATE)
+        self.min_lag = int(MIN_LOOP_LENGTH * ENVELOPE_RATE)
+        self.check_interval = int(LOOP_CHECK_INTERVAL * ENVELOPE_RATE)
+        self.envelope = np.zeros(int(MAX_LOOP_HISTORY * ENVELOPE_RATE), np.float32)
+
+        self.reset(0)
+
+    def reset(self, frame: int) -> None:
+        # Frame of the first envelope value
+        self.start_frame = frame
+        self.length = 0
+        self.next_check = self.match_length + self.min_lag
+
+        # Power of frames that do not fill an envelope step yet
+        self.pending = np.zeros(0, np.float32)
+
+    def process(self, buffer: bytes) -> Optional[Tuple[float, float]]:
+        frames = len(buffer) // BYTES_PER_FRAME
+        samples = np.frombuffer(buffer, dtype=np.int16, count=frames * 2)
+        samples = samples.astype(np.float32)
+        levels = samples * samples
+        power = np.concatenate((self.pending, levels[0::2] + levels[1::2]))
+
+        steps = len(power) // self.hop
+        self.pending = power[steps * self.hop :]
+        if steps == 0:
+            return None
+
+        envelope = 10 * np.log10(
+            power[: steps * self.hop].reshape(steps, self.hop).mean(axis=1) + 1
+        )
+        self.append(envelope)
+
+        if self.length < self.next_check:
+            return None
+        self.next_check = self.length + self.check_interval
+
+        return self.find_loop()
+
+    def append(self, envelope: np.ndarray) -> None:
+        overflow = self.length + len(envelope) - len(self.envelope)
+        if overflow > 0:
+            # Forget the oldest output
+            self.envelope[: self.length - overflow] = self.envelope[
+                overflow : self.length
+            ]
+            self.length -= overflow
+            self.start_frame += overflow * self.hop
+            self.next_check -= overflow
+
+        self.envelope[self.length : self.length + len(envelope)] = envelope
+        self.length += len(envelope)
+
+    def find_loop(self) -> Optional[Tuple[float, float]]:
+        length = self.length
+        window = self.match_length
+        envelope = self.envelope[:length].astype(np.float64)
+
+        recent = envelope[-window:]
+        spread = recent.std()
+        if spread < MIN_ENVELOPE_SPREAD_DB:
+            return None
+
+        # Correlation of the latest output with every earlier window at least the min loop length back
+        earlier = envelope[: length - self.min_lag]
+        sums = np.concatenate(([0.0], np.cumsum(earlier)))
+        squares = np.concatenate(([0.0], np.cumsum(earlier * earlier)))
+        means = (sums[window:] - sums[:-window]) / window
+        variances = (squares[window:] - squares[:-window]) / window - means * means
+
+        covariances = np.correlate(earlier, recent - recent.mean(), "valid") / window
+        correlations = covariances / (np.sqrt(np.maximum(variances, 1e-9)) * spread)
+
+        matches = np.flatnonzero(correlations >= LOOP_SIMILARITY)
+        if not matches.size:
+            return None
+
+        # Shortest repeat, at the best matching step around it
+        latest = matches[-1]
+        first = max(0, latest - ENVELOPE_RATE)
+        start = first + int(np.argmax(correlations[first : latest + 1]))
+        lag = length - window - start
+
+        # Walk back to where the output started to repeat
+        differences = np.abs(envelope[lag:] - envelope[:-lag])
+        mismatches = np.flatnonzero(differences > LOOP_TOLERANCE_DB)
+        repeat_start = lag + (int(mismatches[-1]) + 1 if mismatches.size else 0)
+        repeat_start = min(repeat_start, length - window)
+
+        loop_end = self.start_frame + repeat_start * self.hop
+        loop_start = loop_end - lag * self.hop
+        return float(loop_start / self.samplerate), float(loop_end / self.samplerate)
+
+
+class PositionLoopDetector:
+    # Players that report the current order jump back to an order already played when the song loops
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.visited: Dict[int, float] = {}
+        self.last_order: int = -1
+        self.last_position: Optional[float] = None
+
+    def process(self, order: int, position: float) -> Optional[Tuple[float, float]]:
+        # Pattern loops stay within an order, only a jump to an earlier order starts the song over
+        if order < self.last_order and order in self.visited:
+            return self.visited[order], position
+
+        self.visited.setdefault(order, position)
+        self.last_order = order
+        return None
+
+    def process_position(
+        self, reported_position: float, position: float
+    ) -> Optional[Tuple[float, float]]:
+        # Players without orders may still report a position that moves back when the song starts over
+        last_position = self.last_position
+        self.last_position = reported_position
+
+        if (
+            last_position is not None
+            and reported_position < last_position - POSITION_TOLERANCE
+        ):
+            return reported_position, position
+        return None
+
+
+class PlaybackWatchdog:
+    # Fades out songs that loop or play past the max duration, so songs that never end do not play forever
+    def __init__(
+        self,
+        samplerate: int,
+        max_duration: int,
+        loop_end: float = 0.0,
+        on_loop_found: Optional[Callable[[float, float], None]] = None,
+        fade_duration: float = FADE_DURATION,
+    ) -> None:
+        self.samplerate = samplerate
+        self.max_frames = int(max_duration * samplerate)
+        self.fade_frames = max(1, int(fade_duration * samplerate))
+        self.loop_end = loop_end
+        self.on_loop_found = on_loop_found
+
+        self.output_loops = OutputLoopDetector(samplerate)
+        self.position_loops = PositionLoopDetector()
+
+        # Frames rendered so far
+        self.frame: int = 0
+        self.fade_end: Optional[int] = self.get_fade_end()
+
+    def get_fade_end(self) -> Optional[int]:
+        ends = []
+        if self.max_frames:
+            ends.append(self.max_frames)
+        if self.loop_end:
+            # Known loops fade out over the start of the repeat
+            ends.append(int(self.loop_end * self.samplerate) + self.fade_frames)
+        return min(ends) if ends else None
+
+    def set_position(self, position: float) -> None:
+        self.frame = int(position * self.samplerate)
+        self.output_loops.reset(self.frame)
+        self.position_loops.reset()
+        self.fade_end = self.get_fade_end()
+
+    def process(
+        self,
+        buffer: bytes,
+        order: Optional[int] = None,
+        reported_position: Optional[float] = None,
+    ) -> Optional[bytes]:
+        # Returns the buffer to play, None once the song has to end
+        block_start = self.frame
+        self.frame += len(buffer) // BYTES_PER_FRAME
+
+        if self.fade_end is not None and block_start >= self.fade_end:
+            return None
+
+        if not self.loop_end:
+            position = block_start / self.samplerate
+
+            if order is not None:
+                # The order is read once per block, so it is only known to the block
+                loop = self.position_loops.process(order, position)
+            elif reported_position is not None:
+                loop = self.position_loops.process_position(reported_position, position)
+            else:
+                loop = None
+
+            if loop:
+                self.found_loop(*loop)
+            elif order is None:
+                repeat = self.output_loops.process(buffer)
+                if repeat:
+                    # Songs may repeat long parts on purpose, only a player starting over is remembered
+                    self.found_loop(*repeat, confirmed=False)
+
+        if self.fade_end is not None and self.frame > self.fade_end - self.fade_frames:
+            return self.fade(buffer, block_start)
+        return buffer
+
+    def found_loop(
+        self, loop_start: float, loop_end: float, confirmed: bool = True
+    ) -> None:
+        logger.debug(
+            "Song {} from {:.1f} to {:.1f} seconds",
+            "loops" if confirmed else "seems to repeat",
+            loop_start,
+            loop_end,
+        )
+        self.loop_end = loop_end
+
+        # The repeat is already playing, fade out from here
+        fade_end = self.frame + self.fade_frames
+        if self.fade_end is None or fade_end < self.fade_end:
+            self.fade_end = fade_end
+
+        if confirmed and self.on_loop_found:
+            self.on_loop_found(loop_start, loop_end)
+
+    def fade(self, buffer: bytes, block_start: int) -> bytes:
+        count = len(buffer) // BYTES_PER_FRAME
+        samples = np.frombuffer(buffer, dtype=np.int16, count=count * 2).reshape(-1, 2)
+        frames = np.arange(block_start, block_start + len(samples))
+        gains = np.clip((self.fade_end - frames) / self.fade_frames, 0.0, 1.0)
+
+        return (samples * gains[:, None].astype(np.float32)).astype(np.int16).tobytes()
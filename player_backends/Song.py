@@ -1,10 +1,14 @@
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional
 from player_backends.libuade.songinfo import Credits
+from player_backends.song_detail_store import SongDetails, get_song_detail_store
 import json
 
+DETAIL_FIELDS = ("message_raw", "warnings", "credits")
 
-@dataclass
+
+@dataclass(eq=False, slots=True)
 class Song:
     uid: str = field(default_factory=lambda: str(uuid.uuid4()))
     filename: str = ""
@@ -19,7 +23,6 @@ class Song:
     extensions: str = ""
     formatname: str = ""
     message: str = ""
-    message_raw: str = ""
     md5: str = ""
     modulebytes: int = 0
     originaltype: str = ""
@@ -32,26 +35,96 @@ class Song:
     tracker: str = ""
     type: str = ""
     type_long: str = ""
-    warnings: str = ""
-    credits: Credits = field(
-        default_factory=lambda: Credits(
-            song_title="",
-            artistname="",
-            file_length="",
-            file_name="",
-            file_prefix="",
-            max_positions=0,
-            modulename="",
-            specialinfo="",
-            instruments=[],
-        )
+    play_count: int = 0
+    # Where a song that never ends starts over, in seconds, 0 if not known
+    loop_start: float = 0.0
+    loop_end: float = 0.0
+
+    # Rarely needed and large, kept in the song detail store once a song is in a playlist
+    details: Optional[SongDetails] = field(
+        default=None, init=False, repr=False, compare=False
     )
+    details_dirty: bool = field(default=False, init=False, repr=False, compare=False)
+    details_stored: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Song):
+            return self.uid == other.uid
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.uid)
+
+    def get_details(self) -> SongDetails:
+        # Reads stored details without keeping them in memory
+        if self.details is not None:
+            return self.details
+
+        store = get_song_detail_store()
+        stored = store.get(self.uid) if store and self.details_stored else None
+        return stored or SongDetails()
+
+    def load_details(self) -> SongDetails:
+        if self.details is None:
+            self.details = self.get_details()
+        return self.details
+
+    def release_details(self) -> Optional[SongDetails]:
+        # Drops the details from memory, returns them if they have to be written to the store
+        details = self.details if self.details_dirty else None
+        if details is not None:
+            self.details_stored = True
+
+        self.details = None
+        self.details_dirty = False
+        return details
+
+    @property
+    def message_raw(self) -> str:
+        return self.load_details().message_raw
+
+    @message_raw.setter
+    def message_raw(self, value: str) -> None:
+        self.load_details().message_raw = value
+        self.details_dirty = True
+
+    @property
+    def warnings(self) -> str:
+        return self.load_details().warnings
+
+    @warnings.setter
+    def warnings(self, value: str) -> None:
+        self.load_details().warnings = value
+        self.details_dirty = True
+
+    @property
+    def credits(self) -> Credits:
+        return self.load_details().credits
+
+    @credits.setter
+    def credits(self, value: Credits) -> None:
+        self.load_details().credits = value
+        self.details_dirty = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        data.update(self.get_details().to_dict())
+        return data
 
     def to_json(self) -> str:
-        return json.dumps(self, default=lambda o: o.__dict__, indent=4)
+        return json.dumps(self.to_dict(), indent=4)
 
     @classmethod
     def from_json(cls, json_str: str) -> "Song":
-        data = json.loads(json_str)
+        return cls.from_dict(json.loads(json_str))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Song":
         # data["credits"] = Credits(**data["credits"])
-        return cls(**data)
+        data = dict(data)
+        details = {name: data.pop(name) for name in DETAIL_FIELDS if name in data}
+
+        song = cls(**data)
+        for name, value in details.items():
+            setattr(song, name, value)
+        return song
@@ -9,6 +9,9 @@ try:
 except OSError as e:
     sys.exit(f"Failed to load libgme: {e}")
 
+libgme.gme_identify_header.argtypes = [ctypes.c_void_p]
+libgme.gme_identify_header.restype = ctypes.c_char_p
+
 # Define ctypes structures and types
 class Music_Emu(ctypes.Structure):
     pass
@@ -1,4 +1,6 @@
 import ctypes
+from typing import Optional
+
 from loguru import logger
 
 from player_backends.player_backend import PlayerBackend
@@ -32,6 +34,12 @@ class PlayerBackendLibGME(PlayerBackend):
             return False
         return True
 
+    def probe_header(self, header: bytes, filename: str) -> Optional[bool]:
+        if len(header) < 4:
+            return None
+
+        return bool(libgme.gme_identify_header(header[:4]))
+
     def check_module(self) -> bool:
         file_type = ctypes.c_void_p()
 
@@ -75,7 +83,9 @@ class PlayerBackendLibGME(PlayerBackend):
         )
 
     def get_module_length(self) -> float:
-        self.prepare_playing(0)
+        # Only opened when asked before playing, reopening would start the track over
+        if not self.emulator:
+            self.prepare_playing(0)
         self.track_info = self._get_track_info(0)
 
         if not self.track_info:
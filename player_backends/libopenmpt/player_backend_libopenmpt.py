@@ -116,6 +116,34 @@ class PlayerBackendLibOpenMPT(PlayerBackend):
 
         return True
 
+    def probe_header(self, header: bytes, filename: str) -> Optional[bool]:
+        extension = filename.split(".")[-1].lower().encode()
+        if libopenmpt.openmpt_is_extension_supported(extension) == 0:
+            return False
+
+        error = ctypes.c_int()
+        error_message = ctypes.c_char_p()
+
+        result = libopenmpt.openmpt_probe_file_header(
+            libopenmpt.OPENMPT_PROBE_FILE_HEADER_FLAGS_DEFAULT,
+            header,
+            ctypes.c_size_t(len(header)),
+            # Total size is not known yet while downloading
+            ctypes.c_uint64(0xFFFFFFFFFFFFFFFF),
+            self.openmpt_log_func(log_callback),
+            None,
+            self.openmpt_error_func(error_callback),
+            None,
+            ctypes.byref(error),
+            ctypes.byref(error_message),
+        )
+
+        if result == libopenmpt.OPENMPT_PROBE_FILE_HEADER_RESULT_SUCCESS:
+            return True
+        elif result == libopenmpt.OPENMPT_PROBE_FILE_HEADER_RESULT_FAILURE:
+            return False
+        return None
+
     def load_module(self) -> bool:
         if not self.song:
             return False
@@ -183,6 +211,9 @@ class PlayerBackendLibOpenMPT(PlayerBackend):
     def get_position_seconds(self) -> float:
         return libopenmpt.openmpt_module_get_position_seconds(self.mod)
 
+    def get_current_order(self) -> Optional[int]:
+        return libopenmpt.openmpt_module_get_current_order(self.mod)
+
     def get_module_title(self) -> Optional[str]:
         return libopenmpt.openmpt_module_get_metadata(self.mod, b"title")
 
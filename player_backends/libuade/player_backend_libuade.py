@@ -1,4 +1,6 @@
 import ctypes
+import os
+from typing import Optional
 
 from player_backends.libuade import songinfo
 from player_backends.libuade.ctypes_classes import (
@@ -13,10 +15,10 @@ from player_backends.libuade.ctypes_classes import (
     uade_event_union,
     uade_notification,
     uade_song_info,
-    uade_state,
     uade_subsong_info,
 )
 from player_backends.libuade.ctypes_functions import libuade, libc
+from player_backends.libuade.uade_state_pool import get_uade_state_pool
 from loguru import logger
 
 from player_backends.player_backend import PlayerBackend
@@ -25,12 +27,32 @@ from player_backends.player_backend import PlayerBackend
 class PlayerBackendLibUADE(PlayerBackend):
     def __init__(self, name: str = "LibUADE") -> None:
         super().__init__(name)
-        self.state_ptr: ctypes._Pointer[uade_state] = libuade.uade_new_state(None)
+
+        # States are checked out of the shared pool when needed and returned once done
+        self.state_pool = get_uade_state_pool()
+        self.state_ptr: Optional[int] = None
+        self.playing: bool = False
         self.config_ptr: ctypes._Pointer[uade_config] = libuade.uade_new_config()
         # self.config = ctypes.cast(libuade.uade_new_config(), ctypes.POINTER(uade_config))
 
         logger.debug("PlayerBackendUADE initialized")
 
+    def acquire_state(self) -> int:
+        if not self.state_ptr:
+            owner = f"{self.name}: {self.song.filename if self.song else ''}"
+            self.state_ptr = self.state_pool.acquire(owner)
+        elif self.playing:
+            libuade.uade_stop(self.state_ptr)
+
+        self.playing = False
+        return self.state_ptr
+
+    def release_state(self) -> None:
+        if self.state_ptr:
+            self.state_pool.release(self.state_ptr, self.playing)
+            self.state_ptr = None
+            self.playing = False
+
     def check_module(self) -> bool:
         if not self.song:
             return False
@@ -48,26 +70,42 @@ class PlayerBackendLibUADE(PlayerBackend):
         libc.free(ret)
 
         ret = libuade.uade_play_from_buffer(
-            None, ret, self.module_size, -1, self.state_ptr
+            None, ret, self.module_size, -1, self.acquire_state()
         )
 
         if ret < 1:
             logger.warning(f"LibUADE is unable to play {self.song.filename}")
+            self.release_state()
             return False
 
+        self.playing = True
         return True
 
+    def probe_header(self, header: bytes, filename: str) -> Optional[bool]:
+        # UADE detects formats by file magic, falling back to name prefixes and extensions
+        state_ptr = self.state_ptr or self.state_pool.acquire(
+            f"{self.name}: {filename}"
+        )
+
+        try:
+            return bool(
+                libuade.uade_is_our_file_from_buffer(
+                    str.encode(os.path.basename(filename)),
+                    header,
+                    len(header),
+                    state_ptr,
+                )
+            )
+        finally:
+            if state_ptr != self.state_ptr:
+                self.state_pool.release(state_ptr)
+
     def prepare_playing(self, subsong_nr: int = -1) -> None:
         if not self.song:
             return
 
-        if self.state_ptr:
-            libuade.uade_cleanup_state(self.state_ptr)
-
-        self.state_ptr = libuade.uade_new_state(None)
-
-        if not self.state_ptr:
-            raise Exception("uade_state is NULL")
+        # A warm state from the pool, or the one check_module used, reset for this song
+        self.acquire_state()
 
         size = ctypes.c_size_t()
 
@@ -83,8 +121,11 @@ class PlayerBackendLibUADE(PlayerBackend):
         ):
             case -1:
                 # Fatal error
-                libuade.uade_cleanup_state(self.state_ptr)
+                self.state_pool.discard(self.state_ptr)
+                self.state_ptr = None
                 raise RuntimeError
+            case 1:
+                self.playing = True
             # case 0:
             #     # Not playable
             #     raise ValueError
@@ -216,9 +257,8 @@ class PlayerBackendLibUADE(PlayerBackend):
 
     def free_module(self) -> None:
         if self.state_ptr:
-            libuade.uade_cleanup_state(self.state_ptr)
-            self.state_ptr = libuade.uade_new_state(None)
-            logger.info("UADE instance deleted")
+            self.release_state()
+            logger.info("UADE state returned to the pool")
 
     def seek(self, position: int) -> None:
         songinfo: uade_song_info = libuade.uade_get_song_info(self.state_ptr).contents
@@ -235,10 +275,10 @@ class PlayerBackendLibUADE(PlayerBackend):
             logger.error("Seeking failed")
 
     def cleanup(self) -> None:
-        if self.state_ptr:
-            libuade.uade_cleanup_state(self.state_ptr)
+        self.release_state()
 
         if self.config_ptr:
             libc.free(self.config_ptr)
+            self.config_ptr = None
 
         logger.info("UADE cleaned up")
@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from player_backends.libuade.ctypes_functions import libuade
+
+
+class UADEStatePool:
+    # Every UADE state runs its own emulator process, keep a few warm ones around instead of starting new ones
+    def __init__(self, max_size: int = 2) -> None:
+        self.max_size = max(0, max_size)
+        self.idle: List[int] = []
+        self.lock = threading.Lock()
+
+        # Checked out states with who took them and when, anything left here on close is a leak
+        self.checked_out: Dict[int, Tuple[str, float]] = {}
+
+        self.created: int = 0
+        self.reused: int = 0
+        self.destroyed: int = 0
+
+    def acquire(self, owner: str = "") -> int:
+        with self.lock:
+            if self.idle:
+                state_ptr = self.idle.pop()
+                self.reused += 1
+            else:
+                state_ptr = 0
+
+        if not state_ptr:
+            state_ptr = libuade.uade_new_state(None)
+
+            if not state_ptr:
+                raise RuntimeError("uade_state is NULL")
+
+            with self.lock:
+                self.created += 1
+
+        with self.lock:
+            self.checked_out[state_ptr] = (owner, time.monotonic())
+        return state_ptr
+
+    def release(self, state_ptr: int, playing: bool = False) -> None:
+        with self.lock:
+            if self.checked_out.pop(state_ptr, None) is None:
+                logger.warning("Releasing a UADE state that was not checked out")
+
+        # Stopping the song resets the state for the next module, a state that fails to stop is not reused
+        if playing and libuade.uade_stop(state_ptr) != 0:
+            logger.warning("Could not stop UADE state, discarding it")
+            self.destroy(state_ptr)
+            return
+
+        with self.lock:
+            if len(self.idle) < self.max_size:
+                self.idle.append(state_ptr)
+                return
+
+        self.destroy(state_ptr)
+
+    def discard(self, state_ptr: int) -> None:
+        # For states left broken by a fatal error
+        with self.lock:
+            self.checked_out.pop(state_ptr, None)
+        self.destroy(state_ptr)
+
+    def destroy(self, state_ptr: int) -> None:
+        libuade.uade_cleanup_state(state_ptr)
+
+        with self.lock:
+            self.destroyed += 1
+
+    def set_max_size(self, max_size: int) -> None:
+        with self.lock:
+            self.max_size = max(0, max_size)
+            surplus = self.idle[self.max_size :]
+            del self.idle[self.max_size :]
+
+        for state_ptr in surplus:
+            self.destroy(state_ptr)
+
+    def get_leaks(self, min_age: float = 0.0) -> List[str]:
+        now = time.monotonic()
+
+        with self.lock:
+            return [
+                owner
+                for owner, acquired in self.checked_out.values()
+                if now - acquired >= min_age
+            ]
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "idle": len(self.idle),
+                "checked_out": len(self.checked_out),
+                "created": self.created,
+                "reused": self.reused,
+                "destroyed": self.destroyed,
+            }
+
+    def close(self) -> None:
+        for owner in self.get_leaks():
+            logger.warning(f"UADE state still checked out on close: {owner}")
+
+        with self.lock:
+            idle = self.idle
+            self.idle = []
+
+        for state_ptr in idle:
+            self.destroy(state_ptr)
+
+        logger.debug(f"UADE state pool closed: {self.get_stats()}")
+
+
+shared_pool: Optional[UADEStatePool] = None
+shared_pool_lock = threading.Lock()
+
+
+def get_uade_state_pool() -> UADEStatePool:
+    global shared_pool
+
+    with shared_pool_lock:
+        if shared_pool is None:
+            shared_pool = UADEStatePool()
+        return shared_pool
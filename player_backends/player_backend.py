@@ -25,6 +25,10 @@ class PlayerBackend:
     def check_module(self) -> bool:
         return False
 
+    def probe_header(self, header: bytes, filename: str) -> Optional[bool]:
+        # Called with the first bytes of a download, None means the header alone is not conclusive
+        return None
+
     def prepare_playing(self, subsong_nr: int = -1) -> None:
         pass
 
@@ -40,6 +44,10 @@ class PlayerBackend:
     def get_position_seconds(self) -> float:
         return 0.0
 
+    def get_current_order(self) -> Optional[int]:
+        # Position in the order list for players that have one
+        return None
+
     def get_current_subsong(self) -> int:
         return self.current_subsong
 
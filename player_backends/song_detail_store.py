@@ -0,0 +1,124 @@
+import json
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+from loguru import logger
+
+from player_backends.libuade.songinfo import Credits
+
+if TYPE_CHECKING:
+    from player_backends.Song import Song
+
+
+def create_empty_credits() -> Credits:
+    return Credits(
+        song_title="",
+        artistname="",
+        file_length="",
+        file_name="",
+        file_prefix="",
+        max_positions=0,
+        modulename="",
+        specialinfo="",
+        instruments=[],
+    )
+
+
+@dataclass(slots=True)
+class SongDetails:
+    message_raw: str = ""
+    warnings: str = ""
+    credits: Credits = field(default_factory=create_empty_credits)
+
+    def is_empty(self) -> bool:
+        return self == SongDetails()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SongDetailStore:
+    # Heavy song fields by uid, so playlists, history and the queue only keep compact songs in memory
+    def __init__(self, filename: str, batch_size: int = 256) -> None:
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS song_details (uid TEXT PRIMARY KEY, details TEXT NOT NULL)"
+        )
+        self.connection.commit()
+        self.lock = threading.Lock()
+
+        # Written in batches, a playlist import releases thousands of songs in a row
+        self.batch_size = batch_size
+        self.pending: Dict[str, Optional[SongDetails]] = {}
+
+    def get(self, uid: str) -> Optional[SongDetails]:
+        with self.lock:
+            if uid in self.pending:
+                return self.pending[uid]
+
+            row = self.connection.execute(
+                "SELECT details FROM song_details WHERE uid = ?", (uid,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        try:
+            return SongDetails(**json.loads(row[0]))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not read stored details of song {uid}: {e}")
+            return None
+
+    def offload(self, songs: Iterable["Song"]) -> None:
+        with self.lock:
+            for song in songs:
+                details = song.release_details()
+
+                # Empty details are not worth a row, a missing one reads back as empty
+                if details is not None:
+                    self.pending[song.uid] = None if details.is_empty() else details
+
+            if len(self.pending) >= self.batch_size:
+                self.write_pending()
+
+    def flush(self) -> None:
+        with self.lock:
+            self.write_pending()
+
+    def write_pending(self) -> None:
+        if not self.pending:
+            return
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO song_details (uid, details) VALUES (?, ?)",
+                [
+                    (uid, json.dumps(details.to_dict()))
+                    for uid, details in self.pending.items()
+                    if details is not None
+                ],
+            )
+            self.connection.executemany(
+                "DELETE FROM song_details WHERE uid = ?",
+                [(uid,) for uid, details in self.pending.items() if details is None],
+            )
+        self.pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+
+song_detail_store: Optional[SongDetailStore] = None
+
+
+def get_song_detail_store() -> Optional[SongDetailStore]:
+    return song_detail_store
+
+
+def set_song_detail_store(store: Optional[SongDetailStore]) -> None:
+    global song_detail_store
+    song_detail_store = store
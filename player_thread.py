@@ -1,51 +1,150 @@
-from typing import Optional
+import time
+from typing import Callable, Optional
 
 import debugpy
 from loguru import logger
 from PySide6.QtCore import QThread, Signal
 
 from audio_backends.audio_backend import AudioBackend
-from player_backends.player_backend import PlayerBackend
+from latency_metrics import (
+    BACKEND,
+    FIRST_AUDIO,
+    FIRST_CHUNK,
+    FIRST_WRITE,
+    PREPARE,
+    get_latency_metrics,
+)
+from playback_watchdog import PlaybackWatchdog
+from player_backends.player_backend import PlayerBackend, Song
+from silence_detector import END, SKIP, SilenceDetector
+
+# Frames per audio write, small enough that stopping never waits for a whole buffer to play
+WRITE_SLICE_FRAMES = 1024
+BYTES_PER_FRAME = 4
 
 
 class PlayerThread(QThread):
     position_changed = Signal(int, int)  # Signal to emit position and length
     song_finished = Signal()  # Signal to emit when song is finished
+    # Emitted with the thread once the first chunk has been written
+    playback_started = Signal(object)
+    playback_failed = Signal(object, str)
+    subsong_changed = Signal(int, int)
+    song_name_changed = Signal(str)
 
     def __init__(
         self,
-        player_backend: PlayerBackend,
-        audio_backend: AudioBackend,
+        song: Song,
+        player_backend_class: type[PlayerBackend],
+        audio_backend: Optional[AudioBackend],
+        audio_backend_factory: Callable[[], AudioBackend],
+        previous_thread: Optional["PlayerThread"] = None,
+        silence_detector: Optional[SilenceDetector] = None,
+        watchdog: Optional[PlaybackWatchdog] = None,
         parent: Optional[QThread] = None,
     ) -> None:
         super().__init__(parent)
-        self.player_backend: PlayerBackend = player_backend
-        self.audio_backend: AudioBackend = audio_backend
+        self.song = song
+        self.player_backend_class = player_backend_class
+        self.player_backend: Optional[PlayerBackend] = None
+        self.audio_backend: Optional[AudioBackend] = audio_backend
+        self.audio_backend_factory = audio_backend_factory
+        self.previous_thread = previous_thread
+        self.silence_detector = silence_detector
+        self.watchdog = watchdog
         self.stop_flag: bool = False
         self.pause_flag: bool = False
+
+        self.metrics = get_latency_metrics()
+        self.requested_at: float = time.perf_counter()
+        self.time_to_first_audio: Optional[float] = None
         logger.debug("PlayerThread initialized")
 
     def run(self) -> None:
         # debugpy.debug_this_thread()
-        self.player_backend.prepare_playing()
 
-        module_length: float = self.player_backend.get_module_length()
-        logger.debug("Module length: {} seconds", module_length)
+        # The previous thread writes to the same audio stream, let it finish its last chunk
+        if self.previous_thread is not None:
+            self.previous_thread.wait()
+            if self.audio_backend is None:
+                self.audio_backend = self.previous_thread.audio_backend
+            self.previous_thread = None
+
+        if self.stop_flag:
+            return
+
+        # Loading the module and opening the audio stream stay off the GUI thread
+        try:
+            with self.metrics.measure(BACKEND):
+                self.player_backend = self.player_backend_class(self.song.backend_name)
+            self.player_backend.song = self.song
+            self.player_backend.set_subsong_changed_callback(self.subsong_changed.emit)
+            self.player_backend.set_song_name_changed_callback(
+                self.song_name_changed.emit
+            )
+
+            with self.metrics.measure(PREPARE):
+                self.player_backend.prepare_playing()
+                # Read before rendering, some backends start the module over for it
+                module_length: float = self.player_backend.get_module_length()
+            logger.debug("Module length: {} seconds", module_length)
+
+            if self.audio_backend is None:
+                self.audio_backend = self.audio_backend_factory()
+        except Exception as e:
+            logger.error(f'Could not start playing "{self.song.filename}": {e}')
+
+            # Pooled emulator states and native allocations go back right away
+            if self.player_backend:
+                self.player_backend.cleanup()
+            self.playback_failed.emit(self, str(e))
+            return
+
+        self.skip_known_silence()
 
         count: int = 0
+        first_chunk_recorded: bool = False
 
         while not self.stop_flag:
             if self.pause_flag:
                 self.msleep(100)  # Sleep for a short time to avoid busy-waiting
                 continue
 
+            chunk_started = time.perf_counter()
             count, buffer = self.player_backend.read_chunk(
                 self.audio_backend.samplerate, self.audio_backend.buffersize
             )
+            if self.time_to_first_audio is None and not first_chunk_recorded:
+                self.metrics.record(FIRST_CHUNK, time.perf_counter() - chunk_started)
+                first_chunk_recorded = True
+
             if count == 0:
                 logger.debug("End of module reached")
+                if self.silence_detector:
+                    self.silence_detector.finished()
                 break
-            self.audio_backend.write(buffer)
+
+            if self.watchdog:
+                buffer = self.watchdog.process(
+                    buffer,
+                    self.player_backend.get_current_order(),
+                    self.player_backend.get_position_seconds(),
+                )
+                if buffer is None:
+                    logger.debug("Song has looped or reached the max duration")
+                    count = 0
+                    break
+
+            if self.silence_detector:
+                action = self.silence_detector.process(buffer)
+                if action == SKIP:
+                    continue
+                if action == END:
+                    logger.debug("Trailing silence reached, ending song")
+                    count = 0
+                    break
+
+            self.write_audio(buffer)
 
             # Emit position changed signal
             current_position: float = self.player_backend.get_position_seconds()
@@ -60,6 +159,45 @@ class PlayerThread(QThread):
         self.player_backend.free_module()
         logger.debug("Playback stopped")
 
+    def skip_known_silence(self) -> None:
+        # Leading silence found on an earlier play is seeked over instead of rendered
+        if not self.silence_detector:
+            return
+
+        start_position = self.silence_detector.get_start_position()
+        if start_position <= 0:
+            return
+
+        try:
+            self.player_backend.seek(start_position)
+        except Exception as e:
+            logger.warning(f"Could not skip leading silence: {e}")
+            return
+
+        self.silence_detector.set_position(start_position)
+        if self.watchdog:
+            self.watchdog.set_position(start_position)
+        logger.debug("Skipped {} seconds of leading silence", start_position)
+
+    def write_audio(self, buffer: bytes) -> None:
+        slice_size = WRITE_SLICE_FRAMES * BYTES_PER_FRAME
+
+        for offset in range(0, len(buffer), slice_size):
+            if self.stop_flag:
+                return
+
+            write_started = time.perf_counter()
+            self.audio_backend.write(buffer[offset : offset + slice_size])
+
+            if self.time_to_first_audio is None:
+                self.time_to_first_audio = time.perf_counter() - self.requested_at
+                self.metrics.record(FIRST_WRITE, time.perf_counter() - write_started)
+                self.metrics.record(FIRST_AUDIO, self.time_to_first_audio)
+                logger.debug(
+                    "Time to first audio: {:.1f} ms", self.time_to_first_audio * 1000
+                )
+                self.playback_started.emit(self)
+
     def stop(self) -> None:
         logger.debug("Stop signal received")
         self.stop_flag = True
@@ -70,4 +208,9 @@ class PlayerThread(QThread):
 
     def seek(self, position: int) -> None:
         logger.debug("Seeking to position: {}", position)
-        self.player_backend.seek(position)
+        if self.player_backend:
+            self.player_backend.seek(position)
+            if self.silence_detector:
+                self.silence_detector.set_position(position)
+            if self.watchdog:
+                self.watchdog.set_position(position)
@@ -1,24 +1,54 @@
+import os
 import tempfile
-from typing import Optional, Dict
+import time
+from typing import Optional, Dict, Tuple
 
 from loguru import logger
+from platformdirs import user_cache_dir
 from PySide6.QtCore import Slot, QObject, Signal, QTimer
 
 from audio_backends.pyaudio.audio_backend_pyuadio import AudioBackendPyAudio
-from loaders.modarchive_random_module_fetcher import ModArchiveRandomModuleFetcherThread
+from cache.artist_catalogue import ArtistCatalogue
+from cache.favorites_cache import FavoritesCache
+from cache.lookup_cache import LookupCache
+from cache.module_metadata_cache import (
+    CandidateFilter,
+    ModuleMetadata,
+    ModuleMetadataCache,
+)
+from cache.module_cache import ModuleCache
+from cache.silence_cache import SilenceCache
+from latency_metrics import PLAY_TO_AUDIO, get_latency_metrics
+from loaders.modarchive_random_module_fetcher import ModArchiveRandomModuleFetcher
+from network_engine import CancellationToken, NetworkEngine, NetworkJob, Priority
 from playing_settings import PlayingSettings
-from playing_modes import LocalSource, PlayingMode, PlayingSource, ModArchiveSource
+from prefetch_policy import PrefetchPolicy
+from playing_modes import (
+    LocalSource,
+    PlayingMode,
+    PlayingSource,
+    ModArchiveSource,
+    ShuffleMode,
+)
 from loaders.module_loader import ModuleLoader
+from playlist.history_playlist import HistoryPlaylist
 from playlist.playlist import Playlist
 from player_backends.player_backend import PlayerBackend, Song
+from player_backends.song_detail_store import SongDetailStore, set_song_detail_store
+from playback_watchdog import PlaybackWatchdog
 from player_thread import PlayerThread
 from playlist.playlist_manager import PlaylistManager
+from playlist.shuffle import ShuffleEngine
 from queue_manager import QueueManager
 from settings_manager import SettingsManager
+from silence_detector import SilenceBoundaries, SilenceDetector
 from ui_manager import UIManager
 from web_helper import WebHelper
 
 
+SAMPLERATE = 44100
+
+
 class PlayingEngine(QObject):
     set_window_title = Signal(str)
 
@@ -37,122 +67,265 @@ class PlayingEngine(QObject):
         self.player_backend: Optional[PlayerBackend] = None
         self.audio_backend: Optional[AudioBackendPyAudio] = None
         self.player_thread: Optional[PlayerThread] = None
-        self.random_module_fetcher_threads: list[
-            ModArchiveRandomModuleFetcherThread
-        ] = []
+        self.current_song: Optional[Song] = None
+
+        # All ModArchive traffic runs on the network engine, cancelled as a whole when the playing mode changes
+        self.network_engine = NetworkEngine(
+            background_bandwidth=self.settings_manager.get_background_bandwidth() * 1024
+        )
+        self.cancellation_token = CancellationToken()
+        self.fetch_jobs: Dict[str, NetworkJob] = {}
+
+        # Per stage latency histograms, dumped to the cache directory on close
+        self.latency_metrics = get_latency_metrics()
+
+        # Song uid and time play was requested, kept while the song is still loading
+        self.play_request: Optional[Tuple[str, float]] = None
 
         self.song_waiting_for_playback: Optional[Song] = None
+        self.play_when_ready: bool = False
         self.current_module_is_favorite: bool = False
 
         self.local_file: str = ""
 
+        self.temp_dir = tempfile.mkdtemp()
+
+        # Heavy song fields are swapped out to disk for the session, playlists still save them in full
+        self.song_detail_store = SongDetailStore(
+            os.path.join(self.temp_dir, "song_details.db")
+        )
+        set_song_detail_store(self.song_detail_store)
+
         self.playing_settings = PlayingSettings(self.settings_manager)
         self.playlist_manager = PlaylistManager(self.settings_manager)
-        self.history_playlist = self.playlist_manager.new_playlist("History")
+
+        # Only the most recent songs stay in memory, older ones are spilled to a log for the session
+        self.history_playlist = HistoryPlaylist(
+            os.path.join(self.temp_dir, "history.log"),
+            self.settings_manager.get_history_window_size(),
+        )
+        self.history_playlist.tab_index = self.playlist_manager.get_new_tab_index()
+        self.playlist_manager.add_playlist(self.history_playlist)
 
         self.playlist_manager.load_playlists()
 
         self.queue_manager = QueueManager(self.history_playlist)
 
-        self.web_helper = WebHelper()
+        # Local playlists are shuffled one song at a time, never copied in shuffled order
+        self.shuffle_engine = ShuffleEngine(self.playing_settings.shuffle_mode)
 
-        self.temp_dir = tempfile.mkdtemp()
+        self.web_helper = WebHelper(base_url=os.environ.get("MODARCHIVE_BASE_URL"))
+
+        self.cache_dir = user_cache_dir(self.settings_manager.get_app_name())
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.module_cache = ModuleCache(
+            os.path.join(self.cache_dir, "modules"),
+            self.settings_manager.get_module_cache_size() * 1024 * 1024,
+        )
+
+        # Random picks known to be unwanted are skipped before they are downloaded
+        self.module_metadata_cache = ModuleMetadataCache(self.cache_dir)
+        self.web_helper.metadata_cache = self.module_metadata_cache
+
+        self.silence_cache = SilenceCache(self.cache_dir)
+
+        self.favorites_cache = FavoritesCache(
+            self.web_helper, self.network_engine, self.cache_dir
+        )
+        self.favorites_cache.favorites_updated.connect(self.on_favorites_updated)
+
+        self.artist_catalogue = ArtistCatalogue(
+            self.web_helper, self.network_engine, self.cache_dir
+        )
+
+        self.lookup_cache = LookupCache(
+            self.web_helper, self.network_engine, self.cache_dir
+        )
 
         self.module_loader = ModuleLoader(
             self.playing_settings,
             self.local_file,
-            WebHelper(),
+            self.web_helper,
             self.temp_dir,
             self.player_backends,
+            self.network_engine,
+            self.module_cache,
         )
 
+        self.module_loader.song_loaded.connect(self.on_module_loaded)
+        self.module_loader.song_load_failed.connect(self.on_module_load_failed)
+        self.module_loader.download_progress.connect(self.on_download_progress)
+
+        # Random modules that are being fetched, downloaded and probed, with their start time
+        self.prefetch_started: Dict[str, float] = {}
+        self.prefetch_policy = PrefetchPolicy(self.settings_manager.get_prefetch_depth())
+
         self.queue_check_timer = QTimer(self)
         self.queue_check_timer.timeout.connect(self.check_queue)
 
     def get_current_song(self) -> Optional[Song]:
+        return self.current_song
+
+    def create_audio_backend(self) -> AudioBackendPyAudio:
+        # Called on the player thread, opening the stream can take a while
+        return AudioBackendPyAudio(SAMPLERATE, self.settings_manager.get_audio_buffer())
+
+    def create_silence_detector(self, song: Song) -> Optional[SilenceDetector]:
+        trailing_silence = self.settings_manager.get_trailing_silence()
+        skip_leading_silence = self.settings_manager.get_skip_leading_silence()
+        if not trailing_silence and not skip_leading_silence:
+            return None
+
+        sha1 = song.sha1
+
+        def store_boundaries(boundaries: SilenceBoundaries) -> None:
+            self.silence_cache.store(sha1, boundaries)
+
+        return SilenceDetector(
+            SAMPLERATE,
+            trailing_silence,
+            self.silence_cache.get(sha1) if sha1 else None,
+            store_boundaries if sha1 else None,
+            skip_leading_silence=skip_leading_silence,
+        )
+
+    def create_watchdog(self, song: Song) -> PlaybackWatchdog:
+        def store_loop(loop_start: float, loop_end: float) -> None:
+            # Kept in the song record, the next play fades out where the song starts over
+            song.loop_start = loop_start
+            song.loop_end = loop_end
+
+        return PlaybackWatchdog(
+            SAMPLERATE,
+            self.settings_manager.get_max_play_time(),
+            song.loop_end,
+            store_loop,
+        )
+
+    @Slot(object)
+    def on_playback_started(self, player_thread: PlayerThread) -> None:
+        # Ignore threads that have been replaced while starting up
+        if player_thread is not self.player_thread:
+            return
+
+        self.player_backend = player_thread.player_backend
+        self.audio_backend = player_thread.audio_backend
+        logger.debug("Module loaded and playing")
+
+        if (
+            self.play_request
+            and self.play_request[0] == player_thread.song.uid
+            and player_thread.time_to_first_audio is not None
+        ):
+            first_audio = player_thread.requested_at + player_thread.time_to_first_audio
+            self.latency_metrics.record(
+                PLAY_TO_AUDIO, first_audio - self.play_request[1]
+            )
+            self.play_request = None
+
         if self.player_backend:
-            return self.player_backend.song
+            self.ui_manager.update_subsong_info(
+                self.player_backend.get_current_subsong() + 1,
+                player_thread.song.subsongs,
+            )
+
+    @Slot(object, str)
+    def on_playback_failed(self, player_thread: PlayerThread, error: str) -> None:
+        if player_thread is not self.player_thread:
+            return
+
+        logger.error(f"Playback failed: {error}")
+        self.ui_manager.set_play_button_icon("play")
+        self.ui_manager.set_stopped()
 
     def play_module(self, song: Optional[Song]) -> None:
         if song:
+            if self.play_request is None or self.play_request[0] != song.uid:
+                self.play_request = (song.uid, time.perf_counter())
+
+            if (
+                song.is_ready
+                and song.modarchive_id
+                and not os.path.exists(song.filename)
+            ):
+                # Downloaded file has been evicted from the module cache, fetch it again
+                logger.debug("Module file is gone, loading it again")
+                song.is_ready = False
+                self.load_module(song, Priority.NOW_PLAYING)
+
             if song.is_ready:
-                self.stop()
+                # The new thread waits for the old one, so switching songs never blocks the GUI thread
+                self.stop(wait=False)
 
                 logger.debug("Playing module")
 
-                if self.audio_backend is None:
-                    self.audio_backend = AudioBackendPyAudio(
-                        44100, self.settings_manager.get_audio_buffer()
-                    )
-
                 filename = song.filename
                 if filename is None:
                     raise ValueError("Module entry does not contain a filename")
 
-                # Create player backend from backend name in song info
-                self.player_backend = self.player_backends[song.backend_name](
-                    song.backend_name
+                self.current_song = song
+                song.play_count += 1
+                self.playlist_manager.song_changed(song)
+
+                module_title: str = song.title or "Unknown"
+                module_message: str = song.message or ""
+                self.ui_manager.update_title_label(module_title)
+
+                filename = filename.split("/")[-1]
+
+                self.ui_manager.update_filename_label(f'<a href="#">{filename}</a>')
+                self.ui_manager.update_player_backend_label(song.backend_name)
+                self.set_window_title.emit(module_title)
+                self.ui_manager.set_message_label(module_message)
+
+                # Backend creation, module loading and opening the audio stream happen on the player thread
+                player_thread = PlayerThread(
+                    song,
+                    self.player_backends[song.backend_name],
+                    self.audio_backend,
+                    self.create_audio_backend,
+                    self.player_thread,
+                    self.create_silence_detector(song),
+                    self.create_watchdog(song),
                 )
+                player_thread.playback_started.connect(self.on_playback_started)
+                player_thread.playback_failed.connect(self.on_playback_failed)
+                player_thread.song_finished.connect(self.on_playing_finished)
+                player_thread.position_changed.connect(self.ui_manager.update_progress)
+                player_thread.subsong_changed.connect(
+                    self.ui_manager.update_subsong_info
+                )
+                player_thread.song_name_changed.connect(
+                    self.ui_manager.update_title_label
+                )
+                self.player_thread = player_thread
+                self.player_thread.start()
 
-                if self.player_backend is not None and self.audio_backend is not None:
-                    self.player_backend.song = song
-                    self.player_backend.set_subsong_changed_callback(
-                        self.ui_manager.update_subsong_info
-                    )
-                    self.player_backend.set_song_name_changed_callback(
-                        self.ui_manager.update_title_label
-                    )
-
-                    module_title: str = song.title or "Unknown"
-                    module_message: str = song.message or ""
-                    self.ui_manager.update_title_label(module_title)
-
-                    filename = filename.split("/")[-1]
+                self.ui_manager.set_play_button_icon("pause")
+                self.ui_manager.set_playing()
+                self.ui_manager.show_tray_notification("Now Playing", module_title)
 
-                    self.ui_manager.update_filename_label(f'<a href="#">{filename}</a>')
-                    self.ui_manager.update_player_backend_label(
-                        self.player_backend.name
-                    )
-                    self.set_window_title.emit(module_title)
-                    self.ui_manager.set_message_label(module_message)
+                # Have the lookup links ready before they are clicked
+                self.lookup_cache.prefetch(song)
 
-                    self.player_thread = PlayerThread(
-                        self.player_backend, self.audio_backend
-                    )
-                    self.player_thread.song_finished.connect(self.on_playing_finished)
-                    self.player_thread.position_changed.connect(
-                        self.ui_manager.update_progress
+                if self.playing_settings.playing_source == PlayingSource.MODARCHIVE:
+                    self.ui_manager.show_favorite_button(True)
+                    self.current_module_is_favorite = self.check_favorite(
+                        self.settings_manager.get_member_id()
                     )
-                    self.player_thread.start()
-
-                    self.ui_manager.set_play_button_icon("pause")
-                    self.ui_manager.set_playing()
-                    self.ui_manager.show_tray_notification("Now Playing", module_title)
-                    logger.debug("Module loaded and playing")
-                    self.ui_manager.update_subsong_info(
-                        self.player_backend.get_current_subsong() + 1,
-                        self.player_backend.song.subsongs,
-                    )
-
-                    if self.playing_settings.playing_source == PlayingSource.MODARCHIVE:
-                        self.ui_manager.show_favorite_button(True)
-                        self.current_module_is_favorite = self.check_favorite(
-                            self.settings_manager.get_member_id()
-                        )
-                    elif self.playing_settings.playing_source == PlayingSource.LOCAL:
-                        self.ui_manager.show_favorite_button(False)
-
-                        if self.playing_settings.local_source == LocalSource.PLAYLIST:
-                            song = self.get_current_song()
-                            if self.playlist_manager.current_playlist and song:
-                                self.playlist_manager.current_playlist.set_current_song(
-                                    song
-                                )
-                else:
-                    raise ValueError("No player backend loaded")
+                elif self.playing_settings.playing_source == PlayingSource.LOCAL:
+                    self.ui_manager.show_favorite_button(False)
+
+                    if self.playing_settings.local_source == LocalSource.PLAYLIST:
+                        if self.playlist_manager.current_playlist:
+                            self.playlist_manager.current_playlist.set_current_song(
+                                song
+                            )
             else:
                 logger.debug("Module not ready, waiting for module to load")
                 self.song_waiting_for_playback = song
+                self.set_song_priority(song, Priority.NOW_PLAYING)
         else:
             logger.error("No module to play")
 
@@ -163,17 +336,16 @@ class PlayingEngine(QObject):
         else:
             self.play_queue()
 
-    def stop(self, close_audio_stream: bool = False) -> None:
+    def stop(self, close_audio_stream: bool = False, wait: bool = True) -> None:
         if self.player_thread:
             logger.debug("Stopping player thread")
             self.player_thread.stop()
-            if not self.player_thread.wait(5000):
+
+            # The thread frees the module itself once it leaves its loop
+            if wait and not self.player_thread.wait(5000):
                 self.player_thread.terminate()
                 self.player_thread.wait()
 
-            if self.player_backend:
-                self.player_backend.free_module()
-
             self.ui_manager.set_play_button_icon("play")
             self.ui_manager.set_stopped()
             logger.debug("Player thread stopped")
@@ -183,16 +355,16 @@ class PlayingEngine(QObject):
             self.audio_backend = None
 
     def check_favorite(self, member_id: int) -> bool:
-        # Check if the module is the current members favorite
-        member_favorites_id_list = self.web_helper.get_member_module_id_list(member_id)
-
+        # Check if the module is the current members favorite, the cached favorites are refreshed in the background
         is_favorite = False
 
         song = self.get_current_song()
 
         if song:
             if song.modarchive_id:
-                is_favorite = song.modarchive_id in member_favorites_id_list
+                is_favorite = bool(
+                    self.favorites_cache.is_favorite(member_id, song.modarchive_id)
+                )
                 self.ui_manager.set_favorite_button_state(is_favorite)
 
                 if is_favorite:
@@ -200,7 +372,33 @@ class PlayingEngine(QObject):
 
         return is_favorite
 
+    @Slot(int)
+    def on_favorites_updated(self, member_id: int) -> None:
+        if (
+            member_id == self.settings_manager.get_member_id()
+            and self.playing_settings.playing_source == PlayingSource.MODARCHIVE
+        ):
+            self.current_module_is_favorite = self.check_favorite(member_id)
+
     def play_queue(self) -> None:
+        if self.is_prefetching():
+            # Play whichever module of the pool is ready first
+            ready_song = self.queue_manager.get_first_ready_song()
+
+            if not ready_song:
+                logger.debug("No module ready yet, playing the first one to finish loading")
+                self.play_when_ready = True
+
+                # Someone is waiting now, pending prefetches are no longer speculative
+                for song in self.queue_manager.queue:
+                    self.set_song_priority(song, Priority.NOW_PLAYING)
+
+                self.populate_queue()
+                return
+
+            self.play_when_ready = False
+            self.queue_manager.prioritize_song(ready_song)
+
         song = self.queue_manager.pop_next_song()
 
         if song:
@@ -213,15 +411,37 @@ class PlayingEngine(QObject):
                 if song:
                     self.play_module(song)
 
+        if self.is_prefetching():
+            self.populate_queue()
+
+    def is_prefetching(self) -> bool:
+        return (
+            self.playing_settings.playing_source == PlayingSource.MODARCHIVE
+            and self.playing_settings.playing_mode == PlayingMode.RANDOM
+        )
+
+    def is_shuffling(self) -> bool:
+        return (
+            self.playing_settings.playing_source == PlayingSource.LOCAL
+            and self.playing_settings.local_source == LocalSource.PLAYLIST
+            and self.playing_settings.shuffle_mode != ShuffleMode.OFF
+        )
+
     @Slot()
     def on_playing_finished(self) -> None:
+        # Loop points found while playing are kept with the song
+        if self.current_song:
+            self.playlist_manager.song_changed(self.current_song)
         self.play_next()
 
     def play_next(self) -> None:
         self.play_queue()
 
     def play_previous(self) -> None:
-        if self.playing_settings.playing_mode == PlayingMode.RANDOM:
+        if (
+            self.playing_settings.playing_mode == PlayingMode.RANDOM
+            or self.is_shuffling()
+        ):
             self.queue_manager.clear()
             previous_song = self.history_playlist.get_previous_song()
 
@@ -243,6 +463,11 @@ class PlayingEngine(QObject):
         self.set_local_source(LocalSource.PLAYLIST)
         self.set_playing_source(PlayingSource.LOCAL)
         if songs:
+            if self.playing_settings.shuffle_mode != ShuffleMode.OFF:
+                # Songs after the clicked one are picked by the shuffle engine
+                songs = songs[:1]
+                self.shuffle_engine.mark_played(playlist, songs[0])
+
             self.queue_manager.set_queue(songs)
             self.playlist_manager.set_current_playlist(playlist)
             self.play_queue()
@@ -250,21 +475,56 @@ class PlayingEngine(QObject):
     def populate_queue(self) -> None:
         if self.playing_settings.playing_source == PlayingSource.MODARCHIVE:
             if self.playing_settings.playing_mode == PlayingMode.RANDOM:
-                song = Song()
-                self.get_random_module(song)
-                self.queue_manager.add_song(song)
+                self.fill_prefetch_pool()
         elif self.playing_settings.playing_source == PlayingSource.LOCAL:
             if self.playing_settings.local_source == LocalSource.PLAYLIST:
                 current_playlist = self.playlist_manager.current_playlist
 
                 if current_playlist:
+                    if self.is_shuffling():
+                        song = self.shuffle_engine.next_song(current_playlist)
+
+                        if song:
+                            self.queue_manager.add_song(song)
+                        return
+
                     songs = current_playlist.songs
 
                     if len(songs) > 0:
                         self.queue_manager.add_songs(songs)
 
+    def fill_prefetch_pool(self) -> None:
+        # The queue holds both ready modules and the ones still in flight
+        missing = self.prefetch_policy.get_missing(len(self.queue_manager.queue))
+
+        if missing > 0:
+            logger.debug(
+                f"Prefetching {missing} random modules, target depth: {self.prefetch_policy.get_target_depth()}"
+            )
+
+        for _ in range(missing):
+            song = Song()
+            self.prefetch_started[song.uid] = time.monotonic()
+            self.queue_manager.add_song(song)
+            self.get_random_module(song)
+
     def get_random_module(self, song) -> None:
-        random_module_fetcher_thread = ModArchiveRandomModuleFetcherThread(
+        favorite_ids: list[int] = []
+        artist_ids: list[int] = []
+
+        match self.playing_settings.modarchive_source:
+            case ModArchiveSource.FAVORITES:
+                favorite_ids = self.favorites_cache.get_ids(
+                    self.settings_manager.get_member_id()
+                )
+            case ModArchiveSource.ARTIST:
+                artist_ids = self.artist_catalogue.get_ids(
+                    self.ui_manager.get_artist_input()
+                )
+
+        priority = self.get_song_priority(song)
+
+        random_module_fetcher = ModArchiveRandomModuleFetcher(
             song,
             self.playing_settings.playing_mode,
             self.playing_settings.playing_source,
@@ -272,25 +532,50 @@ class PlayingEngine(QObject):
             self.web_helper,
             self.ui_manager.get_artist_input(),
             self.settings_manager.get_member_id(),
+            favorite_ids,
+            artist_ids,
+            self.module_metadata_cache,
+            self.get_candidate_filter(),
+        )
+
+        self.fetch_jobs[song.uid] = self.network_engine.submit(
+            random_module_fetcher.fetch_random_module,
+            token=self.cancellation_token,
+            priority=priority,
+            on_finished=self.on_random_module_fetched,
+            on_failed=lambda error: self.on_module_load_failed(song),
         )
 
-        random_module_fetcher_thread.module_fetched.connect(
-            self.on_random_module_fetched
+    def get_candidate_filter(self) -> CandidateFilter:
+        return CandidateFilter(
+            self.settings_manager.get_max_duration(),
+            self.settings_manager.get_max_module_size() * 1024,
+            self.settings_manager.get_excluded_formats(),
         )
-        self.random_module_fetcher_threads.append(random_module_fetcher_thread)
-        random_module_fetcher_thread.start()
+
+    def get_song_priority(self, song: Song) -> Priority:
+        if self.play_when_ready or self.song_waiting_for_playback is song:
+            return Priority.NOW_PLAYING
+        if self.queue_manager.peek_next_song() is song:
+            return Priority.NEXT
+        return Priority.PREFETCH
+
+    def set_song_priority(self, song: Song, priority: Priority) -> None:
+        fetch_job = self.fetch_jobs.get(song.uid)
+        if fetch_job:
+            self.network_engine.set_priority(fetch_job, priority)
+        self.module_loader.set_priority(song, priority)
 
     @Slot(Song)
     def on_random_module_fetched(self, song: Song) -> None:
         logger.debug(f"Random module fetched, ModArchive ID: {song.modarchive_id}")
-        if song:
-            self.load_module(song)
+        self.fetch_jobs.pop(song.uid, None)
 
-        self.random_module_fetcher_threads = [
-            thread
-            for thread in self.random_module_fetcher_threads
-            if thread.isRunning()
-        ]
+        if song:
+            if song.modarchive_id:
+                self.load_module(song)
+            else:
+                self.on_module_load_failed(song)
 
     def set_playing_mode(self, new_playing_mode) -> None:
         if new_playing_mode != self.playing_settings.playing_mode:
@@ -307,9 +592,10 @@ class PlayingEngine(QObject):
         self.ui_manager.set_playing_source(new_playing_source)
 
     def set_modarchive_source(self, new_modarchive_source) -> None:
-        self.playing_settings.modarchive_source = new_modarchive_source
-        if new_modarchive_source == ModArchiveSource.ARTIST:
-            self.populate_queue()
+        if new_modarchive_source != self.playing_settings.modarchive_source:
+            self.playing_settings.modarchive_source = new_modarchive_source
+            # Modules prefetched for the previous source are no longer wanted
+            self.update_playing_mode()
         self.ui_manager.set_modarchive_source(new_modarchive_source)
 
     def set_local_source(self, new_local_source) -> None:
@@ -318,17 +604,31 @@ class PlayingEngine(QObject):
             self.module_loader.local_file = self.local_file
         self.ui_manager.set_local_source(new_local_source)
 
+    def set_shuffle_mode(self, new_shuffle_mode: ShuffleMode) -> None:
+        if new_shuffle_mode != self.playing_settings.shuffle_mode:
+            self.playing_settings.shuffle_mode = new_shuffle_mode
+            self.shuffle_engine.set_mode(new_shuffle_mode)
+
+            # Songs queued in the previous order are dropped, the queue is filled again when the current song ends
+            if self.playing_settings.playing_source == PlayingSource.LOCAL:
+                self.queue_manager.clear()
+        self.ui_manager.set_shuffle_mode(new_shuffle_mode)
+
     def update_playing_mode(self) -> None:
         logger.debug(
-            "Playing mode or source changed, clearing queue and terminating loader and fetcher threads"
+            "Playing mode or source changed, clearing queue and cancelling pending downloads"
         )
 
         self.queue_manager.clear()
+        self.prefetch_started.clear()
+        self.play_when_ready = False
 
-        for thread in self.random_module_fetcher_threads:
-            thread.terminate()
-            thread.wait()
-        self.random_module_fetcher_threads.clear()
+        # Running jobs stop at their next cancellation check, their results are dropped
+        self.cancellation_token.cancel()
+        self.cancellation_token = CancellationToken()
+        self.network_engine.discard_cancelled()
+        self.fetch_jobs.clear()
+        self.module_loader.clear_download_jobs()
 
         self.check_playing_mode()
 
@@ -346,20 +646,73 @@ class PlayingEngine(QObject):
             self.ui_manager.set_modarchive_source(ModArchiveSource.ALL)
         return
 
-    def load_module(self, song: Song) -> None:
-        self.module_loader.load_modules(song)
-        self.module_loader.song_loaded.connect(self.on_module_loaded)
+    def load_module(self, song: Song, priority: Optional[Priority] = None) -> None:
+        self.module_loader.load_modules(
+            song,
+            self.cancellation_token,
+            priority if priority is not None else self.get_song_priority(song),
+        )
 
     @Slot()
     def on_module_loaded(self, song: Song) -> None:
         if song:
+            started = self.prefetch_started.pop(song.uid, None)
+            if started is not None:
+                self.prefetch_policy.record_latency(time.monotonic() - started)
+
+            self.module_metadata_cache.record_song(song)
+
+            if self.is_prefetching() and song in self.queue_manager.queue:
+                rejection = self.get_candidate_filter().get_rejection(
+                    ModuleMetadata(size=song.modulebytes, duration=song.duration)
+                )
+
+                # Only known after probing, next time the module is skipped before downloading
+                if rejection:
+                    logger.info(f"Skipping {song.filename}: {rejection}")
+                    self.queue_manager.remove_song(song)
+
+                    if self.song_waiting_for_playback is song:
+                        self.song_waiting_for_playback = None
+                        self.play_queue()
+                    else:
+                        self.populate_queue()
+                    return
+
             # Check if we have been waiting for the module to load (when pressing play after starting the application)
-            if self.song_waiting_for_playback == song:
+            if self.song_waiting_for_playback is song:
                 self.play_module(song)
                 self.song_waiting_for_playback = None
+            elif self.play_when_ready and song.is_ready:
+                self.play_queue()
+
+    @Slot(Song, int, int)
+    def on_download_progress(self, song: Song, received: int, total: int) -> None:
+        # Only the module the user is waiting for is worth showing
+        if self.song_waiting_for_playback is song:
+            self.ui_manager.update_download_progress(received, total)
+
+    @Slot()
+    def on_module_load_failed(self, song: Song) -> None:
+        logger.warning(f"Loading module failed, ModArchive ID: {song.modarchive_id}")
+
+        if self.prefetch_started.pop(song.uid, None) is not None:
+            self.prefetch_policy.record_failure()
+        self.fetch_jobs.pop(song.uid, None)
+
+        self.queue_manager.remove_song(song)
+
+        if self.song_waiting_for_playback is song:
+            self.song_waiting_for_playback = None
+            self.play_queue()
+        elif self.is_prefetching():
+            self.populate_queue()
 
     def check_queue(self) -> None:
-        if (
+        if self.is_prefetching():
+            logger.debug("Random mode is active, topping up the prefetch pool")
+            self.populate_queue()
+        elif (
             self.queue_manager.is_empty()
             and self.playing_settings.playing_mode == PlayingMode.RANDOM
         ):
@@ -372,5 +725,39 @@ class PlayingEngine(QObject):
 
     def close(self) -> None:
         self.stop()
+        self.network_engine.close()
         self.playlist_manager.save_playlists()
+        self.playlist_manager.close()
         self.playing_settings.save()
+
+        self.history_playlist.close()
+
+        try:
+            self.module_metadata_cache.save()
+        except OSError as e:
+            logger.warning(f"Could not write module metadata cache: {e}")
+
+        try:
+            self.silence_cache.save()
+        except OSError as e:
+            logger.warning(f"Could not write silence cache: {e}")
+
+        try:
+            self.module_cache.close()
+        except OSError as e:
+            logger.warning(f"Could not write module cache index: {e}")
+        set_song_detail_store(None)
+        self.song_detail_store.close()
+
+        for key, stats in self.web_helper.session.metrics.summary().items():
+            logger.info(f"HTTP {key}: {stats}")
+
+        for stage, histogram in self.latency_metrics.summary().items():
+            logger.info(
+                f"Latency {stage}: {histogram['count']} times, p50 {histogram['p50_ms']:.0f} ms, p95 {histogram['p95_ms']:.0f} ms"
+            )
+
+        try:
+            self.latency_metrics.dump(os.path.join(self.cache_dir, "latency.json"))
+        except OSError as e:
+            logger.warning(f"Could not write latency histograms: {e}")
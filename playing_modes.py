@@ -18,4 +18,10 @@ class ModArchiveSource(Enum):
 
 class LocalSource(Enum):
     PLAYLIST = 0
-    FOLDER = 1
\ No newline at end of file
+    FOLDER = 1
+
+class ShuffleMode(Enum):
+    OFF = 0
+    UNIFORM = 1
+    NO_REPEAT = 2
+    LEAST_PLAYED = 3
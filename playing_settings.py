@@ -8,9 +8,11 @@ class PlayingSettings:
         self.playing_source = settings_manager.get_playing_source()
         self.modarchive_source = settings_manager.get_modarchive_source()
         self.local_source = settings_manager.get_local_source()
+        self.shuffle_mode = settings_manager.get_shuffle_mode()
 
     def save(self) -> None:
         self.settings_manager.set_playing_mode(self.playing_mode)
         self.settings_manager.set_playing_source(self.playing_source)
         self.settings_manager.set_modarchive_source(self.modarchive_source)
         self.settings_manager.set_local_source(self.local_source)
+        self.settings_manager.set_shuffle_mode(self.shuffle_mode)
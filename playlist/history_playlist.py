@@ -0,0 +1,138 @@
+import json
+import os
+from array import array
+from typing import BinaryIO, List, Optional
+
+from player_backends.Song import Song
+from playlist.playlist import Playlist
+
+
+class HistoryLog:
+    # Append-only log of played songs, one JSON line per song, only byte offsets are kept in memory
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.offsets: array = array("Q")
+        self.file: Optional[BinaryIO] = open(filename, "w+b")
+
+    def append(self, song: Song) -> int:
+        if not self.file:
+            raise ValueError("History log is closed")
+
+        self.file.seek(0, os.SEEK_END)
+        self.offsets.append(self.file.tell())
+        self.file.write(json.dumps(song.to_dict()).encode() + b"\n")
+        self.file.flush()
+        return len(self.offsets) - 1
+
+    def read(self, index: int) -> Song:
+        return self.read_range(index, index + 1)[0]
+
+    def read_range(self, start: int, stop: int) -> List[Song]:
+        if not self.file:
+            raise ValueError("History log is closed")
+
+        start = max(0, start)
+        stop = min(stop, len(self.offsets))
+        if start >= stop:
+            return []
+
+        self.file.seek(self.offsets[start])
+        return [
+            Song.from_json(self.file.readline().decode()) for _ in range(start, stop)
+        ]
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+class HistoryPlaylist(Playlist):
+    # Keeps only the most recently played songs in memory, older ones are read back from the log
+    def __init__(self, log_filename: str, window_size: int = 200) -> None:
+        super().__init__("History")
+        self.log = HistoryLog(log_filename)
+        self.window_size = max(1, window_size)
+
+        # Position of songs[0] in the whole history, everything before it is in the log
+        self.window_start: int = 0
+
+    def add_song(self, song: Song) -> None:
+        super().add_song(song)
+        self.trim_window()
+
+    def on_song_added(self, song: Song) -> None:
+        super().on_song_added(song)
+        self.trim_window()
+
+    def on_song_removed_at(self, index: int) -> None:
+        # The log is append-only, removing a row only hides the song from the view
+        pass
+
+    def trim_window(self) -> None:
+        surplus = len(self.songs) - self.window_size
+
+        # Songs are only written once they leave the window, so info filled in while playing is kept
+        if surplus > 0:
+            for song in self.songs[:surplus]:
+                self.log.append(song)
+            del self.songs[:surplus]
+            self.window_start += surplus
+
+    def set_window_size(self, window_size: int) -> None:
+        self.window_size = max(1, window_size)
+        self.trim_window()
+
+    def get_song(self, index: int) -> Song:
+        if not 0 <= index < self.get_length():
+            raise IndexError("History index out of range")
+
+        if index >= self.window_start:
+            return self.songs[index - self.window_start]
+        return self.log.read(index)
+
+    def get_songs(self, start: int, stop: int) -> List[Song]:
+        # A page of the history, songs before the window are read from the log
+        start = max(0, start)
+        stop = min(stop, self.get_length())
+
+        songs = self.log.read_range(start, stop)
+        songs.extend(
+            self.songs[
+                max(start - self.window_start, 0) : max(stop - self.window_start, 0)
+            ]
+        )
+        return songs
+
+    def get_next_song(self) -> Optional[Song]:
+        self.current_song_index += 1
+        if self.current_song_index < self.get_length():
+            return self.get_song(self.current_song_index)
+        return None
+
+    def get_previous_song(self) -> Optional[Song]:
+        self.current_song_index -= 1
+        if self.current_song_index >= 0:
+            return self.get_song(self.current_song_index)
+        return None
+
+    def set_current_song(self, song: Song) -> None:
+        if song in self.songs:
+            self.current_song_index = self.window_start + self.songs.index(song)
+            self.current_song_changed.emit(song, self.current_song_index)
+
+    def get_length(self) -> int:
+        return self.window_start + len(self.songs)
+
+    def clear(self) -> None:
+        # The log keeps the session's history, only the window is emptied
+        for song in self.songs:
+            self.log.append(song)
+        self.window_start += len(self.songs)
+        self.songs.clear()
+
+    def close(self) -> None:
+        self.log.close()
@@ -0,0 +1,359 @@
+import json
+import os
+import sqlite3
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
+
+from loguru import logger
+
+from player_backends.Song import Song
+from playlist.playlist import Playlist
+
+if TYPE_CHECKING:
+    from playlist.playlist_journal import PlaylistChanges
+
+SCHEMA_VERSION = 2
+
+# Compact the database once this share of its pages is unused
+COMPACT_FREE_RATIO = 0.25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    uid TEXT PRIMARY KEY,
+    backend_name TEXT NOT NULL,
+    format TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS songs_backend_name ON songs (backend_name);
+CREATE INDEX IF NOT EXISTS songs_format ON songs (format);
+CREATE INDEX IF NOT EXISTS songs_artist ON songs (artist COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS songs_duration ON songs (duration);
+
+CREATE TABLE IF NOT EXISTS playlists (
+    uuid TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    tab_index INTEGER NOT NULL,
+    current_song_index INTEGER NOT NULL,
+    song_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS playlist_songs (
+    playlist_uuid TEXT NOT NULL REFERENCES playlists (uuid) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    song_uid TEXT NOT NULL,
+    PRIMARY KEY (playlist_uuid, position)
+);
+CREATE INDEX IF NOT EXISTS playlist_songs_song_uid ON playlist_songs (song_uid);
+"""
+
+# Upgrades from the previous schema version
+MIGRATIONS = {
+    2: """
+ALTER TABLE playlists ADD COLUMN song_count INTEGER NOT NULL DEFAULT 0;
+UPDATE playlists SET song_count =
+    (SELECT COUNT(*) FROM playlist_songs WHERE playlist_uuid = playlists.uuid);
+""",
+}
+
+
+def get_song_format(song: Song) -> str:
+    return os.path.splitext(song.filename)[1].lstrip(".").lower()
+
+
+class LibraryStore:
+    # Songs of all playlists stored once by uid, playlists are ordered lists of song uids
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.connect()
+
+    def connect(self) -> None:
+        self.connection = sqlite3.connect(self.filename)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self.run_script(SCHEMA, SCHEMA_VERSION)
+        else:
+            for target_version in range(version + 1, SCHEMA_VERSION + 1):
+                logger.info(f"Upgrading library to version {target_version}")
+                self.run_script(MIGRATIONS[target_version], target_version)
+
+    def run_script(self, script: str, version: int) -> None:
+        # executescript commits on its own, the transaction has to be part of the script
+        self.connection.executescript(
+            f"BEGIN; {script} PRAGMA user_version = {version}; COMMIT;"
+        )
+
+    def load_playlists(self) -> List[Playlist]:
+        # Only the playlist rows are read, songs are loaded once a playlist is opened, played or written
+        playlists = []
+
+        for (
+            uuid,
+            name,
+            tab_index,
+            current_song_index,
+            song_count,
+        ) in self.connection.execute(
+            "SELECT uuid, name, tab_index, current_song_index, song_count FROM playlists ORDER BY tab_index"
+        ):
+            playlist = Playlist(name)
+            playlist.uuid = uuid
+            playlist.tab_index = tab_index
+            playlist.current_song_index = current_song_index
+            playlist.set_song_loader(
+                lambda uuid=uuid: self.load_songs(uuid), song_count
+            )
+            playlists.append(playlist)
+
+        return playlists
+
+    def load_songs(self, playlist_uuid: str) -> List[Song]:
+        rows = self.connection.execute(
+            "SELECT songs.data FROM playlist_songs JOIN songs ON songs.uid = playlist_songs.song_uid "
+            "WHERE playlist_songs.playlist_uuid = ? ORDER BY playlist_songs.position",
+            (playlist_uuid,),
+        )
+        return [Song.from_dict(json.loads(data)) for (data,) in rows]
+
+    def save_playlist(self, playlist: Playlist) -> None:
+        with self.connection:
+            self.write_playlist(playlist)
+
+    def write_playlist(self, playlist: Playlist) -> None:
+        self.write_playlist_info(playlist)
+
+        previous_uids = self.get_song_uids(playlist.uuid)
+        self.connection.execute(
+            "DELETE FROM playlist_songs WHERE playlist_uuid = ?", (playlist.uuid,)
+        )
+        self.connection.executemany(
+            "INSERT INTO playlist_songs (playlist_uuid, position, song_uid) VALUES (?, ?, ?)",
+            [
+                (playlist.uuid, position, song.uid)
+                for position, song in enumerate(playlist.songs)
+            ],
+        )
+        self.write_songs(playlist.songs)
+        self.delete_orphans(previous_uids)
+
+    def write_playlist_info(self, playlist: Playlist) -> None:
+        # An upsert, replacing the row would cascade to the playlist songs
+        self.connection.execute(
+            "INSERT INTO playlists (uuid, name, tab_index, current_song_index, song_count) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (uuid) DO UPDATE SET name = excluded.name, tab_index = excluded.tab_index, "
+            "current_song_index = excluded.current_song_index, song_count = excluded.song_count",
+            (
+                playlist.uuid,
+                playlist.name,
+                playlist.tab_index,
+                playlist.current_song_index,
+                playlist.get_length(),
+            ),
+        )
+
+    def apply_changes(
+        self, changes: Iterable["PlaylistChanges"], songs: Iterable[Song]
+    ) -> None:
+        # Writes only what has changed, in a single transaction
+        with self.connection:
+            for playlist_changes in changes:
+                if playlist_changes.reordered or self.has_removed_copies_left(
+                    playlist_changes
+                ):
+                    self.write_playlist(playlist_changes.playlist)
+                else:
+                    self.write_song_changes(playlist_changes)
+
+            self.update_songs(songs)
+
+    def has_removed_copies_left(self, changes: "PlaylistChanges") -> bool:
+        # A song in the playlist more than once cannot be told apart by uid, another copy may have been removed
+        removed = Counter(song.uid for song in changes.removed)
+        added = Counter(song.uid for song in changes.added)
+
+        for uid in changes.removed_uids:
+            stored = self.connection.execute(
+                "SELECT COUNT(*) FROM playlist_songs WHERE song_uid = ? AND playlist_uuid = ?",
+                (uid, changes.playlist.uuid),
+            ).fetchone()[0]
+            if stored - removed[uid] + added[uid] > 0:
+                return True
+        return False
+
+    def write_song_changes(self, changes: "PlaylistChanges") -> None:
+        uuid = changes.playlist.uuid
+        self.write_playlist_info(changes.playlist)
+
+        # Positions are only used for ordering, gaps left by removed songs do not matter
+        self.connection.executemany(
+            "DELETE FROM playlist_songs WHERE rowid = "
+            "(SELECT rowid FROM playlist_songs WHERE playlist_uuid = ? AND song_uid = ? LIMIT 1)",
+            [(uuid, song.uid) for song in changes.removed],
+        )
+        self.delete_orphans(song.uid for song in changes.removed)
+
+        if changes.added:
+            end = self.connection.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM playlist_songs WHERE playlist_uuid = ?",
+                (uuid,),
+            ).fetchone()[0]
+            self.connection.executemany(
+                "INSERT INTO playlist_songs (playlist_uuid, position, song_uid) VALUES (?, ?, ?)",
+                [
+                    (uuid, end + offset, song.uid)
+                    for offset, song in enumerate(changes.added)
+                ],
+            )
+            self.write_songs(changes.added)
+
+    def save_songs(self, songs: Iterable[Song]) -> None:
+        with self.connection:
+            self.update_songs(songs)
+
+    def update_songs(self, songs: Iterable[Song]) -> None:
+        # Song info changed after a song has been added, songs in no playlist are left out
+        self.connection.executemany(
+            "UPDATE songs SET backend_name = ?, format = ?, artist = ?, duration = ?, data = ? WHERE uid = ?",
+            [
+                (
+                    song.backend_name,
+                    get_song_format(song),
+                    song.artist,
+                    song.duration,
+                    json.dumps(song.to_dict()),
+                    song.uid,
+                )
+                for song in songs
+            ],
+        )
+
+    def delete_playlist(self, playlist_uuid: str) -> None:
+        with self.connection:
+            previous_uids = self.get_song_uids(playlist_uuid)
+            self.connection.execute(
+                "DELETE FROM playlists WHERE uuid = ?", (playlist_uuid,)
+            )
+            self.delete_orphans(previous_uids)
+
+    def find_songs(
+        self,
+        backend_name: Optional[str] = None,
+        format: Optional[str] = None,
+        artist: Optional[str] = None,
+        min_duration: Optional[int] = None,
+        max_duration: Optional[int] = None,
+    ) -> List[Song]:
+        # Not used by the UI yet, meant for a library search that does not need playlists loaded
+        conditions: List[str] = []
+        parameters: List[Any] = []
+
+        if backend_name is not None:
+            conditions.append("backend_name = ?")
+            parameters.append(backend_name)
+        if format is not None:
+            conditions.append("format = ?")
+            parameters.append(format.lower())
+        if artist is not None:
+            conditions.append("artist = ? COLLATE NOCASE")
+            parameters.append(artist)
+        if min_duration is not None:
+            conditions.append("duration >= ?")
+            parameters.append(min_duration)
+        if max_duration is not None:
+            conditions.append("duration <= ?")
+            parameters.append(max_duration)
+
+        query = "SELECT data FROM songs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        return [
+            Song.from_dict(json.loads(data))
+            for (data,) in self.connection.execute(query, parameters)
+        ]
+
+    def migrate_playlist_files(self, directory: str) -> int:
+        # Playlists from before the library store, files are kept renamed so they are only imported once
+        migrated = 0
+
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(".playlist"):
+                continue
+
+            filename = os.path.join(directory, file_name)
+            try:
+                playlist = Playlist.from_json(filename)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Could not migrate playlist {file_name}: {e}")
+                continue
+
+            self.save_playlist(playlist)
+            os.replace(filename, f"{filename}.migrated")
+            migrated += 1
+
+        if migrated:
+            logger.info(f"Migrated {migrated} playlist files to the library")
+        return migrated
+
+    def get_song_uids(self, playlist_uuid: str) -> List[str]:
+        return [
+            uid
+            for (uid,) in self.connection.execute(
+                "SELECT song_uid FROM playlist_songs WHERE playlist_uuid = ?",
+                (playlist_uuid,),
+            )
+        ]
+
+    def write_songs(self, songs: Iterable[Song]) -> None:
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO songs (uid, backend_name, format, artist, duration, data) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    song.uid,
+                    song.backend_name,
+                    get_song_format(song),
+                    song.artist,
+                    song.duration,
+                    json.dumps(song.to_dict()),
+                )
+                for song in songs
+            ],
+        )
+
+    def delete_orphans(self, song_uids: Iterable[str]) -> None:
+        # Songs no playlist refers to anymore
+        self.connection.executemany(
+            "DELETE FROM songs WHERE uid = ? AND NOT EXISTS (SELECT 1 FROM playlist_songs WHERE song_uid = ?)",
+            [(uid, uid) for uid in set(song_uids)],
+        )
+
+    def needs_compaction(self) -> bool:
+        page_count = self.connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self.connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return free_pages > page_count * COMPACT_FREE_RATIO
+
+    def compact(self) -> None:
+        # Written to a new file and swapped in, a crash leaves either the old or the new database
+        temp_filename = f"{self.filename}.tmp"
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.connection.execute("VACUUM INTO ?", (temp_filename,))
+        self.connection.close()
+
+        # A write ahead log left behind would be applied to the new file
+        if os.path.exists(f"{self.filename}-wal"):
+            logger.warning("Library is still in use, not compacting it")
+            os.remove(temp_filename)
+        else:
+            os.replace(temp_filename, self.filename)
+
+        self.connect()
+
+    def close(self) -> None:
+        self.connection.close()
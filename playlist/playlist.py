@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import Callable, List, Optional
 from uuid import uuid4
 from player_backends.Song import Song
+from player_backends.song_detail_store import get_song_detail_store
 from PySide6.QtCore import Signal, QObject
 import json
 
@@ -10,6 +11,7 @@ class Playlist(QObject):
     song_removed = Signal(Song)
     song_moved = Signal(Song, int)
     current_song_changed = Signal(Song, int)
+    renamed = Signal(str)
 
     def __init__(
         self, name: str = "Empty Playlist", songs: List[Song] | None = None
@@ -17,26 +19,72 @@ class Playlist(QObject):
         super().__init__()
         self.uuid: str = str(uuid4())
         self.name: str = name
-        self.songs: List[Song] = songs if songs else []
+        self.song_list: List[Song] = songs if songs else []
         self.current_song_index: int = 0
         self.tab_index: int = 0
 
+        # Saved playlists are read song by song only once their songs are needed
+        self.song_loader: Optional[Callable[[], List[Song]]] = None
+        self.song_count: int = 0
+
+        self.release_song_details(self.song_list)
+
+    @property
+    def songs(self) -> List[Song]:
+        if self.song_loader is not None:
+            self.load_songs()
+        return self.song_list
+
+    @songs.setter
+    def songs(self, songs: List[Song]) -> None:
+        self.song_loader = None
+        self.song_list = songs
+
+    def set_song_loader(
+        self, loader: Callable[[], List[Song]], song_count: int
+    ) -> None:
+        self.song_loader = loader
+        self.song_count = song_count
+
+    def load_songs(self) -> None:
+        loader = self.song_loader
+        self.song_loader = None
+
+        if loader is not None:
+            self.song_list = loader()
+            self.release_song_details(self.song_list)
+
+    def is_loaded(self) -> bool:
+        return self.song_loader is None
+
+    def release_song_details(self, songs: List[Song]) -> None:
+        # Songs kept in a playlist only hold the fields needed for display and playback
+        store = get_song_detail_store()
+        if store:
+            store.offload(songs)
+
+    # The on_ methods follow changes made in the view, their signals are only for saving the playlist
     def on_song_added(self, song: Song) -> None:
         self.songs.append(song)
+        self.release_song_details([song])
+        self.song_added.emit(song)
 
     def add_song(self, song: Song) -> None:
         self.songs.append(song)
+        self.release_song_details([song])
         self.song_added.emit(song)
 
     def on_song_removed(self, song: Song) -> None:
         self.songs.remove(song)
+        self.song_removed.emit(song)
 
     def remove_song(self, song: Song) -> None:
         self.songs.remove(song)
         self.song_removed.emit(song)
 
     def on_song_removed_at(self, index: int) -> None:
-        self.songs.pop(index)
+        song = self.songs.pop(index)
+        self.song_removed.emit(song)
 
     def remove_song_at(self, index: int) -> None:
         song = self.songs.pop(index)
@@ -45,12 +93,17 @@ class Playlist(QObject):
     def on_song_moved(self, song: Song, index: int) -> None:
         self.songs.remove(song)
         self.songs.insert(index, song)
+        self.song_moved.emit(song, index)
 
     def move_song(self, song: Song, index: int) -> None:
         self.songs.remove(song)
         self.songs.insert(index, song)
         self.song_moved.emit(song, index)
 
+    def set_name(self, name: str) -> None:
+        self.name = name
+        self.renamed.emit(name)
+
     def get_next_song(self) -> Optional[Song]:
         self.current_song_index += 1
         if self.current_song_index < len(self.songs):
@@ -80,6 +133,8 @@ class Playlist(QObject):
         self.songs.clear()
 
     def get_length(self) -> int:
+        if not self.is_loaded():
+            return self.song_count
         return len(self.songs)
 
     def __str__(self) -> str:
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from player_backends.Song import Song
+from playlist.playlist import Playlist
+
+
+@dataclass
+class PlaylistChanges:
+    playlist: Playlist
+    # Songs appended to the end and songs taken out since the last flush
+    added: List[Song] = field(default_factory=list)
+    removed: List[Song] = field(default_factory=list)
+    # Every song taken out, also ones never written, to check at flush if a copy of it is left
+    removed_uids: Set[str] = field(default_factory=set)
+    # Order changed in a way that is cheaper to write in full
+    reordered: bool = False
+    # Name, tab index or current song changed
+    info_changed: bool = False
+
+
+class PlaylistJournal:
+    # Changes to saved playlists since the last flush, so saving only writes what has changed
+    def __init__(self) -> None:
+        self.changes: Dict[str, PlaylistChanges] = {}
+        self.changed_songs: Dict[str, Song] = {}
+
+    def get_changes(self, playlist: Playlist) -> PlaylistChanges:
+        changes = self.changes.get(playlist.uuid)
+        if changes is None:
+            changes = self.changes[playlist.uuid] = PlaylistChanges(playlist)
+        return changes
+
+    def song_added(self, playlist: Playlist, song: Song) -> None:
+        self.get_changes(playlist).added.append(song)
+
+    def song_removed(self, playlist: Playlist, song: Song) -> None:
+        changes = self.get_changes(playlist)
+        changes.removed_uids.add(song.uid)
+
+        if song in changes.added:
+            # Never written, nothing to remove
+            changes.added.remove(song)
+        else:
+            changes.removed.append(song)
+
+    def song_moved(self, playlist: Playlist) -> None:
+        self.get_changes(playlist).reordered = True
+
+    def info_changed(self, playlist: Playlist) -> None:
+        self.get_changes(playlist).info_changed = True
+
+    def song_changed(self, song: Song) -> None:
+        self.changed_songs[song.uid] = song
+
+    def discard(self, playlist: Playlist) -> None:
+        self.changes.pop(playlist.uuid, None)
+
+    def is_empty(self) -> bool:
+        return not self.changes and not self.changed_songs
+
+    def take(self) -> Tuple[List[PlaylistChanges], List[Song]]:
+        changes = list(self.changes.values())
+        songs = list(self.changed_songs.values())
+
+        self.clear()
+        return changes, songs
+
+    def clear(self) -> None:
+        self.changes = {}
+        self.changed_songs = {}
@@ -1,13 +1,22 @@
 import os
+import sqlite3
 from typing import Optional
 
+from loguru import logger
 from platformdirs import user_config_dir
 from player_backends.Song import Song
+from playlist.library_store import LibraryStore
 from playlist.playlist import Playlist
-from PySide6.QtCore import QObject, Signal
+from playlist.playlist_journal import PlaylistJournal
+from PySide6.QtCore import QObject, QTimer, Signal
 
 from settings_manager import SettingsManager
 
+LIBRARY_FILENAME = "library.db"
+
+# Playlist changes are written to the library this often, in milliseconds
+JOURNAL_FLUSH_INTERVAL = 5000
+
 
 class PlaylistManager(QObject):
     song_added_to_playlist = Signal(Playlist, Song)
@@ -20,12 +29,25 @@ class PlaylistManager(QObject):
         self.playlists: list[Playlist] = []
         self.current_playlist: Optional[Playlist] = None
         self.config_dir = user_config_dir(self.settings_manager.get_app_name())
+        self.library_store: Optional[LibraryStore] = None
+
+        # Only changes are written, a crash loses at most one flush interval
+        self.journal = PlaylistJournal()
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush_journal)
 
     def load_playlists(self) -> None:
         if os.path.exists(self.config_dir):
-            for file_name in os.listdir(self.config_dir):
-                if file_name.endswith(".playlist"):
-                    self.load_playlist(os.path.join(self.config_dir, file_name))
+            self.library_store = LibraryStore(
+                os.path.join(self.config_dir, LIBRARY_FILENAME)
+            )
+            self.library_store.migrate_playlist_files(self.config_dir)
+
+            for playlist in self.library_store.load_playlists():
+                self.add_playlist(playlist)
+
+            self.journal.clear()
+            self.flush_timer.start(JOURNAL_FLUSH_INTERVAL)
 
         # If only history playlist exists, create a default playlist
         if len(self.playlists) == 1:
@@ -33,14 +55,32 @@ class PlaylistManager(QObject):
         self.sort()
 
     def save_playlists(self) -> None:
-        for playlist in self.playlists:
-            if playlist.name != "History":
-                self.save_playlist(playlist)
+        self.flush_journal()
+
+    def flush_journal(self) -> None:
+        if not self.library_store or self.journal.is_empty():
+            return
+
+        changes, songs = self.journal.take()
+        try:
+            self.library_store.apply_changes(changes, songs)
+        except sqlite3.Error as e:
+            logger.error(f"Could not save playlists: {e}")
+
+            # Written in full with the next flush
+            for playlist_changes in changes:
+                self.journal.song_moved(playlist_changes.playlist)
+            for song in songs:
+                self.journal.song_changed(song)
+
+    def is_saved(self, playlist: Playlist) -> bool:
+        return playlist.name != "History"
 
     def save_playlist(self, playlist: Playlist):
-        if os.path.exists(self.config_dir):
-            filename = os.path.join(self.config_dir, f"{playlist.uuid}.playlist")
-            playlist.to_json(filename)
+        if self.library_store:
+            self.library_store.save_playlist(playlist)
+            # Written in full, nothing left to flush
+            self.journal.discard(playlist)
 
     def add_playlist(self, playlist: Playlist) -> None:
         self.playlists.append(playlist)
@@ -53,8 +93,18 @@ class PlaylistManager(QObject):
         playlist.song_moved.connect(
             lambda song, index: self.on_song_moved_on_playlist(playlist, song, index)
         )
+        playlist.current_song_changed.connect(
+            lambda song, index: self.on_playlist_changed(playlist)
+        )
+        playlist.renamed.connect(lambda name: self.on_playlist_changed(playlist))
         self.current_playlist = playlist
 
+        self.on_playlist_changed(playlist)
+
+        # Songs the playlist came with have no rows yet, written in full with the next flush
+        if self.is_saved(playlist) and playlist.get_length():
+            self.journal.song_moved(playlist)
+
     def new_playlist(self, name: str = "") -> Playlist:
         playlist = Playlist(name)
         playlist.tab_index = self.get_new_tab_index()
@@ -65,7 +115,10 @@ class PlaylistManager(QObject):
         return len(self.playlists)
 
     def delete_playlist(self, index: int) -> None:
-        del self.playlists[index]
+        playlist = self.playlists.pop(index)
+        self.journal.discard(playlist)
+        if self.library_store:
+            self.library_store.delete_playlist(playlist.uuid)
         if self.current_playlist == index:
             self.current_playlist = None
 
@@ -86,16 +139,30 @@ class PlaylistManager(QObject):
     #     self.current_playlist.set_current_song(song)
 
     def on_song_added_to_playlist(self, playlist: Playlist, song: Song) -> None:
+        if self.is_saved(playlist):
+            self.journal.song_added(playlist, song)
         self.song_added_to_playlist.emit(playlist, song)
 
     def on_song_removed_from_playlist(self, playlist: Playlist, song: Song) -> None:
+        if self.is_saved(playlist):
+            self.journal.song_removed(playlist, song)
         self.song_removed_from_playlist.emit(playlist, song)
 
     def on_song_moved_on_playlist(
         self, playlist: Playlist, song: Song, index: int
     ) -> None:
+        if self.is_saved(playlist):
+            self.journal.song_moved(playlist)
         self.song_moved_on_playlist.emit(playlist, song, index)
 
+    def on_playlist_changed(self, playlist: Playlist) -> None:
+        if self.is_saved(playlist):
+            self.journal.info_changed(playlist)
+
+    def song_changed(self, song: Song) -> None:
+        # Song info like the play count, written if the song is in a saved playlist
+        self.journal.song_changed(song)
+
     def load_playlist(self, filename: str):
         playlist = Playlist.from_json(filename)
 
@@ -113,4 +180,21 @@ class PlaylistManager(QObject):
     def playlist_moved(self, from_index: int, to_index: int):
         self.playlists[from_index].tab_index = to_index
         self.playlists[to_index].tab_index = from_index
+        self.on_playlist_changed(self.playlists[from_index])
+        self.on_playlist_changed(self.playlists[to_index])
         self.sort()
+
+    def close(self) -> None:
+        self.flush_timer.stop()
+        if not self.library_store:
+            return
+
+        self.flush_journal()
+        try:
+            if self.library_store.needs_compaction():
+                self.library_store.compact()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not compact library: {e}")
+
+        self.library_store.close()
+        self.library_store = None
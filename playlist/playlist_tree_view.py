@@ -13,6 +13,7 @@ from PySide6.QtGui import (
     QPainter,
     QPalette,
     QPen,
+    QShowEvent,
     QStandardItem,
 )
 from PySide6.QtWidgets import (
@@ -44,6 +45,9 @@ class PlaylistTreeView(QTreeView):
         # Currently playing row for this tab
         self.previous_row: int = 0
 
+        # Rows of saved playlists are only added once the tab is shown
+        self.rows_loaded: bool = False
+
         self.setDragDropMode(self.DragDropMode.InternalMove)
         self.setSelectionMode(self.SelectionMode.ExtendedSelection)
         self.setSelectionBehavior(self.SelectionBehavior.SelectRows)
@@ -111,7 +115,22 @@ class PlaylistTreeView(QTreeView):
             self.files_dropped.emit(file_paths)
             event.acceptProposedAction()
 
+    def showEvent(self, event: QShowEvent) -> None:
+        if not self.rows_loaded:
+            self.load_rows()
+            self.update_current_row()
+        super().showEvent(event)
+
+    def load_rows(self) -> None:
+        if self.rows_loaded:
+            return
+
+        self.rows_loaded = True
+        for song in self.playlist.songs:
+            self.add_song(song)
+
     def load_song(self, song: Song) -> int:
+        self.load_rows()
         index = self.add_song(song)
         self.playlist.on_song_added(song)
         return index
@@ -164,6 +183,10 @@ class PlaylistTreeView(QTreeView):
         self.playlist_model.appendRow(tree_cols)
         return self.playlist_model.indexFromItem(tree_cols[0]).row()
 
+    def insert_songs(self, row: int, songs: list[Song]) -> None:
+        for offset, song in enumerate(songs):
+            self.playlist_model.insertRow(row + offset, self.construct_tree_cols(song))
+
     def remove_song(self, song: Song) -> None:
         for row in range(self.playlist_model.rowCount()):
             item = self.playlist_model.item(row, 0)
@@ -251,8 +274,10 @@ class PlaylistTreeView(QTreeView):
     def set_playlist(self, playlist: Playlist) -> None:
         self.playlist = playlist
         self.playlist_model.clear()
-        for song in playlist.songs:
-            self.add_song(song)
+
+        self.rows_loaded = False
+        if playlist.is_loaded():
+            self.load_rows()
 
         # Set column names and widths
         for col_info in tree_view_columns_dict.values():
@@ -278,6 +303,6 @@ class PlaylistTreeView(QTreeView):
             self.remove_song_at(row)
 
     def set_name(self, name: str) -> None:
-        self.playlist.name = name
+        self.playlist.set_name(name)
         # self.playlist_model.setHorizontalHeaderItem(0, QStandardItem(name))
         # self.playlist_model.setHeaderData(0, Qt.Orientation.Horizontal, name)
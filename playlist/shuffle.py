@@ -0,0 +1,149 @@
+import random
+from typing import List, Optional, Set
+
+from player_backends.Song import Song
+from playing_modes import ShuffleMode
+from playlist.playlist import Playlist
+
+# Tries before least played shuffle settles for any song, only reached when every song has been played a lot
+MAX_WEIGHTED_TRIES = 32
+
+
+class LazyPermutation:
+    # Random order of range(size) computed one position at a time by a small Feistel network, so no shuffled copy is kept
+    ROUNDS = 4
+
+    def __init__(self, size: int, rng: random.Random) -> None:
+        self.size = size
+
+        bits = max(2, (size - 1).bit_length())
+        self.half_bits = (bits + 1) // 2
+        self.mask = (1 << self.half_bits) - 1
+        self.keys = [rng.getrandbits(32) for _ in range(self.ROUNDS)]
+
+    def encrypt(self, value: int) -> int:
+        left = value >> self.half_bits
+        right = value & self.mask
+
+        for key in self.keys:
+            mixed = ((right ^ key) * 0x45D9F3B) & 0xFFFFFFFF
+            mixed ^= mixed >> 16
+            left, right = right, left ^ (mixed & self.mask)
+
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, position: int) -> int:
+        if not 0 <= position < self.size:
+            raise IndexError("Permutation index out of range")
+
+        # The network permutes the next power of four, walk the cycle until the value is in range
+        value = self.encrypt(position)
+        while value >= self.size:
+            value = self.encrypt(value)
+        return value
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class ShuffleEngine:
+    # Picks the next song of a playlist on demand, the playlist can be edited while it plays
+    def __init__(
+        self, mode: ShuffleMode = ShuffleMode.OFF, seed: Optional[int] = None
+    ) -> None:
+        self.mode = mode
+        self.rng = random.Random(seed)
+
+        self.playlist_uuid: str = ""
+        self.permutation: Optional[LazyPermutation] = None
+        self.position: int = 0
+
+        # Songs already played in this round of no repeat shuffle
+        self.played: Set[str] = set()
+        self.last_uid: str = ""
+
+    def set_mode(self, mode: ShuffleMode) -> None:
+        if mode != self.mode:
+            self.mode = mode
+            self.reset()
+
+    def reset(self) -> None:
+        self.permutation = None
+        self.position = 0
+        self.played.clear()
+
+    def use_playlist(self, playlist: Playlist) -> None:
+        if playlist.uuid != self.playlist_uuid:
+            self.playlist_uuid = playlist.uuid
+            self.reset()
+
+    def mark_played(self, playlist: Playlist, song: Song) -> None:
+        # For songs started by hand, so no repeat shuffle does not pick them again this round
+        self.use_playlist(playlist)
+        self.played.add(song.uid)
+        self.last_uid = song.uid
+
+    def next_song(self, playlist: Playlist) -> Optional[Song]:
+        self.use_playlist(playlist)
+
+        songs = playlist.songs
+        if not songs:
+            return None
+
+        match self.mode:
+            case ShuffleMode.UNIFORM:
+                song = self.next_uniform(songs)
+            case ShuffleMode.NO_REPEAT:
+                song = self.next_unplayed(songs)
+            case ShuffleMode.LEAST_PLAYED:
+                song = self.next_weighted(songs)
+            case _:
+                return None
+
+        self.last_uid = song.uid
+        return song
+
+    def next_uniform(self, songs: List[Song]) -> Song:
+        song = songs[self.rng.randrange(len(songs))]
+
+        # Avoid playing the same song twice in a row
+        if song.uid == self.last_uid and len(songs) > 1:
+            song = songs[self.rng.randrange(len(songs))]
+        return song
+
+    def next_unplayed(self, songs: List[Song]) -> Song:
+        for _ in range(3):
+            if self.permutation is None or len(self.permutation) != len(songs):
+                # Songs played this round are skipped, so a new order can be started at any time
+                self.permutation = LazyPermutation(len(songs), self.rng)
+                self.position = 0
+
+            while self.position < len(self.permutation):
+                song = songs[self.permutation[self.position]]
+                self.position += 1
+
+                if song.uid not in self.played:
+                    self.played.add(song.uid)
+                    return song
+
+            if any(song.uid not in self.played for song in songs):
+                # Playlist has been edited and songs moved to positions already passed, walk a new order
+                self.permutation = None
+            else:
+                # Every song has been played, start the next round
+                self.reset()
+
+        return songs[0]
+
+    def next_weighted(self, songs: List[Song]) -> Song:
+        # Rejection sampling, a song is kept with probability 1 / (1 + play count)
+        song = songs[0]
+
+        for _ in range(MAX_WEIGHTED_TRIES):
+            song = songs[self.rng.randrange(len(songs))]
+
+            if song.uid == self.last_uid and len(songs) > 1:
+                continue
+            if self.rng.random() * (1 + song.play_count) < 1:
+                return song
+        return song
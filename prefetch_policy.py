@@ -0,0 +1,48 @@
+import math
+from typing import Optional
+
+
+class PrefetchPolicy:
+    def __init__(
+        self,
+        max_depth: int = 3,
+        min_depth: int = 1,
+        fast_latency: float = 2.0,
+        smoothing: float = 0.3,
+    ) -> None:
+        self.max_depth = max(1, max_depth)
+        self.min_depth = max(1, min(min_depth, self.max_depth))
+        self.fast_latency = fast_latency
+        self.smoothing = smoothing
+
+        # Exponential moving average of fetch + download + probe time in seconds
+        self.latency: Optional[float] = None
+
+    def set_max_depth(self, max_depth: int) -> None:
+        self.max_depth = max(1, max_depth)
+        self.min_depth = min(self.min_depth, self.max_depth)
+
+    def record_latency(self, seconds: float) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.smoothing * (seconds - self.latency)
+
+    def record_failure(self) -> None:
+        # A failed pick costs at least a whole fetch, so treat it as a slow one
+        self.record_latency(max(self.latency or 0.0, self.fast_latency) * 2)
+
+    def get_target_depth(self) -> int:
+        if self.latency is None:
+            return self.max_depth
+
+        depth = 1 + math.ceil(self.latency / self.fast_latency)
+        return max(self.min_depth, min(self.max_depth, depth))
+
+    def get_low_water_mark(self) -> int:
+        return max(1, (self.get_target_depth() + 1) // 2)
+
+    def get_missing(self, pool_size: int) -> int:
+        if pool_size < self.get_low_water_mark():
+            return self.get_target_depth() - pool_size
+        return 0
@@ -1,5 +1,6 @@
-from collections import deque
-from typing import List, Optional
+from collections import OrderedDict
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
 
 from loguru import logger
 
@@ -7,9 +8,69 @@ from player_backends.Song import Song
 from playlist.playlist import Playlist
 
 
+class SongQueue:
+    # Songs in play order, indexed by uid so lookups never compare whole Song dataclasses
+    def __init__(self, songs: Iterable[Song] = ()) -> None:
+        self.songs: OrderedDict[str, Song] = OrderedDict()
+        self.extend(songs)
+
+    def append(self, song: Song) -> None:
+        # A song is queued at most once, queuing it again replaces it in place
+        self.songs[song.uid] = song
+
+    def appendleft(self, song: Song) -> None:
+        self.songs[song.uid] = song
+        self.songs.move_to_end(song.uid, last=False)
+
+    def extend(self, songs: Iterable[Song]) -> None:
+        for song in songs:
+            self.songs[song.uid] = song
+
+    def popleft(self) -> Song:
+        return self.songs.popitem(last=False)[1]
+
+    def remove(self, song: Song) -> None:
+        del self.songs[song.uid]
+
+    def replace(self, song: Song) -> None:
+        if song.uid in self.songs:
+            self.songs[song.uid] = song
+
+    def move_to_front(self, song: Song) -> None:
+        self.songs.move_to_end(song.uid, last=False)
+
+    def get(self, uid: str) -> Optional[Song]:
+        return self.songs.get(uid)
+
+    def clear(self) -> None:
+        self.songs.clear()
+
+    def __contains__(self, song: object) -> bool:
+        return getattr(song, "uid", None) in self.songs
+
+    def __iter__(self) -> Iterator[Song]:
+        return iter(self.songs.values())
+
+    def __len__(self) -> int:
+        return len(self.songs)
+
+    def __getitem__(self, index: int) -> Song:
+        # Only the ends are cheap, other positions walk the queue
+        if index < 0:
+            index += len(self.songs)
+
+        if 0 <= index == len(self.songs) - 1:
+            return next(reversed(self.songs.values()))
+
+        if index >= 0:
+            for song in islice(self.songs.values(), index, None):
+                return song
+        raise IndexError("Queue index out of range")
+
+
 class QueueManager:
     def __init__(self, history_playlist: Playlist) -> None:
-        self.queue: deque[Song] = deque()
+        self.queue: SongQueue = SongQueue()
         self.history_playlist = history_playlist
 
         # Set current song index to -1 to indicate that no song is playing
@@ -22,12 +83,10 @@ class QueueManager:
         self.queue.extend(songs)
 
     def set_queue(self, songs: List[Song]) -> None:
-        self.queue = deque(songs)
+        self.queue = SongQueue(songs)
 
     def update_song(self, song: Song) -> None:
-        if song in self.queue:
-            index = self.queue.index(song)
-            self.queue[index] = song
+        self.queue.replace(song)
 
     def pop_next_song(self) -> Optional[Song]:
         if self.queue:
@@ -49,10 +108,19 @@ class QueueManager:
     def peek_next_song(self) -> Optional[Song]:
         return self.queue[0] if self.queue else None
 
-    def prioritize_song(self, song: Song) -> None:
+    def remove_song(self, song: Song) -> None:
         if song in self.queue:
             self.queue.remove(song)
-            self.queue.appendleft(song)
+
+    def get_first_ready_song(self) -> Optional[Song]:
+        for song in self.queue:
+            if song.is_ready:
+                return song
+        return None
+
+    def prioritize_song(self, song: Song) -> None:
+        if song in self.queue:
+            self.queue.move_to_front(song)
 
     def clear(self) -> None:
         self.queue.clear()
@@ -1,7 +1,13 @@
 import os
 from PySide6.QtCore import QSettings
 from platformdirs import user_config_dir
-from playing_modes import LocalSource, ModArchiveSource, PlayingMode, PlayingSource
+from playing_modes import (
+    LocalSource,
+    ModArchiveSource,
+    PlayingMode,
+    PlayingSource,
+    ShuffleMode,
+)
 from PySide6.QtCore import QRect
 
 
@@ -66,6 +72,14 @@ class SettingsManager:
     def set_local_source(self, source: LocalSource) -> None:
         self.settings.setValue("local_source", source)
 
+    def get_shuffle_mode(self) -> ShuffleMode:
+        return ShuffleMode(
+            self.settings.value("shuffle_mode", ShuffleMode.OFF.value, type=int)
+        )
+
+    def set_shuffle_mode(self, mode: ShuffleMode) -> None:
+        self.settings.setValue("shuffle_mode", mode.value)
+
     def close(self) -> None:
         self.settings.sync()
 
@@ -77,6 +91,107 @@ class SettingsManager:
     def set_audio_buffer(self, buffer_size: int) -> None:
         self.settings.setValue("audio_buffer", buffer_size)
 
+    def get_module_cache_size(self) -> int:
+        # Size cap of the module download cache in MB
+        result = str(self.settings.value("module_cache_size", 500))
+
+        return int(result)
+
+    def set_module_cache_size(self, size: int) -> None:
+        self.settings.setValue("module_cache_size", size)
+
+    def get_prefetch_depth(self) -> int:
+        # Maximum number of random modules kept ready to play
+        result = str(self.settings.value("prefetch_depth", 3))
+
+        return int(result)
+
+    def set_prefetch_depth(self, depth: int) -> None:
+        self.settings.setValue("prefetch_depth", depth)
+
+    def get_background_bandwidth(self) -> int:
+        # Limit for prefetch downloads in KB/s while a module is waited for, 0 is unlimited
+        result = str(self.settings.value("background_bandwidth", 256))
+
+        return int(result)
+
+    def set_background_bandwidth(self, bandwidth: int) -> None:
+        self.settings.setValue("background_bandwidth", bandwidth)
+
+    def get_max_duration(self) -> int:
+        # Random modules longer than this many seconds are skipped, 0 is unlimited
+        result = str(self.settings.value("max_duration", 300))
+
+        return int(result) if result.isdigit() else 0
+
+    def set_max_duration(self, duration: int) -> None:
+        self.settings.setValue("max_duration", duration)
+
+    def get_max_play_time(self) -> int:
+        # Every song fades out after this many seconds, 0 is unlimited
+        result = str(self.settings.value("max_play_time", 0))
+
+        return int(result) if result.isdigit() else 0
+
+    def set_max_play_time(self, seconds: int) -> None:
+        self.settings.setValue("max_play_time", seconds)
+
+    def get_trailing_silence(self) -> int:
+        # Songs end after this many seconds of silence, 0 is off
+        result = str(self.settings.value("trailing_silence", 10))
+
+        return int(result) if result.isdigit() else 0
+
+    def set_trailing_silence(self, seconds: int) -> None:
+        self.settings.setValue("trailing_silence", seconds)
+
+    def get_skip_leading_silence(self) -> bool:
+        # QSettings returns booleans read back from disk as strings
+        return str(self.settings.value("skip_leading_silence", True)).lower() == "true"
+
+    def set_skip_leading_silence(self, enabled: bool) -> None:
+        self.settings.setValue("skip_leading_silence", enabled)
+
+    def get_max_module_size(self) -> int:
+        # Random modules larger than this many KB are skipped, 0 is unlimited
+        result = str(self.settings.value("max_module_size", 0))
+
+        return int(result) if result.isdigit() else 0
+
+    def set_max_module_size(self, size: int) -> None:
+        self.settings.setValue("max_module_size", size)
+
+    def get_excluded_formats(self) -> set[str]:
+        # File extensions of formats never picked at random, like "xm, it"
+        result = str(self.settings.value("excluded_formats", ""))
+
+        return {
+            extension.strip().lstrip(".").lower()
+            for extension in result.split(",")
+            if extension.strip()
+        }
+
+    def set_excluded_formats(self, formats: set[str]) -> None:
+        self.settings.setValue("excluded_formats", ", ".join(sorted(formats)))
+
+    def get_uade_state_pool_size(self) -> int:
+        # Number of idle UADE emulator instances kept running for reuse
+        result = str(self.settings.value("uade_state_pool_size", 2))
+
+        return int(result)
+
+    def set_uade_state_pool_size(self, size: int) -> None:
+        self.settings.setValue("uade_state_pool_size", size)
+
+    def get_history_window_size(self) -> int:
+        # Number of played songs kept in memory, older ones are read back from disk
+        result = str(self.settings.value("history_window_size", 200))
+
+        return int(result)
+
+    def set_history_window_size(self, size: int) -> None:
+        self.settings.setValue("history_window_size", size)
+
     def set_last_folder(self, folder: str) -> None:
         self.settings.setValue("last_folder", folder)
 
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+# Blocks quieter than this are silence, in dBFS of the RMS level
+SILENCE_THRESHOLD_DB = -60.0
+
+# A single click or tick louder than the threshold by this factor breaks the silence
+PEAK_FACTOR = 8.0
+
+# Modules that stay silent for this long from the start are given up on
+MAX_LEADING_SILENCE = 60.0
+
+# Shorter silence before the end of a module is not worth remembering, in seconds
+MIN_TRAILING_SILENCE = 1.0
+
+BYTES_PER_FRAME = 4
+
+# What the render loop does with a block
+PLAY = 0
+SKIP = 1
+END = 2
+
+
+@dataclass(slots=True)
+class SilenceBoundaries:
+    # Seconds of leading silence and where the trailing silence starts, 0 if not known
+    start: float = 0.0
+    end: float = 0.0
+
+
+class SilenceDetector:
+    # Looks at every rendered block of 16 bit stereo audio, skips silent intros and ends songs after trailing silence
+    def __init__(
+        self,
+        samplerate: int,
+        trailing_silence: float,
+        boundaries: Optional[SilenceBoundaries] = None,
+        on_boundaries_found: Optional[Callable[[SilenceBoundaries], None]] = None,
+        threshold_db: float = SILENCE_THRESHOLD_DB,
+        skip_leading_silence: bool = True,
+    ) -> None:
+        self.bytes_per_second = samplerate * BYTES_PER_FRAME
+        # 0 never ends a song early
+        self.trailing_silence = trailing_silence
+        self.skip_leading_silence = skip_leading_silence
+        self.boundaries = boundaries or SilenceBoundaries()
+        self.on_boundaries_found = on_boundaries_found
+
+        self.rms_limit = 32768 * 10 ** (threshold_db / 20)
+        self.peak_limit = self.rms_limit * PEAK_FACTOR
+
+        # Seconds rendered so far, including skipped blocks
+        self.position: float = 0.0
+        self.started: bool = not skip_leading_silence
+        self.silence_started: Optional[float] = None
+
+    def get_start_position(self) -> int:
+        # Cached leading silence that can be seeked over instead of rendered
+        if not self.skip_leading_silence:
+            return 0
+        return int(self.boundaries.start)
+
+    def set_position(self, position: float) -> None:
+        self.position = position
+        self.silence_started = None
+
+    def is_silent(self, buffer: bytes) -> bool:
+        samples = np.frombuffer(buffer, dtype=np.int16, count=len(buffer) // 2)
+        if samples.size == 0:
+            return True
+
+        # Peak first, it is cheaper and rules out most blocks of music
+        if max(int(samples.max()), -int(samples.min())) > self.peak_limit:
+            return False
+
+        levels = samples.astype(np.float32)
+        return float(np.dot(levels, levels)) < self.rms_limit**2 * samples.size
+
+    def process(self, buffer: bytes) -> int:
+        block_start = self.position
+        self.position += len(buffer) / self.bytes_per_second
+
+        if (
+            self.trailing_silence
+            and self.boundaries.end
+            and block_start >= self.boundaries.end
+        ):
+            return END
+
+        silent = self.is_silent(buffer)
+
+        if not self.started:
+            if silent:
+                return END if self.position > MAX_LEADING_SILENCE else SKIP
+
+            self.started = True
+            if block_start > 0 and not self.boundaries.start:
+                self.boundaries.start = block_start
+                self.report()
+            return PLAY
+
+        if not silent:
+            self.silence_started = None
+            return PLAY
+
+        if self.silence_started is None:
+            self.silence_started = block_start
+
+        # Not remembered, the music may well come back after a long pause
+        if (
+            self.trailing_silence
+            and self.position - self.silence_started >= self.trailing_silence
+        ):
+            return END
+        return PLAY
+
+    def finished(self) -> None:
+        # The module has ended on its own, silence up to here is known to be trailing
+        if self.boundaries.end or self.silence_started is None:
+            return
+
+        if self.position - self.silence_started >= MIN_TRAILING_SILENCE:
+            self.boundaries.end = self.silence_started
+            self.report()
+
+    def report(self) -> None:
+        if self.on_boundaries_found:
+            self.on_boundaries_found(
+                SilenceBoundaries(self.boundaries.start, self.boundaries.end)
+            )
@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cache.artist_catalogue import ArtistCatalogue
+from network_engine import NetworkEngine
+from web_helper import WebHelper
+
+
+@pytest.fixture
+def web_helper():
+    return MagicMock(spec=WebHelper)
+
+
+@pytest.fixture
+def artist_catalogue(web_helper, tmp_path):
+    with patch.object(ArtistCatalogue, "refresh"):
+        yield ArtistCatalogue(web_helper, MagicMock(spec=NetworkEngine), str(tmp_path))
+
+
+def test_get_ids_uses_normalized_artist(artist_catalogue):
+    artist_catalogue.on_ids_fetched("purple motion", [1, 2, 3])
+    assert artist_catalogue.get_ids(" Purple Motion ") == [1, 2, 3]
+
+
+def test_get_ids_unknown_artist(artist_catalogue):
+    assert artist_catalogue.get_ids("nobody") == []
+    artist_catalogue.refresh.assert_called_with("nobody")
+
+
+def test_fetch_ids_crawls_artist(artist_catalogue, web_helper):
+    web_helper.get_artist_module_id_list.return_value = [1, 2]
+    assert artist_catalogue.fetch_ids("purple motion") == [1, 2]
+    web_helper.get_artist_module_id_list.assert_called_once_with("purple motion")
@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cache.favorites_cache import FavoritesCache
+from cache.id_list_cache import RETRY_INTERVAL
+from network_engine import NetworkEngine, Priority
+from web_helper import WebHelper
+
+
+@pytest.fixture
+def web_helper():
+    return MagicMock(spec=WebHelper)
+
+
+@pytest.fixture
+def favorites_cache(web_helper, tmp_path):
+    with patch.object(FavoritesCache, "refresh"):
+        yield FavoritesCache(web_helper, MagicMock(spec=NetworkEngine), str(tmp_path))
+
+
+def test_unknown_member_is_not_decided(favorites_cache):
+    assert favorites_cache.is_favorite(1, 42) is None
+    assert favorites_cache.get_ids(1) == []
+
+
+def test_is_favorite_after_fetch(favorites_cache):
+    favorites_cache.on_ids_fetched("1", [42, 43])
+    assert favorites_cache.is_favorite(1, 42)
+    assert not favorites_cache.is_favorite(1, 44)
+    assert favorites_cache.get_ids(1) == [42, 43]
+
+
+def test_favorites_are_persisted(favorites_cache, web_helper, tmp_path):
+    favorites_cache.on_ids_fetched("1", [42])
+    reloaded = FavoritesCache(web_helper, MagicMock(spec=NetworkEngine), str(tmp_path))
+    assert reloaded.lists["1"].id_set == {42}
+
+
+def test_is_stale(favorites_cache):
+    assert favorites_cache.is_stale("1")
+    favorites_cache.on_ids_fetched("1", [42])
+    assert not favorites_cache.is_stale("1")
+    favorites_cache.lists["1"].fetched_at -= favorites_cache.ttl + 1
+    assert favorites_cache.is_stale("1")
+
+
+def test_set_favorite(favorites_cache):
+    favorites_cache.on_ids_fetched("1", [42])
+    favorites_cache.set_favorite(1, 43, True)
+    assert favorites_cache.is_favorite(1, 43)
+    favorites_cache.set_favorite(1, 42, False)
+    assert not favorites_cache.is_favorite(1, 42)
+    assert favorites_cache.get_ids(1) == [43]
+
+
+def test_failed_fetch_keeps_previous_list(favorites_cache):
+    favorites_cache.on_ids_fetched("1", [42])
+    favorites_cache.lists["1"].fetched_at -= favorites_cache.ttl + 1
+
+    favorites_cache.on_fetch_failed("1", "Connection refused")
+    assert favorites_cache.get_ids(1) == [42]
+    assert not favorites_cache.is_stale("1")
+
+    favorites_cache.failed_at["1"] -= RETRY_INTERVAL
+    assert favorites_cache.is_stale("1")
+
+
+def test_empty_list_is_cached(favorites_cache):
+    favorites_cache.on_ids_fetched("1", [])
+
+    assert favorites_cache.is_favorite(1, 42) is False
+    assert not favorites_cache.is_stale("1")
+
+
+def test_refresh_is_not_queued_behind_bulk_jobs(web_helper, tmp_path):
+    network_engine = MagicMock(spec=NetworkEngine)
+    favorites_cache = FavoritesCache(web_helper, network_engine, str(tmp_path))
+
+    favorites_cache.refresh("1")
+
+    assert network_engine.submit.call_args.kwargs["priority"] == Priority.NEXT
@@ -0,0 +1,112 @@
+import pytest
+
+from player_backends.Song import Song
+from playlist.history_playlist import HistoryLog, HistoryPlaylist
+
+
+def make_song(index: int) -> Song:
+    song = Song()
+    song.filename = f"/music/module_{index}.mod"
+    song.title = f"Module {index}"
+    song.credits = {"song_title": f"Module {index}"}
+    return song
+
+
+@pytest.fixture
+def history_playlist(tmp_path):
+    playlist = HistoryPlaylist(str(tmp_path / "history.log"), window_size=3)
+    yield playlist
+    playlist.close()
+
+
+def test_log_append_and_read(tmp_path):
+    log = HistoryLog(str(tmp_path / "history.log"))
+    songs = [make_song(index) for index in range(5)]
+
+    for song in songs:
+        log.append(song)
+
+    assert len(log) == 5
+    assert log.read(3) == songs[3]
+    assert log.read(3).title == "Module 3"
+    assert [song.title for song in log.read_range(1, 10)] == [
+        "Module 1",
+        "Module 2",
+        "Module 3",
+        "Module 4",
+    ]
+    log.close()
+
+
+def test_window_is_bounded(history_playlist):
+    songs = [make_song(index) for index in range(10)]
+
+    for song in songs:
+        history_playlist.add_song(song)
+
+    assert history_playlist.songs == songs[-3:]
+    assert history_playlist.window_start == 7
+    assert history_playlist.get_length() == 10
+    assert len(history_playlist.log) == 7
+
+
+def test_get_song_reads_spilled_songs(history_playlist):
+    songs = [make_song(index) for index in range(10)]
+
+    for song in songs:
+        history_playlist.add_song(song)
+
+    assert history_playlist.get_song(9) is songs[9]
+    assert history_playlist.get_song(2) == songs[2]
+    assert history_playlist.get_song(2).credits == {"song_title": "Module 2"}
+
+    with pytest.raises(IndexError):
+        history_playlist.get_song(10)
+
+
+def test_get_songs_spans_log_and_window(history_playlist):
+    songs = [make_song(index) for index in range(10)]
+
+    for song in songs:
+        history_playlist.add_song(song)
+
+    assert history_playlist.get_songs(5, 9) == songs[5:9]
+    assert history_playlist.get_songs(0, 20) == songs
+
+
+def test_previous_song_pages_into_log(history_playlist):
+    songs = [make_song(index) for index in range(10)]
+    history_playlist.current_song_index = -1
+
+    for song in songs:
+        history_playlist.add_song(song)
+        history_playlist.current_song_index += 1
+
+    previous = [history_playlist.get_previous_song() for _ in range(9)]
+
+    assert previous == list(reversed(songs[:9]))
+    assert history_playlist.get_previous_song() is None
+
+
+def test_songs_are_logged_when_leaving_window(history_playlist):
+    song = make_song(0)
+    history_playlist.add_song(song)
+
+    # Info filled in while the song is still in the window ends up in the log
+    song.title = "Probed title"
+    for index in range(1, 4):
+        history_playlist.add_song(make_song(index))
+
+    assert history_playlist.get_song(0).title == "Probed title"
+
+
+def test_set_window_size_spills_surplus(history_playlist):
+    songs = [make_song(index) for index in range(3)]
+
+    for song in songs:
+        history_playlist.add_song(song)
+
+    history_playlist.set_window_size(1)
+
+    assert history_playlist.songs == songs[2:]
+    assert history_playlist.get_songs(0, 3) == songs
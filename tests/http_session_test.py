@@ -0,0 +1,83 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from http_session import BandwidthLimiter, HttpSession, RateLimiter, RequestMetrics
+
+
+@pytest.fixture
+def http_session():
+    session = HttpSession(connect_timeout=1.0, read_timeout=2.0, min_request_interval=0)
+    session.session = MagicMock(spec=requests.Session)
+    return session
+
+
+def test_request_uses_default_timeout(http_session):
+    http_session.session.request.return_value = MagicMock(status_code=200)
+    http_session.get("https://modarchive.org/index.php?request=view_player")
+    _, kwargs = http_session.session.request.call_args
+    assert kwargs["timeout"] == (1.0, 2.0)
+
+
+def test_request_keeps_explicit_timeout(http_session):
+    http_session.session.request.return_value = MagicMock(status_code=200)
+    http_session.get("https://modarchive.org/", timeout=10)
+    _, kwargs = http_session.session.request.call_args
+    assert kwargs["timeout"] == 10
+
+
+def test_request_records_metrics(http_session):
+    http_session.session.request.return_value = MagicMock(status_code=404)
+    http_session.get("https://modarchive.org/index.php?request=search&query=x")
+    stats = http_session.metrics.get_stats("modarchive.org/index.php?request=search")
+    assert stats is not None
+    assert stats.count == 1
+    assert stats.errors == 1
+
+
+def test_request_records_failed_requests(http_session):
+    http_session.session.request.side_effect = requests.ConnectTimeout()
+    with pytest.raises(requests.ConnectTimeout):
+        http_session.get("https://api.modarchive.org/downloads.php?moduleid=1")
+    stats = http_session.metrics.get_stats("api.modarchive.org/downloads.php")
+    assert stats is not None
+    assert stats.errors == 1
+
+
+def test_retries_are_configured():
+    session = HttpSession(retries=2)
+    adapter = session.session.get_adapter("https://modarchive.org/")
+    assert adapter.max_retries.total == 2
+    assert 503 in adapter.max_retries.status_forcelist
+
+
+def test_rate_limiter_spaces_requests():
+    rate_limiter = RateLimiter(0.05)
+    started = time.monotonic()
+    for _ in range(3):
+        rate_limiter.wait()
+    assert time.monotonic() - started >= 0.1
+
+
+def test_metrics_summary():
+    metrics = RequestMetrics()
+    metrics.record("a", 0.1)
+    metrics.record("a", 0.3)
+    summary = metrics.summary()
+    assert summary["a"]["count"] == 2
+    assert summary["a"]["average_ms"] == pytest.approx(200)
+    assert summary["a"]["max_ms"] == pytest.approx(300)
+
+
+def test_bandwidth_limiter_spaces_transfers():
+    limiter = BandwidthLimiter(100000)
+    assert limiter.consume(10000) == 0
+    assert limiter.consume(10000) > 0.05
+
+
+def test_bandwidth_limiter_unlimited():
+    limiter = BandwidthLimiter(0)
+    limiter.consume(10000)
+    assert limiter.consume(10000) == 0
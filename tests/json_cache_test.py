@@ -0,0 +1,54 @@
+import os
+from typing import Any, Dict
+
+from cache.json_cache import JsonCache, load_json, save_json
+
+
+class CounterCache(JsonCache):
+    name = "counter cache"
+
+    def __init__(self, filename: str) -> None:
+        self.counts: Dict[str, int] = {}
+        super().__init__(filename)
+
+    def from_json(self, data: Any) -> None:
+        self.counts.update(data)
+
+    def to_json(self) -> Any:
+        return dict(self.counts)
+
+    def increment(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.dirty = True
+
+
+def test_save_and_load_json(tmp_path):
+    filename = str(tmp_path / "data.json")
+    assert load_json(filename, "data") is None
+
+    save_json(filename, {"a": [1, 2]})
+
+    assert load_json(filename, "data") == {"a": [1, 2]}
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_broken_json_starts_empty(tmp_path):
+    filename = tmp_path / "data.json"
+    filename.write_text('{"a": [1,')
+
+    assert load_json(str(filename), "data") is None
+    assert CounterCache(str(filename)).counts == {}
+
+
+def test_cache_is_only_written_when_changed(tmp_path):
+    filename = str(tmp_path / "counts.json")
+    cache = CounterCache(filename)
+    cache.save()
+    assert not os.path.exists(filename)
+
+    cache.increment("a")
+    cache.save()
+
+    assert not cache.dirty
+    assert CounterCache(filename).counts == {"a": 1}
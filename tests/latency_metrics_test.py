@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from latency_metrics import (
+    DOWNLOAD,
+    FETCH,
+    FIRST_AUDIO,
+    LatencyHistogram,
+    LatencyMetrics,
+)
+
+
+@pytest.fixture
+def latency_metrics():
+    return LatencyMetrics()
+
+
+def test_histogram_record():
+    histogram = LatencyHistogram()
+    for seconds in (0.003, 0.004, 0.08, 1.5):
+        histogram.record(seconds)
+
+    assert histogram.count == 4
+    assert histogram.min_time == 0.003
+    assert histogram.max_time == 1.5
+    assert histogram.average_time == pytest.approx(0.39675)
+    assert sum(histogram.buckets) == 4
+
+
+def test_histogram_percentile():
+    histogram = LatencyHistogram()
+    for _ in range(95):
+        histogram.record(0.015)
+    for _ in range(5):
+        histogram.record(45.0)
+
+    assert histogram.get_percentile(0.5) == pytest.approx(0.02)
+    assert histogram.get_percentile(0.95) == pytest.approx(0.02)
+    assert histogram.get_percentile(0.99) == 45.0
+
+
+def test_histogram_percentile_empty():
+    assert LatencyHistogram().get_percentile(0.95) == 0.0
+
+
+def test_measure(latency_metrics):
+    with latency_metrics.measure(FETCH):
+        pass
+
+    histogram = latency_metrics.get_histogram(FETCH)
+    assert histogram is not None
+    assert histogram.count == 1
+
+
+def test_measure_skips_failures(latency_metrics):
+    with pytest.raises(ValueError):
+        with latency_metrics.measure(FETCH):
+            raise ValueError()
+
+    assert latency_metrics.get_histogram(FETCH) is None
+
+
+def test_summary_in_stage_order(latency_metrics):
+    latency_metrics.record(FIRST_AUDIO, 0.05)
+    latency_metrics.record(DOWNLOAD, 0.5)
+    latency_metrics.record(FETCH, 0.2)
+
+    assert list(latency_metrics.summary()) == [FETCH, DOWNLOAD, FIRST_AUDIO]
+
+
+def test_dump(latency_metrics, tmp_path):
+    latency_metrics.record(DOWNLOAD, 0.5)
+    filename = tmp_path / "latency.json"
+
+    latency_metrics.dump(str(filename))
+
+    with open(filename) as f:
+        summary = json.load(f)
+    assert summary[DOWNLOAD]["count"] == 1
+    assert summary[DOWNLOAD]["buckets"]["<=500ms"] == 1
@@ -0,0 +1,176 @@
+import os
+
+import pytest
+
+from player_backends.Song import Song
+from playlist.library_store import LibraryStore
+from playlist.playlist import Playlist
+
+
+def make_song(**fields) -> Song:
+    return Song(
+        **{"filename": "/music/song.mod", "backend_name": "LibOpenMPT", **fields}
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LibraryStore(str(tmp_path / "library.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def playlist():
+    playlist = Playlist(
+        "Test Playlist",
+        [
+            make_song(title="First", artist="Jester", duration=120),
+            make_song(
+                title="Second",
+                filename="/music/second.xm",
+                artist="Purple Motion",
+                duration=300,
+            ),
+            make_song(title="Third", backend_name="LibUADE", duration=60),
+        ],
+    )
+    playlist.tab_index = 1
+    playlist.current_song_index = 2
+    return playlist
+
+
+def test_playlist_round_trip(store, playlist):
+    store.save_playlist(playlist)
+
+    loaded = store.load_playlists()
+
+    assert len(loaded) == 1
+    assert loaded[0].uuid == playlist.uuid
+    assert loaded[0].name == "Test Playlist"
+    assert (loaded[0].tab_index, loaded[0].current_song_index) == (1, 2)
+    assert [song.title for song in loaded[0].songs] == ["First", "Second", "Third"]
+    assert loaded[0].songs == playlist.songs
+
+
+def test_songs_are_loaded_when_needed(store, playlist):
+    store.save_playlist(playlist)
+    store.connection.execute("DELETE FROM songs WHERE artist = 'Jester'")
+
+    # Startup only reads the playlist rows
+    loaded = store.load_playlists()[0]
+
+    assert not loaded.is_loaded()
+    assert loaded.get_length() == 3
+
+    assert [song.title for song in loaded.songs] == ["Second", "Third"]
+    assert loaded.is_loaded()
+    assert loaded.get_length() == 2
+
+
+def test_upgrade_adds_song_counts(tmp_path, playlist):
+    filename = str(tmp_path / "library.db")
+    store = LibraryStore(filename)
+    store.save_playlist(playlist)
+    store.connection.executescript(
+        "ALTER TABLE playlists DROP COLUMN song_count; PRAGMA user_version = 1;"
+    )
+    store.close()
+
+    store = LibraryStore(filename)
+    loaded = store.load_playlists()
+    version = store.connection.execute("PRAGMA user_version").fetchone()[0]
+    store.close()
+
+    assert version == 2
+    assert loaded[0].get_length() == 3
+    assert not loaded[0].is_loaded()
+
+
+def test_songs_are_stored_once(store, playlist):
+    other = Playlist("Other", [playlist.songs[1]])
+    store.save_playlist(playlist)
+    store.save_playlist(other)
+
+    assert store.connection.execute("SELECT COUNT(*) FROM songs").fetchone()[0] == 3
+
+
+def test_removed_songs_are_deleted_when_unused(store, playlist):
+    other = Playlist("Other", [playlist.songs[1]])
+    store.save_playlist(playlist)
+    store.save_playlist(other)
+
+    playlist.remove_song(playlist.songs[1])
+    playlist.remove_song(playlist.songs[0])
+    store.save_playlist(playlist)
+
+    assert store.connection.execute("SELECT COUNT(*) FROM songs").fetchone()[0] == 2
+
+    store.delete_playlist(other.uuid)
+
+    assert [playlist.uuid for playlist in store.load_playlists()] == [playlist.uuid]
+    assert store.connection.execute("SELECT COUNT(*) FROM songs").fetchone()[0] == 1
+
+
+def test_find_songs(store, playlist):
+    store.save_playlist(playlist)
+
+    def titles(**filters):
+        return sorted(song.title for song in store.find_songs(**filters))
+
+    assert titles(backend_name="LibUADE") == ["Third"]
+    assert titles(format="XM") == ["Second"]
+    assert titles(artist="purple motion") == ["Second"]
+    assert titles(min_duration=100, max_duration=200) == ["First"]
+    assert titles(backend_name="LibOpenMPT", format="mod") == ["First"]
+    assert len(titles()) == 3
+
+
+def test_find_songs_uses_index(store):
+    plan = store.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM songs WHERE artist = ? COLLATE NOCASE",
+        ("Jester",),
+    ).fetchall()
+
+    assert "songs_artist" in str(plan)
+
+
+def test_save_songs_updates_song_info(store, playlist):
+    store.save_playlist(playlist)
+    playlist.songs[0].title = "Renamed"
+
+    store.save_songs([playlist.songs[0]])
+
+    assert store.load_playlists()[0].songs[0].title == "Renamed"
+
+
+def test_migrate_playlist_files(store, playlist, tmp_path):
+    playlist_dir = tmp_path / "config"
+    playlist_dir.mkdir()
+    filename = str(playlist_dir / f"{playlist.uuid}.playlist")
+    playlist.to_json(filename)
+
+    assert store.migrate_playlist_files(str(playlist_dir)) == 1
+    assert store.migrate_playlist_files(str(playlist_dir)) == 0
+
+    assert not os.path.exists(filename)
+    assert os.path.exists(f"{filename}.migrated")
+    loaded = store.load_playlists()
+    assert [song.title for song in loaded[0].songs] == ["First", "Second", "Third"]
+
+
+def test_compact_replaces_database(store, tmp_path):
+    playlist = Playlist("Large", [make_song(title="x" * 1000) for _ in range(500)])
+    store.save_playlist(playlist)
+    store.delete_playlist(playlist.uuid)
+    store.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = os.path.getsize(tmp_path / "library.db")
+
+    assert store.needs_compaction()
+    store.compact()
+
+    assert os.path.getsize(tmp_path / "library.db") < size / 4
+    assert not os.path.exists(tmp_path / "library.db.tmp")
+    assert not store.needs_compaction()
+    store.save_playlist(Playlist("After", [make_song(title="a")]))
+    assert [playlist.name for playlist in store.load_playlists()] == ["After"]
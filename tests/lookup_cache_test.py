@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from cache.lookup_cache import MODARCHIVE, MSM, LookupCache
+from network_engine import NetworkEngine, Priority
+from player_backends.Song import Song
+from web_helper import WebHelper
+
+
+@pytest.fixture
+def web_helper():
+    web_helper = MagicMock(spec=WebHelper)
+    web_helper.lookup_modarchive_mod_url.return_value = (
+        "https://modarchive.org/module.php?1"
+    )
+    web_helper.lookup_msm_mod_url.return_value = ""
+    return web_helper
+
+
+@pytest.fixture
+def network_engine():
+    return MagicMock(spec=NetworkEngine)
+
+
+@pytest.fixture
+def lookup_cache(web_helper, network_engine, tmp_path):
+    return LookupCache(web_helper, network_engine, str(tmp_path))
+
+
+@pytest.fixture
+def song():
+    return Song(filename="/tmp/knallhatten.mod", sha1="abc")
+
+
+def finish_jobs(network_engine):
+    for call in network_engine.submit.call_args_list:
+        function, *args = call.args
+        call.kwargs["on_finished"](function(*args))
+    network_engine.submit.reset_mock()
+
+
+def test_lookup_runs_on_network_engine(lookup_cache, network_engine, song):
+    callback = MagicMock()
+    lookup_cache.lookup(MODARCHIVE, song, callback)
+    callback.assert_not_called()
+
+    finish_jobs(network_engine)
+    callback.assert_called_once_with("https://modarchive.org/module.php?1")
+
+
+def test_lookup_is_cached(lookup_cache, network_engine, web_helper, song, tmp_path):
+    lookup_cache.lookup(MODARCHIVE, song)
+    finish_jobs(network_engine)
+
+    callback = MagicMock()
+    lookup_cache.lookup(MODARCHIVE, song, callback)
+    callback.assert_called_once_with("https://modarchive.org/module.php?1")
+    network_engine.submit.assert_not_called()
+
+    reloaded = LookupCache(web_helper, network_engine, str(tmp_path))
+    assert (
+        reloaded.get_cached(MODARCHIVE, song) == "https://modarchive.org/module.php?1"
+    )
+
+
+def test_lookup_joins_pending_lookup(lookup_cache, network_engine, song):
+    lookup_cache.prefetch(song)
+    assert network_engine.submit.call_count == 2
+
+    callback = MagicMock()
+    lookup_cache.lookup(MSM, song, callback)
+    assert network_engine.submit.call_count == 2
+    network_engine.set_priority.assert_called_once_with(
+        lookup_cache.pending_jobs[lookup_cache.get_key(MSM, song)],
+        Priority.NOW_PLAYING,
+    )
+
+    finish_jobs(network_engine)
+    callback.assert_called_once_with("")
+
+
+def test_negative_results_expire(lookup_cache, network_engine, song):
+    lookup_cache.lookup(MSM, song)
+    finish_jobs(network_engine)
+    assert lookup_cache.get_cached(MSM, song) == ""
+
+    lookup_cache.entries[lookup_cache.get_key(MSM, song)]["time"] -= (
+        lookup_cache.negative_ttl + 1
+    )
+    assert lookup_cache.get_cached(MSM, song) is None
+
+
+def test_failed_lookup_calls_back_without_caching(lookup_cache, network_engine, song):
+    callback = MagicMock()
+    lookup_cache.lookup(MODARCHIVE, song, callback)
+    network_engine.submit.call_args.kwargs["on_failed"](RuntimeError("Timeout"))
+
+    callback.assert_called_once_with("")
+    assert lookup_cache.get_cached(MODARCHIVE, song) is None
+    assert lookup_cache.pending_jobs == {}
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from benchmarks.html_extraction import (
+    FIXTURE_DIR,
+    extract_with_scanner,
+    extract_with_soup,
+    get_fixtures,
+)
+from modarchive_page import (
+    ModArchivePage,
+    get_module_format_from_url,
+    get_module_id_from_url,
+    parse_module_size,
+)
+
+
+def load_page(filename):
+    with open(os.path.join(FIXTURE_DIR, filename), "rb") as f:
+        return ModArchivePage.parse(f.read())
+
+
+@pytest.mark.parametrize("filename", sorted(get_fixtures(FIXTURE_DIR)))
+def test_scanner_matches_beautifulsoup(filename):
+    content = get_fixtures(FIXTURE_DIR)[filename]
+    assert extract_with_scanner(content) == extract_with_soup(content)
+
+
+def test_random_page():
+    page = load_page("random.html")
+    assert get_module_id_from_url(page.standard_link_with_text) == 187345
+
+
+def test_search_page():
+    page = load_page("search.html")
+    assert page.has_search_results
+    assert page.get_last_page() == 2
+    assert len(page.get_download_link_ids()) == 40
+
+
+def test_search_page_without_pagination():
+    page = load_page("search_single_page.html")
+    assert not page.has_pagination
+    assert page.get_last_page() == 1
+
+
+def test_favourites_page():
+    page = load_page("favourites.html")
+    assert page.textarea_text is not None
+    assert len(page.textarea_text.split("\n")) == 300
+
+
+def test_link_with_nested_tag_has_no_text():
+    page = ModArchivePage.parse(
+        b'<a class="standard-link" href="a?id=1"><img src="x.png"></a>'
+        b'<a class="standard-link big" href="a?id=2">Module</a>'
+    )
+    assert page.standard_link == "a?id=1"
+    assert page.standard_link_with_text == "a?id=2"
+
+
+def test_unclosed_options():
+    page = ModArchivePage.parse(
+        b'<select class="pagination"><option>1<option>2<option>3</select>'
+    )
+    assert page.pagination_options == ["1", "2", "3"]
+    assert page.get_last_page() == 3
+
+
+def test_search_page_module_metadata():
+    metadata = load_page("search_page_2.html").get_module_metadata()
+    assert metadata[10379] == ("it", 248 * 1024)
+    assert metadata[109118] == ("xm", 399 * 1024)
+
+
+def test_module_format_and_size():
+    url = "https://api.modarchive.org/downloads.php?moduleid=187345#space_debris.mod"
+    assert get_module_format_from_url(url) == "mod"
+    assert get_module_format_from_url("module.php?187345") == ""
+    assert parse_module_size("248KB") == 248 * 1024
+    assert parse_module_size("1.5MB") == 1536 * 1024
+    assert parse_module_size("unknown") == 0
@@ -0,0 +1,118 @@
+import filecmp
+import os
+import threading
+
+import pytest
+import requests
+
+from benchmarks.modarchive_server import MODULE_FILE, ModArchiveStubServer
+from cache.module_cache import ModuleCache
+from http_session import HttpSession
+from loaders.modarchive_downloader import ModArchiveDownloader
+from network_engine import CancellationToken
+from player_backends.Song import Song
+from web_helper import WebHelper
+
+
+@pytest.fixture
+def server():
+    server = ModArchiveStubServer(seed=1)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def web_helper(server):
+    return WebHelper(HttpSession(retries=0, min_request_interval=0), server.url)
+
+
+def test_get_random_module_id(web_helper):
+    assert web_helper.get_random_module_id() is not None
+
+
+def test_get_member_module_id_list(web_helper):
+    assert len(web_helper.get_member_module_id_list(1)) == 300
+
+
+def test_get_artist_module_id_list(web_helper, server):
+    assert len(web_helper.get_artist_module_id_list("purple motion")) == 65
+    assert server.request_count == 2
+
+
+def test_lookup_modarchive_mod_url(web_helper, server):
+    song = Song(filename="/tmp/knallhatten.mod")
+    assert web_helper.lookup_modarchive_mod_url(song).startswith(
+        f"{server.url}/module.php?"
+    )
+
+
+def test_lookup_modarchive_mod_url_by_id(web_helper, server):
+    song = Song(filename="/tmp/42.mod", modarchive_id=42)
+    assert web_helper.lookup_modarchive_mod_url(song) == f"{server.url}/module.php?42"
+    assert server.request_count == 0
+
+
+def test_lookup_msm_mod_url(web_helper, server):
+    song = Song(filename="/tmp/knallhatten.mod", sha1="abc")
+    assert web_helper.lookup_msm_mod_url(song) == f"{server.url}/module.php?sha1=abc"
+
+
+def test_download_module_file(web_helper, tmp_path):
+    filename = web_helper.download_module_file(42, str(tmp_path))
+    assert os.path.basename(filename) == "42.mod"
+    assert filecmp.cmp(filename, MODULE_FILE, shallow=False)
+
+
+def test_same_module_is_downloaded_once_at_a_time(web_helper, server, tmp_path):
+    # Slow enough for the second download to start while the first is running
+    server.bandwidth = 500 * 1024
+    module_cache = ModuleCache(str(tmp_path / "cache"), 10 * 1024 * 1024)
+    songs = [Song(modarchive_id=42), Song(modarchive_id=42)]
+    errors = []
+
+    def download(song):
+        try:
+            ModArchiveDownloader(
+                web_helper, song, str(tmp_path), module_cache
+            ).load_module(CancellationToken())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=download, args=(song,)) for song in songs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert errors == []
+    assert server.request_count == 1
+    assert songs[0].filename == songs[1].filename
+    assert filecmp.cmp(songs[0].filename, MODULE_FILE, shallow=False)
+    assert not os.path.exists(tmp_path / "42.part")
+
+
+def test_download_module_file_resumes_dropped_connection(web_helper, server, tmp_path):
+    server.drop_rate = 1.0
+    requests_before = server.request_count
+
+    # Every response is cut in half, each attempt resumes where the last one stopped
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        web_helper.download_module_file(42, str(tmp_path))
+    assert server.request_count - requests_before == 3
+
+    server.drop_rate = 0.0
+    filename = web_helper.download_module_file(42, str(tmp_path))
+    assert filecmp.cmp(filename, MODULE_FILE, shallow=False)
+
+
+def test_error_injection(web_helper, server):
+    server.error_rate = 1.0
+    with pytest.raises(requests.HTTPError):
+        web_helper.get_random_module_id()
+
+
+def test_latency_injection(web_helper, server):
+    server.latency = 0.2
+    response = requests.get(f"{server.url}/index.php?request=view_player")
+    assert response.elapsed.total_seconds() >= 0.2
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from cache.module_cache import ModuleCache
+
+
+@pytest.fixture
+def module_cache(tmp_path):
+    return ModuleCache(str(tmp_path / "cache"), 100)
+
+
+def create_file(directory, name, content):
+    path = directory / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_store_and_get_by_id(module_cache, tmp_path):
+    filename = create_file(tmp_path, "song.mod", b"a" * 10)
+    path = module_cache.store(filename, 42)
+    assert os.path.exists(path)
+    assert not os.path.exists(filename)
+    assert os.path.basename(path) == "song.mod"
+    assert module_cache.get_by_id(42) == path
+
+
+def test_same_name_different_content(module_cache, tmp_path):
+    path1 = module_cache.store(create_file(tmp_path, "song.mod", b"a" * 10), 1)
+    path2 = module_cache.store(create_file(tmp_path, "song.mod", b"b" * 10), 2)
+    assert path1 != path2
+    assert open(path1, "rb").read() == b"a" * 10
+    assert open(path2, "rb").read() == b"b" * 10
+
+
+def test_duplicate_content_is_stored_once(module_cache, tmp_path):
+    path1 = module_cache.store(create_file(tmp_path, "a.mod", b"a" * 10), 1)
+    path2 = module_cache.store(create_file(tmp_path, "a.mod", b"a" * 10), 2)
+    assert path1 == path2
+    assert module_cache.get_total_size() == 10
+
+
+def test_lru_eviction(module_cache, tmp_path):
+    module_cache.store(create_file(tmp_path, "1.mod", b"1" * 40), 1)
+    module_cache.store(create_file(tmp_path, "2.mod", b"2" * 40), 2)
+    # Touch the first one so the second becomes least recently used
+    module_cache.entries[module_cache.ids[2]]["last_access"] = 0
+    module_cache.store(create_file(tmp_path, "3.mod", b"3" * 40), 3)
+    assert module_cache.get_by_id(1) is not None
+    assert module_cache.get_by_id(2) is None
+    assert module_cache.get_by_id(3) is not None
+    assert module_cache.get_total_size() <= 100
+
+
+def test_survives_restart(module_cache, tmp_path):
+    path = module_cache.store(create_file(tmp_path, "song.mod", b"a" * 10), 42)
+    reopened = ModuleCache(module_cache.cache_dir, 100)
+    assert reopened.get_by_id(42) == path
+
+
+def test_missing_file_is_a_miss(module_cache, tmp_path):
+    path = module_cache.store(create_file(tmp_path, "song.mod", b"a" * 10), 42)
+    os.remove(path)
+    assert module_cache.get_by_id(42) is None
+
+
+def test_set_max_size_evicts(module_cache, tmp_path):
+    module_cache.store(create_file(tmp_path, "1.mod", b"1" * 40), 1)
+    module_cache.store(create_file(tmp_path, "2.mod", b"2" * 40), 2)
+    module_cache.set_max_size(50)
+    assert module_cache.get_total_size() <= 50
+
+
+def test_hits_are_written_on_close(module_cache, tmp_path):
+    module_cache.store(create_file(tmp_path, "song.mod", b"a" * 10), 42)
+    modified = os.path.getmtime(module_cache.index_filename)
+    os.utime(module_cache.index_filename, (0, 0))
+
+    module_cache.get_by_id(42)
+    assert os.path.getmtime(module_cache.index_filename) == 0
+
+    module_cache.close()
+    assert os.path.getmtime(module_cache.index_filename) >= modified
@@ -0,0 +1,91 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+# The script name is not a valid module name
+spec = importlib.util.spec_from_file_location(
+    "module_indexer",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "module-indexer.py"),
+)
+module_indexer = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module_indexer)
+
+
+def make_record(path: str, ok: bool = True) -> dict:
+    song = {"backend_name": "LibUADE", "title": "Song", "sha1": "abc"} if ok else None
+    return {"path": path, "ok": ok, "song": song, "mtime": 1.0, "size": 100}
+
+
+@pytest.fixture(params=["index.jsonl", "index.db"])
+def filename(request, tmp_path):
+    return str(tmp_path / request.param)
+
+
+def test_create_writer_guesses_format(tmp_path):
+    jsonl_writer = module_indexer.create_writer(str(tmp_path / "a.jsonl"), None, True)
+    sqlite_writer = module_indexer.create_writer(str(tmp_path / "a.db"), None, True)
+
+    assert isinstance(jsonl_writer, module_indexer.JsonLinesWriter)
+    assert isinstance(sqlite_writer, module_indexer.SQLiteWriter)
+    jsonl_writer.close()
+    sqlite_writer.close()
+
+
+def test_resume_skips_processed_paths(filename):
+    writer = module_indexer.create_writer(filename, None, True)
+    writer.write(make_record("/music/a.mod"))
+    writer.write(make_record("/music/b.mod", ok=False))
+    writer.close()
+
+    writer = module_indexer.create_writer(filename, None, True)
+    pending = module_indexer.get_pending_files(
+        ["/music/a.mod", "/music/b.mod", "/music/c.mod"], writer
+    )
+    writer.close()
+
+    assert pending == ["/music/c.mod"]
+
+
+def test_no_resume_starts_over(filename):
+    writer = module_indexer.create_writer(filename, None, True)
+    writer.write(make_record("/music/a.mod"))
+    writer.close()
+
+    writer = module_indexer.create_writer(filename, None, False)
+    assert writer.processed_paths() == set()
+    writer.close()
+
+
+def test_jsonl_writer_skips_truncated_line(tmp_path):
+    filename = str(tmp_path / "index.jsonl")
+    with open(filename, "w") as f:
+        f.write(json.dumps(make_record("/music/a.mod")) + "\n")
+        f.write('{"path": "/music/b.m')
+
+    writer = module_indexer.JsonLinesWriter(filename)
+    writer.write(make_record("/music/c.mod"))
+    writer.close()
+
+    reader = module_indexer.JsonLinesWriter(filename)
+    processed = reader.processed_paths()
+    reader.close()
+
+    assert processed == {"/music/a.mod", "/music/c.mod"}
+
+
+def test_sqlite_writer_stores_song_columns(tmp_path):
+    writer = module_indexer.SQLiteWriter(str(tmp_path / "index.db"))
+    writer.write(make_record("/music/a.mod"))
+    writer.write(make_record("/music/b.mod", ok=False))
+    writer.flush()
+
+    rows = writer.connection.execute(
+        "SELECT path, ok, backend_name, title, sha1, song FROM modules ORDER BY path"
+    ).fetchall()
+    writer.close()
+
+    assert rows[0][:5] == ("/music/a.mod", 1, "LibUADE", "Song", "abc")
+    assert json.loads(rows[0][5])["title"] == "Song"
+    assert rows[1] == ("/music/b.mod", 0, None, None, None, None)
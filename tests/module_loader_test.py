@@ -0,0 +1,107 @@
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from loaders.modarchive_downloader import ModArchiveDownloader
+from loaders.module_loader import ModuleLoader
+from network_engine import CancellationToken, NetworkEngine
+from player_backends.player_backend import PlayerBackend
+from player_backends.Song import Song
+from playing_modes import PlayingSource
+from playing_settings import PlayingSettings
+from web_helper import WebHelper
+
+
+class ProbingPlayerBackend(PlayerBackend):
+    probed_songs: list[Song] = []
+    cleaned_up: int = 0
+
+    def check_module(self) -> bool:
+        self.probed_songs.append(self.song)
+        return True
+
+    def retrieve_song_info(self) -> None:
+        self.song.title = "Probed"
+
+    def probe_header(self, header: bytes, filename: str) -> Optional[bool]:
+        return False
+
+    def cleanup(self) -> None:
+        ProbingPlayerBackend.cleaned_up += 1
+
+
+class FailingPlayerBackend(ProbingPlayerBackend):
+    def check_module(self) -> bool:
+        raise RuntimeError("Cannot load module")
+
+    def probe_header(self, header: bytes, filename: str) -> Optional[bool]:
+        raise RuntimeError("Cannot read header")
+
+
+@pytest.fixture
+def network_engine():
+    return MagicMock(spec=NetworkEngine)
+
+
+@pytest.fixture
+def module_loader(network_engine):
+    playing_settings = MagicMock(spec=PlayingSettings)
+    playing_settings.playing_source = PlayingSource.MODARCHIVE
+    ProbingPlayerBackend.probed_songs = []
+    ProbingPlayerBackend.cleaned_up = 0
+
+    return ModuleLoader(
+        playing_settings,
+        "",
+        MagicMock(spec=WebHelper),
+        "/tmp",
+        {"Probing": ProbingPlayerBackend},
+        network_engine,
+    )
+
+
+def test_download_job_retrieves_song_info(module_loader, network_engine):
+    song = Song(modarchive_id=42)
+    module_loader.load_modules(song)
+    function, *args = network_engine.submit.call_args.args
+
+    downloader = MagicMock(spec=ModArchiveDownloader)
+    downloader.load_module.return_value = song
+    loaded_song = function(downloader, CancellationToken())
+
+    assert loaded_song is song
+    assert song.title == "Probed"
+    assert song.backend_name == "Probing"
+
+
+def test_downloaded_song_is_emitted_without_probing(module_loader):
+    song = Song(modarchive_id=42)
+    loaded = MagicMock()
+    module_loader.song_loaded.connect(loaded)
+
+    module_loader.on_module_downloaded(song, song)
+
+    loaded.assert_called_once_with(song)
+    assert ProbingPlayerBackend.probed_songs == []
+
+
+def test_failed_download_is_not_probed(module_loader):
+    downloader = MagicMock(spec=ModArchiveDownloader)
+    downloader.load_module.return_value = None
+
+    assert module_loader.download_module(downloader, CancellationToken()) is None
+    assert ProbingPlayerBackend.probed_songs == []
+
+
+def test_probe_backends_are_cleaned_up(module_loader):
+    module_loader.player_backends["Failing"] = FailingPlayerBackend
+
+    assert module_loader.update_song_info(Song()) is not None
+    assert module_loader.probe_header(b"M.K.", "song.mod")
+    assert ProbingPlayerBackend.cleaned_up == 3
+
+    del module_loader.player_backends["Probing"]
+    with pytest.raises(RuntimeError):
+        module_loader.update_song_info(Song())
+    assert ProbingPlayerBackend.cleaned_up == 4
@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from cache.module_metadata_cache import (
+    CandidateFilter,
+    ModuleMetadata,
+    ModuleMetadataCache,
+)
+from loaders.modarchive_random_module_fetcher import ModArchiveRandomModuleFetcher
+from player_backends.Song import Song
+from playing_modes import ModArchiveSource, PlayingMode, PlayingSource
+
+
+@pytest.fixture
+def metadata_cache(tmp_path):
+    return ModuleMetadataCache(str(tmp_path))
+
+
+def test_update_keeps_known_values(metadata_cache):
+    metadata_cache.update(1, "XM", 1024)
+    metadata_cache.update(1, duration=200)
+
+    assert metadata_cache.get(1) == ModuleMetadata("xm", 1024, 200)
+    assert metadata_cache.get(2) is None
+
+
+def test_record_song(metadata_cache):
+    song = Song()
+    song.modarchive_id = 5
+    song.filename = "/tmp/space_debris.mod"
+    song.modulebytes = 4096
+    song.duration = 321
+    metadata_cache.record_song(song)
+
+    assert metadata_cache.get(5) == ModuleMetadata("mod", 4096, 321)
+
+
+def test_candidate_filter():
+    candidate_filter = CandidateFilter(300, 100 * 1024, {"xm"})
+
+    assert candidate_filter.get_rejection(ModuleMetadata("mod", 1024, 200)) is None
+    assert candidate_filter.get_rejection(ModuleMetadata("xm", 1024, 200))
+    assert candidate_filter.get_rejection(ModuleMetadata("mod", 200 * 1024, 200))
+    assert candidate_filter.get_rejection(ModuleMetadata("mod", 1024, 400))
+    assert candidate_filter.get_rejection(ModuleMetadata()) is None
+    assert CandidateFilter().get_rejection(ModuleMetadata("xm", 10**9, 10**6)) is None
+
+
+def test_filter_ids_keeps_unknown_modules(metadata_cache):
+    metadata_cache.update(1, "xm")
+    metadata_cache.update(2, "mod")
+
+    assert metadata_cache.filter_ids(
+        [1, 2, 3], CandidateFilter(excluded_formats={"xm"})
+    ) == [2, 3]
+
+
+def test_save_and_load(metadata_cache, tmp_path):
+    metadata_cache.update(1, "it", 2048, 100)
+    metadata_cache.save()
+
+    assert ModuleMetadataCache(str(tmp_path)).get(1) == ModuleMetadata("it", 2048, 100)
+
+
+def make_fetcher(metadata_cache, web_helper, source, **kwargs):
+    return ModArchiveRandomModuleFetcher(
+        Song(),
+        PlayingMode.RANDOM,
+        PlayingSource.MODARCHIVE,
+        source,
+        web_helper,
+        metadata_cache=metadata_cache,
+        candidate_filter=CandidateFilter(excluded_formats={"xm"}),
+        **kwargs,
+    )
+
+
+def test_fetcher_skips_rejected_random_modules(metadata_cache):
+    metadata_cache.update(1, "xm")
+    web_helper = MagicMock()
+    web_helper.get_random_module_id.side_effect = [1, 2]
+
+    song = make_fetcher(
+        metadata_cache, web_helper, ModArchiveSource.ALL
+    ).fetch_random_module()
+
+    assert song.modarchive_id == 2
+    assert web_helper.get_random_module_id.call_count == 2
+
+
+def test_fetcher_filters_favorites(metadata_cache):
+    metadata_cache.update(1, "xm")
+    metadata_cache.update(2, "xm")
+
+    fetcher = make_fetcher(
+        metadata_cache, MagicMock(), ModArchiveSource.FAVORITES, favorite_ids=[1, 2, 3]
+    )
+
+    assert fetcher.fetch_random_module().modarchive_id == 3
+    assert fetcher.filter_ids([1, 2]) == [1, 2]
@@ -0,0 +1,258 @@
+import threading
+import time
+
+from unittest.mock import MagicMock
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from network_engine import (
+    CancellationToken,
+    NetworkEngine,
+    OperationCancelled,
+    Priority,
+)
+
+
+@pytest.fixture
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def network_engine(app):
+    network_engine = NetworkEngine(max_concurrency=2)
+    yield network_engine
+    network_engine.close()
+
+
+def wait_for(app, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    app.processEvents()
+    return condition()
+
+
+def test_submit_delivers_result(app, network_engine):
+    results = []
+    network_engine.submit(lambda a, b: a + b, 1, 2, on_finished=results.append)
+    assert wait_for(app, lambda: results == [3])
+    assert network_engine.get_pending_count() == 0
+
+
+def test_submit_delivers_error(app, network_engine):
+    errors = []
+
+    def fail():
+        raise ValueError("broken")
+
+    network_engine.submit(fail, on_failed=errors.append)
+    assert wait_for(app, lambda: errors == ["broken"])
+
+
+def test_cancelled_job_drops_result(app, network_engine):
+    results = []
+    started = threading.Event()
+    release = threading.Event()
+    token = CancellationToken()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    network_engine.submit(slow, token=token, on_finished=results.append)
+    assert started.wait(5)
+    token.cancel()
+    release.set()
+
+    assert wait_for(app, lambda: network_engine.get_pending_count() == 0)
+    assert results == []
+
+
+def test_concurrency_is_bounded(app, network_engine):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    results = []
+
+    def job():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    for _ in range(6):
+        network_engine.submit(job, on_finished=results.append)
+
+    assert wait_for(app, lambda: len(results) == 6)
+    assert peak <= 2
+
+
+def test_raise_if_cancelled():
+    token = CancellationToken()
+    token.raise_if_cancelled()
+    token.cancel()
+    with pytest.raises(OperationCancelled):
+        token.raise_if_cancelled()
+
+
+def block_engine(network_engine):
+    # Occupies every slot until the returned event is set
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def blocker():
+        started.release()
+        release.wait(5)
+
+    for _ in range(network_engine.max_concurrency):
+        network_engine.submit(blocker, priority=Priority.NOW_PLAYING)
+    for _ in range(network_engine.max_concurrency):
+        assert started.acquire(timeout=5)
+    return release
+
+
+def test_higher_priority_runs_first(app, network_engine):
+    release = block_engine(network_engine)
+    order = []
+
+    for priority in (
+        Priority.BULK,
+        Priority.PREFETCH,
+        Priority.NOW_PLAYING,
+        Priority.NEXT,
+    ):
+        network_engine.submit(
+            lambda priority=priority: priority,
+            priority=priority,
+            on_finished=order.append,
+        )
+
+    release.set()
+    assert wait_for(app, lambda: len(order) == 4)
+    assert order[:2] == [Priority.NOW_PLAYING, Priority.NEXT]
+
+
+def test_set_priority_moves_waiting_job(app, network_engine):
+    release = block_engine(network_engine)
+    order = []
+
+    network_engine.submit(
+        lambda: "prefetch", priority=Priority.PREFETCH, on_finished=order.append
+    )
+    bulk_job = network_engine.submit(
+        lambda: "bulk", priority=Priority.BULK, on_finished=order.append
+    )
+    network_engine.set_priority(bulk_job, Priority.NOW_PLAYING)
+
+    release.set()
+    assert wait_for(app, lambda: len(order) == 2)
+    assert order[0] == "bulk"
+
+
+def test_priority_limits(app):
+    network_engine = NetworkEngine(
+        max_concurrency=4,
+        priority_limits={
+            Priority.NOW_PLAYING: 4,
+            Priority.NEXT: 2,
+            Priority.PREFETCH: 2,
+            Priority.BULK: 1,
+        },
+    )
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    results = []
+
+    def job():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    try:
+        for _ in range(4):
+            network_engine.submit(
+                job, priority=Priority.BULK, on_finished=results.append
+            )
+
+        assert wait_for(app, lambda: len(results) == 4)
+        assert peak == 1
+    finally:
+        network_engine.close()
+
+
+def test_cancelled_waiting_jobs_are_discarded(app, network_engine):
+    release = block_engine(network_engine)
+    token = CancellationToken()
+    results = []
+
+    for _ in range(3):
+        network_engine.submit(
+            lambda: 1,
+            token=token,
+            priority=Priority.PREFETCH,
+            on_finished=results.append,
+        )
+
+    token.cancel()
+    network_engine.discard_cancelled()
+    release.set()
+
+    assert wait_for(app, lambda: network_engine.get_pending_count() == 0)
+    assert results == []
+
+
+def test_throttle_only_limits_background_jobs_while_playback_waits(app, network_engine):
+    network_engine.bandwidth_limiter = MagicMock()
+    release = threading.Event()
+    throttled = []
+
+    def foreground():
+        network_engine.throttle(1024)
+        release.wait(5)
+
+    def background():
+        network_engine.throttle(1024)
+        throttled.append(network_engine.bandwidth_limiter.consume.call_count)
+
+    network_engine.submit(background, priority=Priority.PREFETCH)
+    assert wait_for(app, lambda: len(throttled) == 1)
+    assert throttled == [0]
+
+    network_engine.submit(foreground, priority=Priority.NOW_PLAYING)
+    network_engine.submit(background, priority=Priority.PREFETCH)
+    assert wait_for(app, lambda: len(throttled) == 2)
+    release.set()
+
+    network_engine.bandwidth_limiter.consume.assert_called_once_with(1024)
+
+
+def test_close_lets_running_jobs_clean_up(app):
+    network_engine = NetworkEngine(max_concurrency=2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def download():
+        started.set()
+        release.wait(5)
+
+    network_engine.submit(download)
+    assert started.wait(5)
+
+    network_engine.close()
+    release.set()
+
+    # The cancelled job ran its cleanup before the loop stopped
+    assert not network_engine.thread.is_alive()
+    assert network_engine.running_counts[Priority.BULK] == 0
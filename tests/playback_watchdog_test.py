@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+
+from playback_watchdog import (
+    OutputLoopDetector,
+    PlaybackWatchdog,
+    PositionLoopDetector,
+)
+
+SAMPLERATE = 8000
+BLOCK_FRAMES = 2000
+
+
+def make_song(seconds: int, loop=None, seed: int = 1) -> bytes:
+    # A tone with a new random loudness every quarter second, starting over at loop[0] every loop[1] seconds
+    rng = np.random.default_rng(seed)
+    frames = np.arange(seconds * SAMPLERATE)
+    notes = frames // (SAMPLERATE // 4)
+
+    if loop:
+        loop_start, loop_length = loop[0] * 4, loop[1] * 4
+        notes = np.where(
+            notes >= loop_start,
+            loop_start + (notes - loop_start) % loop_length,
+            notes,
+        )
+
+    levels = rng.uniform(0.05, 1.0, seconds * 4)[notes]
+    samples = (np.sin(frames * 0.05) * levels * 12000).astype(np.int16)
+    return np.repeat(samples, 2).tobytes()
+
+
+def play(watchdog: PlaybackWatchdog, song: bytes) -> bytes:
+    played = []
+    for offset in range(0, len(song), BLOCK_FRAMES * 4):
+        buffer = watchdog.process(song[offset : offset + BLOCK_FRAMES * 4])
+        if buffer is None:
+            break
+        played.append(buffer)
+    return b"".join(played)
+
+
+def test_finds_repeated_output():
+    loops = []
+    watchdog = PlaybackWatchdog(
+        SAMPLERATE, 0, on_loop_found=lambda *loop: loops.append(loop)
+    )
+
+    played = play(watchdog, make_song(300, (20, 30)))
+
+    assert watchdog.loop_end == pytest.approx(50.0, abs=0.1)
+    assert len(played) / 4 / SAMPLERATE < 120
+    # Not confirmed by the player, so not remembered
+    assert loops == []
+
+
+def test_plays_song_without_loop_to_the_end():
+    song = make_song(300)
+
+    assert play(PlaybackWatchdog(SAMPLERATE, 0), song) == song
+
+
+def test_fades_out_at_max_duration():
+    played = play(PlaybackWatchdog(SAMPLERATE, 60), make_song(300))
+    samples = np.frombuffer(played, dtype=np.int16)
+
+    assert len(samples) == 60 * SAMPLERATE * 2
+    assert np.abs(samples[-SAMPLERATE:]).max() < 3000
+    assert np.abs(samples[-10 * SAMPLERATE : -6 * SAMPLERATE]).max() > 3000
+
+
+def test_known_loop_end_fades_out_without_searching():
+    watchdog = PlaybackWatchdog(SAMPLERATE, 0, loop_end=30.0)
+
+    played = play(watchdog, make_song(300))
+
+    assert len(played) / 4 / SAMPLERATE == pytest.approx(35.0, abs=0.3)
+
+
+def test_seek_keeps_max_duration():
+    watchdog = PlaybackWatchdog(SAMPLERATE, 60)
+    watchdog.set_position(58)
+
+    assert len(play(watchdog, make_song(10))) / 4 / SAMPLERATE == pytest.approx(
+        2.0, abs=0.3
+    )
+
+
+def test_silence_is_not_a_loop():
+    detector = OutputLoopDetector(SAMPLERATE)
+    silence = bytes(BLOCK_FRAMES * 4)
+
+    assert not any(detector.process(silence) for _ in range(400))
+
+
+def test_jump_to_earlier_order_is_a_loop():
+    detector = PositionLoopDetector()
+
+    assert detector.process(0, 0.0) is None
+    assert detector.process(1, 10.0) is None
+    assert detector.process(1, 12.0) is None
+    assert detector.process(2, 20.0) is None
+    assert detector.process(1, 30.0) == (10.0, 30.0)
+
+
+def test_order_reported_by_player_is_used():
+    loops = []
+    watchdog = PlaybackWatchdog(
+        SAMPLERATE, 0, on_loop_found=lambda *loop: loops.append(loop)
+    )
+    block = make_song(1)
+
+    for order in (0, 1, 2, 0):
+        assert watchdog.process(block, order) is not None
+
+    assert loops == [(0.0, 3.0)]
+
+
+def test_repeated_part_with_new_orders_is_not_a_loop():
+    # The same minute played twice in the middle, on orders of their own
+    song = make_song(40) + make_song(60, seed=2) * 2 + make_song(40, seed=3)
+    loops = []
+    watchdog = PlaybackWatchdog(
+        SAMPLERATE, 0, on_loop_found=lambda *loop: loops.append(loop)
+    )
+
+    played = []
+    for index, offset in enumerate(range(0, len(song), BLOCK_FRAMES * 4)):
+        buffer = watchdog.process(song[offset : offset + BLOCK_FRAMES * 4], index)
+        if buffer is None:
+            break
+        played.append(buffer)
+
+    assert b"".join(played) == song
+    assert loops == []
+
+
+def test_player_position_moving_back_is_a_loop():
+    loops = []
+    watchdog = PlaybackWatchdog(
+        SAMPLERATE, 0, on_loop_found=lambda *loop: loops.append(loop)
+    )
+    block = make_song(1)
+
+    for reported_position in (1.0, 2.0, 3.0, 1.0):
+        watchdog.process(block, reported_position=reported_position)
+
+    assert loops == [(1.0, 3.0)]
@@ -0,0 +1,190 @@
+import pytest
+from unittest.mock import MagicMock
+
+from audio_backends.audio_backend import AudioBackend
+from player_backends.player_backend import PlayerBackend
+from player_backends.Song import Song
+from playback_watchdog import PlaybackWatchdog
+from player_thread import BYTES_PER_FRAME, WRITE_SLICE_FRAMES, PlayerThread
+from silence_detector import SilenceDetector
+
+
+class ChunkPlayerBackend(PlayerBackend):
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.chunks = 3
+        self.freed = False
+        self.cleaned_up = False
+
+    def read_chunk(self, samplerate: int, buffersize: int) -> tuple[int, bytes]:
+        if self.chunks == 0:
+            return 0, b""
+        self.chunks -= 1
+        return buffersize, bytes(buffersize * 4)
+
+    def free_module(self) -> None:
+        self.freed = True
+
+    def cleanup(self) -> None:
+        self.cleaned_up = True
+
+
+class RestartingPlayerBackend(ChunkPlayerBackend):
+    # Starts the module over when asked for its length, like some native players do
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.position = 0.0
+
+    def read_chunk(self, samplerate: int, buffersize: int) -> tuple[int, bytes]:
+        self.position += buffersize / samplerate
+        return super().read_chunk(samplerate, buffersize)
+
+    def get_module_length(self) -> float:
+        self.position = 0.0
+        return 60.0
+
+    def get_position_seconds(self) -> float:
+        return self.position
+
+
+class FailingPlayerBackend(ChunkPlayerBackend):
+    def prepare_playing(self, subsong_nr: int = -1) -> None:
+        raise RuntimeError("Cannot load module")
+
+
+@pytest.fixture
+def song():
+    song = Song()
+    song.filename = "tests/knallhatten.mod"
+    song.backend_name = "Chunks"
+    return song
+
+
+@pytest.fixture
+def audio_backend():
+    audio_backend = MagicMock(spec=AudioBackend)
+    audio_backend.samplerate = 44100
+    audio_backend.buffersize = 1024
+    return audio_backend
+
+
+def test_run_plays_until_end(song, audio_backend):
+    player_thread = PlayerThread(song, ChunkPlayerBackend, audio_backend, MagicMock())
+    started = MagicMock()
+    finished = MagicMock()
+    player_thread.playback_started.connect(started)
+    player_thread.song_finished.connect(finished)
+
+    player_thread.run()
+
+    assert audio_backend.write.call_count == 3
+    assert player_thread.time_to_first_audio is not None
+    started.assert_called_once_with(player_thread)
+    finished.assert_called_once()
+    assert player_thread.player_backend.song is song
+    assert player_thread.player_backend.freed
+
+
+def test_run_position_keeps_increasing(song, audio_backend):
+    audio_backend.buffersize = 44100
+    player_thread = PlayerThread(
+        song, RestartingPlayerBackend, audio_backend, MagicMock()
+    )
+    positions = []
+    player_thread.position_changed.connect(
+        lambda position, length: positions.append((position, length))
+    )
+
+    player_thread.run()
+
+    assert positions == [(1, 60), (2, 60), (3, 60)]
+
+
+def test_run_creates_audio_backend_on_thread(song, audio_backend):
+    factory = MagicMock(return_value=audio_backend)
+    player_thread = PlayerThread(song, ChunkPlayerBackend, None, factory)
+
+    player_thread.run()
+
+    factory.assert_called_once()
+    assert player_thread.audio_backend is audio_backend
+
+
+def test_run_reuses_audio_backend_of_previous_thread(song, audio_backend):
+    previous_thread = PlayerThread(song, ChunkPlayerBackend, audio_backend, MagicMock())
+    factory = MagicMock()
+    player_thread = PlayerThread(
+        song, ChunkPlayerBackend, None, factory, previous_thread
+    )
+
+    player_thread.run()
+
+    factory.assert_not_called()
+    assert player_thread.audio_backend is audio_backend
+    assert player_thread.previous_thread is None
+
+
+def test_run_reports_failure(song, audio_backend):
+    player_thread = PlayerThread(song, FailingPlayerBackend, audio_backend, MagicMock())
+    failed = MagicMock()
+    player_thread.playback_failed.connect(failed)
+
+    player_thread.run()
+
+    failed.assert_called_once_with(player_thread, "Cannot load module")
+    audio_backend.write.assert_not_called()
+    assert player_thread.player_backend.cleaned_up
+
+
+def test_run_releases_backend_when_audio_fails(song):
+    factory = MagicMock(side_effect=RuntimeError("No audio device"))
+    player_thread = PlayerThread(song, ChunkPlayerBackend, None, factory)
+    failed = MagicMock()
+    player_thread.playback_failed.connect(failed)
+
+    player_thread.run()
+
+    failed.assert_called_once_with(player_thread, "No audio device")
+    assert player_thread.player_backend.cleaned_up
+
+
+def test_write_audio_stops_between_slices(song, audio_backend):
+    player_thread = PlayerThread(song, ChunkPlayerBackend, audio_backend, MagicMock())
+    audio_backend.write.side_effect = lambda data: player_thread.stop()
+
+    player_thread.write_audio(bytes(WRITE_SLICE_FRAMES * BYTES_PER_FRAME * 3))
+
+    audio_backend.write.assert_called_once()
+    assert player_thread.time_to_first_audio is not None
+
+
+def test_run_skips_silent_chunks(song, audio_backend):
+    silence_detector = SilenceDetector(44100, trailing_silence=10)
+    player_thread = PlayerThread(
+        song,
+        ChunkPlayerBackend,
+        audio_backend,
+        MagicMock(),
+        silence_detector=silence_detector,
+    )
+    finished = MagicMock()
+    player_thread.song_finished.connect(finished)
+
+    player_thread.run()
+
+    audio_backend.write.assert_not_called()
+    finished.assert_called_once()
+
+
+def test_run_ends_song_when_watchdog_stops_it(song, audio_backend):
+    watchdog = PlaybackWatchdog(44100, 0, loop_end=0.01, fade_duration=0.01)
+    player_thread = PlayerThread(
+        song, ChunkPlayerBackend, audio_backend, MagicMock(), watchdog=watchdog
+    )
+    finished = MagicMock()
+    player_thread.song_finished.connect(finished)
+
+    player_thread.run()
+
+    assert audio_backend.write.call_count == 1
+    finished.assert_called_once()
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from player_backends.libgme.player_backend_libgme import PlayerBackendLibGME
 from player_backends.libopenmpt.player_backend_libopenmpt import PlayerBackendLibOpenMPT
 from player_backends.libuade.player_backend_libuade import PlayerBackendLibUADE
@@ -14,26 +14,43 @@ from playing_engine import (
     WebHelper,
     AudioBackendPyAudio,
     PlayerThread,
-    ModArchiveRandomModuleFetcherThread,
+    NetworkEngine,
+    LookupCache,
+    Priority,
 )
+from playing_modes import LocalSource, PlayingMode, PlayingSource, ShuffleMode
+from playlist.playlist import Playlist
 
 
 @pytest.fixture
-def playing_engine():
+def playing_engine(tmp_path):
     ui_manager = MagicMock(spec=UIManager)
     settings_manager = MagicMock(spec=SettingsManager)
+    settings_manager.get_module_cache_size.return_value = 500
+    settings_manager.get_prefetch_depth.return_value = 3
+    settings_manager.get_background_bandwidth.return_value = 256
+    settings_manager.get_history_window_size.return_value = 200
+    settings_manager.get_shuffle_mode.return_value = ShuffleMode.OFF
+    settings_manager.get_max_duration.return_value = 0
+    settings_manager.get_max_play_time.return_value = 0
+    settings_manager.get_max_module_size.return_value = 0
+    settings_manager.get_excluded_formats.return_value = set()
+    settings_manager.get_trailing_silence.return_value = 0
+    settings_manager.get_skip_leading_silence.return_value = False
     player_backends = {
         "LibUADE": PlayerBackendLibUADE,
         "LibOpenMPT": PlayerBackendLibOpenMPT,
         "LibGME": PlayerBackendLibGME,
     }
-    return PlayingEngine(ui_manager, settings_manager, player_backends)
+    with patch("playing_engine.user_cache_dir", return_value=str(tmp_path)):
+        playing_engine = PlayingEngine(ui_manager, settings_manager, player_backends)
+    playing_engine.lookup_cache = MagicMock(spec=LookupCache)
+    return playing_engine
 
 
 def test_get_current_song(playing_engine):
     song = Song()
-    playing_engine.player_backend = MagicMock()
-    playing_engine.player_backend.song = song
+    playing_engine.current_song = song
     assert playing_engine.get_current_song() == song
 
 
@@ -45,7 +62,18 @@ def test_play_module(playing_engine):
     playing_engine.audio_backend = MagicMock(spec=AudioBackendPyAudio)
     playing_engine.play_module(song)
     assert playing_engine.player_thread is not None
-    assert playing_engine.player_thread.isRunning()
+    assert playing_engine.player_thread.song is song
+    assert playing_engine.get_current_song() is song
+    playing_engine.lookup_cache.prefetch.assert_called_once_with(song)
+    playing_engine.stop()
+
+
+def test_on_playback_started_ignores_replaced_thread(playing_engine):
+    playing_engine.player_thread = MagicMock(spec=PlayerThread)
+    old_thread = MagicMock(spec=PlayerThread)
+    playing_engine.on_playback_started(old_thread)
+    assert playing_engine.player_backend is None
+    playing_engine.ui_manager.update_subsong_info.assert_not_called()
 
 
 # def test_play_pause(playing_engine):
@@ -103,15 +131,71 @@ def test_play_module(playing_engine):
 
 def test_get_random_module(playing_engine):
     song = Song()
+    playing_engine.network_engine = MagicMock(spec=NetworkEngine)
     playing_engine.get_random_module(song)
-    assert len(playing_engine.random_module_fetcher_threads) > 0
+    playing_engine.network_engine.submit.assert_called_once()
+    assert (
+        playing_engine.network_engine.submit.call_args.kwargs["token"]
+        is playing_engine.cancellation_token
+    )
+
+def test_update_playing_mode_cancels_pending_jobs(playing_engine):
+    token = playing_engine.cancellation_token
+    playing_engine.populate_queue = MagicMock()
+    playing_engine.update_playing_mode()
+    assert token.cancelled
+    assert not playing_engine.cancellation_token.cancelled
 
 def test_on_random_module_fetched(playing_engine):
     song = Song()
+    song.modarchive_id = 1
     playing_engine.load_module = MagicMock()
     playing_engine.on_random_module_fetched(song)
     playing_engine.load_module.assert_called_once_with(song)
 
+def test_on_random_module_fetched_without_id(playing_engine):
+    song = Song()
+    playing_engine.queue_manager.add_song(song)
+    playing_engine.load_module = MagicMock()
+    playing_engine.on_random_module_fetched(song)
+    playing_engine.load_module.assert_not_called()
+    assert playing_engine.queue_manager.is_empty()
+
+def test_fill_prefetch_pool(playing_engine):
+    playing_engine.get_random_module = MagicMock()
+    playing_engine.fill_prefetch_pool()
+    assert len(playing_engine.queue_manager.queue) == 3
+    assert playing_engine.get_random_module.call_count == 3
+    assert len(playing_engine.prefetch_started) == 3
+
+def test_on_module_loaded_records_prefetch_latency(playing_engine):
+    playing_engine.get_random_module = MagicMock()
+    playing_engine.fill_prefetch_pool()
+    song = playing_engine.queue_manager.peek_next_song()
+    song.is_ready = True
+    playing_engine.on_module_loaded(song)
+    assert song.uid not in playing_engine.prefetch_started
+    assert playing_engine.prefetch_policy.latency is not None
+
+def test_on_module_loaded_skips_unwanted_random_module(playing_engine):
+    playing_engine.playing_settings.playing_source = PlayingSource.MODARCHIVE
+    playing_engine.playing_settings.playing_mode = PlayingMode.RANDOM
+    playing_engine.settings_manager.get_max_duration.return_value = 300
+    playing_engine.get_random_module = MagicMock()
+    playing_engine.fill_prefetch_pool()
+
+    song = playing_engine.queue_manager.peek_next_song()
+    song.modarchive_id = 1234
+    song.filename = "/tmp/long.xm"
+    song.duration = 600
+    song.is_ready = True
+    playing_engine.populate_queue = MagicMock()
+    playing_engine.on_module_loaded(song)
+
+    assert song not in playing_engine.queue_manager.queue
+    playing_engine.populate_queue.assert_called_once()
+    assert playing_engine.module_metadata_cache.get(1234).duration == 600
+
 # def test_set_playing_mode(playing_engine):
 #     new_mode = "LINEAR"
 #     playing_engine.set_playing_mode(new_mode)
@@ -136,6 +220,21 @@ def test_update_playing_mode(playing_engine):
     playing_engine.update_playing_mode()
     assert playing_engine.queue_manager.is_empty()
 
+def test_populate_queue_shuffles_local_playlist(playing_engine):
+    songs = [Song() for _ in range(5)]
+    playing_engine.playlist_manager.current_playlist = Playlist("Test", songs)
+    playing_engine.playing_settings.playing_source = PlayingSource.LOCAL
+    playing_engine.playing_settings.local_source = LocalSource.PLAYLIST
+    playing_engine.set_shuffle_mode(ShuffleMode.NO_REPEAT)
+
+    queued = []
+    for _ in range(5):
+        playing_engine.populate_queue()
+        assert len(playing_engine.queue_manager.queue) == 1
+        queued.append(playing_engine.queue_manager.queue.popleft())
+
+    assert set(song.uid for song in queued) == set(song.uid for song in songs)
+
 # def test_check_playing_mode(playing_engine):
 #     playing_engine.ui_manager.get_artist_input.return_value = ""
 #     playing_engine.playing_settings.modarchive_source = "ARTIST"
@@ -146,7 +245,18 @@ def test_load_module(playing_engine):
     song = Song()
     playing_engine.module_loader.load_modules = MagicMock()
     playing_engine.load_module(song)
-    playing_engine.module_loader.load_modules.assert_called_once_with(song)
+    playing_engine.module_loader.load_modules.assert_called_once_with(
+        song, playing_engine.cancellation_token, Priority.PREFETCH
+    )
+
+def test_get_song_priority(playing_engine):
+    next_song = Song()
+    prefetched_song = Song()
+    playing_engine.queue_manager.add_songs([next_song, prefetched_song])
+    assert playing_engine.get_song_priority(next_song) == Priority.NEXT
+    assert playing_engine.get_song_priority(prefetched_song) == Priority.PREFETCH
+    playing_engine.song_waiting_for_playback = prefetched_song
+    assert playing_engine.get_song_priority(prefetched_song) == Priority.NOW_PLAYING
 
 def test_on_module_loaded(playing_engine):
     song = Song()
@@ -166,6 +276,25 @@ def test_on_module_loaded(playing_engine):
 #     playing_engine.seek(100)
 #     playing_engine.player_thread.seek.assert_called_once_with(100)
 
+def test_create_watchdog_stores_loop_in_song(playing_engine):
+    playing_engine.settings_manager.get_max_play_time.return_value = 300
+    song = Song()
+    watchdog = playing_engine.create_watchdog(song)
+
+    watchdog.found_loop(12.5, 40.0)
+
+    assert watchdog.max_frames == 300 * 44100
+    assert (song.loop_start, song.loop_end) == (12.5, 40.0)
+    assert playing_engine.create_watchdog(song).loop_end == 40.0
+
+def test_create_watchdog_ignores_random_module_max_duration(playing_engine):
+    playing_engine.settings_manager.get_max_duration.return_value = 300
+
+    watchdog = playing_engine.create_watchdog(Song())
+
+    assert watchdog.max_frames == 0
+    assert watchdog.fade_end is None
+
 def test_close(playing_engine):
     playing_engine.stop = MagicMock()
     playing_engine.close()
@@ -0,0 +1,173 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from player_backends.Song import Song
+from playlist.library_store import LibraryStore
+from playlist.playlist import Playlist
+from playlist.playlist_manager import PlaylistManager
+from settings_manager import SettingsManager
+
+
+@pytest.fixture
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def playlist_manager(app, tmp_path):
+    settings_manager = MagicMock(spec=SettingsManager)
+    with patch("playlist.playlist_manager.user_config_dir", return_value=str(tmp_path)):
+        playlist_manager = PlaylistManager(settings_manager)
+    playlist_manager.load_playlists()
+    yield playlist_manager
+    playlist_manager.close()
+
+
+def load_titles(tmp_path):
+    store = LibraryStore(str(tmp_path / "library.db"))
+    playlists = {
+        playlist.name: [song.title for song in playlist.songs]
+        for playlist in store.load_playlists()
+    }
+    store.close()
+    return playlists
+
+
+def test_changes_are_saved_on_flush(playlist_manager, tmp_path):
+    playlist = playlist_manager.new_playlist("Test")
+    for title in "abc":
+        playlist.add_song(Song(title=title))
+    playlist_manager.flush_journal()
+
+    assert load_titles(tmp_path) == {"Test": ["a", "b", "c"]}
+
+    # Removed and added in the view
+    playlist.on_song_removed_at(1)
+    playlist.on_song_added(Song(title="d"))
+    playlist_manager.flush_journal()
+
+    assert load_titles(tmp_path) == {"Test": ["a", "c", "d"]}
+
+
+def test_flush_only_writes_changes(playlist_manager):
+    playlist = Playlist("Test", [Song(title=str(index)) for index in range(1000)])
+    playlist_manager.add_playlist(playlist)
+    playlist_manager.save_playlist(playlist)
+
+    connection = playlist_manager.library_store.connection
+    written = connection.total_changes
+    playlist.add_song(Song(title="new"))
+    playlist.remove_song(playlist.songs[0])
+    playlist_manager.flush_journal()
+
+    assert connection.total_changes - written < 10
+
+
+def test_song_added_and_removed_before_flush_is_not_written(playlist_manager, tmp_path):
+    playlist = playlist_manager.new_playlist("Test")
+    song = Song(title="a")
+    playlist.add_song(song)
+    playlist.remove_song(song)
+
+    assert playlist_manager.journal.get_changes(playlist).added == []
+    playlist_manager.flush_journal()
+
+    assert load_titles(tmp_path) == {"Test": []}
+
+
+def test_removing_a_copy_of_a_song_keeps_the_order(playlist_manager, tmp_path):
+    playlist = playlist_manager.new_playlist("Test")
+    song = Song(title="a")
+    for added in [song, Song(title="b"), song]:
+        playlist.add_song(added)
+    playlist_manager.flush_journal()
+
+    playlist.on_song_removed_at(2)
+    playlist_manager.flush_journal()
+    assert load_titles(tmp_path) == {"Test": ["a", "b"]}
+
+    # The stored copy goes, the one added since the last flush stays
+    playlist.add_song(song)
+    playlist.on_song_removed_at(0)
+    playlist_manager.flush_journal()
+    assert load_titles(tmp_path) == {"Test": ["b", "a"]}
+
+
+def test_songs_of_added_playlist_are_saved(playlist_manager, tmp_path):
+    playlist = Playlist("Imported", [Song(title="a"), Song(title="b")])
+
+    playlist_manager.add_playlist(playlist)
+    playlist_manager.flush_journal()
+
+    assert load_titles(tmp_path)["Imported"] == ["a", "b"]
+
+
+def test_moves_and_renames_are_saved(playlist_manager, tmp_path):
+    playlist = playlist_manager.new_playlist("Test")
+    for title in "abc":
+        playlist.add_song(Song(title=title))
+    playlist_manager.flush_journal()
+
+    playlist.move_song(playlist.songs[2], 0)
+    playlist.set_name("Renamed")
+    playlist_manager.flush_journal()
+
+    assert load_titles(tmp_path) == {"Renamed": ["c", "a", "b"]}
+
+
+def test_song_changes_are_saved_for_playlist_songs(playlist_manager, tmp_path):
+    playlist = playlist_manager.new_playlist("Test")
+    song = Song(title="a")
+    playlist.add_song(song)
+    playlist_manager.flush_journal()
+
+    song.title = "played"
+    playlist_manager.song_changed(song)
+    playlist_manager.song_changed(Song(title="random"))
+    playlist_manager.flush_journal()
+
+    store = playlist_manager.library_store
+    assert store.connection.execute("SELECT COUNT(*) FROM songs").fetchone()[0] == 1
+    assert load_titles(tmp_path) == {"Test": ["played"]}
+
+
+def test_history_is_not_saved(playlist_manager, tmp_path):
+    playlist = playlist_manager.new_playlist("History")
+    playlist.add_song(Song(title="a"))
+    playlist_manager.flush_journal()
+
+    assert load_titles(tmp_path) == {}
+
+
+def test_close_saves_changes(playlist_manager, tmp_path):
+    playlist = playlist_manager.new_playlist("Test")
+    playlist.add_song(Song(title="a"))
+
+    playlist_manager.close()
+
+    assert load_titles(tmp_path) == {"Test": ["a"]}
+
+
+def test_saved_playlists_are_loaded_lazily(playlist_manager, app, tmp_path):
+    playlist = playlist_manager.new_playlist("Test")
+    playlist.add_song(Song(title="a"))
+    playlist_manager.close()
+
+    settings_manager = MagicMock(spec=SettingsManager)
+    with patch("playlist.playlist_manager.user_config_dir", return_value=str(tmp_path)):
+        reopened = PlaylistManager(settings_manager)
+    reopened.load_playlists()
+    loaded = next(
+        playlist for playlist in reopened.playlists if playlist.name == "Test"
+    )
+
+    assert not loaded.is_loaded()
+    assert loaded.get_length() == 1
+
+    # Adding to a playlist not opened yet keeps its songs
+    loaded.add_song(Song(title="b"))
+    reopened.close()
+
+    assert load_titles(tmp_path)["Test"] == ["a", "b"]
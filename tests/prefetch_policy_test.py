@@ -0,0 +1,44 @@
+import pytest
+
+from prefetch_policy import PrefetchPolicy
+
+
+@pytest.fixture
+def prefetch_policy():
+    return PrefetchPolicy(max_depth=5, fast_latency=2.0, smoothing=0.5)
+
+
+def test_full_depth_before_first_measurement(prefetch_policy):
+    assert prefetch_policy.get_target_depth() == 5
+
+
+def test_fast_fetches_keep_pool_small(prefetch_policy):
+    prefetch_policy.record_latency(0.5)
+    assert prefetch_policy.get_target_depth() == 2
+
+
+def test_slow_fetches_deepen_pool(prefetch_policy):
+    prefetch_policy.record_latency(0.5)
+    for _ in range(10):
+        prefetch_policy.record_latency(10.0)
+    assert prefetch_policy.get_target_depth() == 5
+
+
+def test_failures_count_as_slow(prefetch_policy):
+    prefetch_policy.record_latency(0.5)
+    depth = prefetch_policy.get_target_depth()
+    prefetch_policy.record_failure()
+    assert prefetch_policy.get_target_depth() > depth
+
+
+def test_refill_only_below_low_water_mark(prefetch_policy):
+    assert prefetch_policy.get_low_water_mark() == 3
+    assert prefetch_policy.get_missing(3) == 0
+    assert prefetch_policy.get_missing(2) == 3
+    assert prefetch_policy.get_missing(0) == 5
+
+
+def test_set_max_depth(prefetch_policy):
+    prefetch_policy.set_max_depth(1)
+    assert prefetch_policy.get_target_depth() == 1
+    assert prefetch_policy.get_missing(0) == 1
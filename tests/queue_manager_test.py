@@ -1,5 +1,6 @@
+import uuid
+
 import pytest
-from collections import deque
 from unittest.mock import Mock
 from player_backends.Song import Song
 from playlist.playlist import Playlist
@@ -16,9 +17,16 @@ def queue_manager(history_playlist):
     return QueueManager(history_playlist)
 
 
+def make_song(is_ready: bool = False) -> Song:
+    song = Mock(spec=Song)
+    song.uid = str(uuid.uuid4())
+    song.is_ready = is_ready
+    return song
+
+
 @pytest.fixture
 def song():
-    return Mock(spec=Song)
+    return make_song()
 
 
 def test_add_song(queue_manager, song):
@@ -27,22 +35,34 @@ def test_add_song(queue_manager, song):
 
 
 def test_add_songs(queue_manager, song):
-    songs = [song, song]
+    songs = [song, make_song()]
     queue_manager.add_songs(songs)
     assert list(queue_manager.queue) == songs
 
 
+def test_add_song_twice_keeps_position(queue_manager, song):
+    other_song = make_song()
+    queue_manager.add_songs([song, other_song, song])
+    assert list(queue_manager.queue) == [song, other_song]
+
+
 def test_set_queue(queue_manager, song):
-    songs = [song, song]
+    songs = [song, make_song()]
     queue_manager.set_queue(songs)
     assert list(queue_manager.queue) == songs
 
 
-# def test_update_song(queue_manager, song):
-#     queue_manager.add_song(song)
-#     updated_song = Mock(spec=Song)
-#     queue_manager.update_song(updated_song)
-#     assert updated_song in queue_manager.queue
+def test_update_song(queue_manager, song):
+    queue_manager.add_songs([make_song(), song])
+    updated_song = make_song()
+    updated_song.uid = song.uid
+    queue_manager.update_song(updated_song)
+    assert queue_manager.queue[1] is updated_song
+
+
+def test_update_song_not_queued(queue_manager, song):
+    queue_manager.update_song(song)
+    assert queue_manager.is_empty()
 
 
 def test_pop_next_song(queue_manager, song, history_playlist):
@@ -59,9 +79,23 @@ def test_peek_next_song(queue_manager, song):
 
 
 def test_prioritize_song(queue_manager, song):
-    queue_manager.add_song(song)
+    other_songs = [make_song(), make_song()]
+    queue_manager.add_songs(other_songs + [song])
     queue_manager.prioritize_song(song)
-    assert queue_manager.queue[0] == song
+    assert list(queue_manager.queue) == [song] + other_songs
+
+
+def test_remove_song(queue_manager, song):
+    queue_manager.add_song(song)
+    queue_manager.remove_song(song)
+    assert queue_manager.is_empty()
+
+
+def test_get_first_ready_song(queue_manager):
+    loading_song = make_song()
+    ready_song = make_song(is_ready=True)
+    queue_manager.add_songs([loading_song, ready_song])
+    assert queue_manager.get_first_ready_song() == ready_song
 
 
 def test_clear(queue_manager, song):
@@ -77,5 +111,15 @@ def test_get_queue(queue_manager, song):
 
 def test_is_empty(queue_manager):
     assert queue_manager.is_empty()
-    queue_manager.add_song(Mock(spec=Song))
+    queue_manager.add_song(make_song())
     assert not queue_manager.is_empty()
+
+
+def test_queue_index(queue_manager):
+    songs = [make_song() for _ in range(3)]
+    queue_manager.add_songs(songs)
+    assert queue_manager.queue[0] is songs[0]
+    assert queue_manager.queue[1] is songs[1]
+    assert queue_manager.queue[-1] is songs[2]
+    with pytest.raises(IndexError):
+        queue_manager.queue[3]
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from player_backends.Song import Song
+from playing_modes import ShuffleMode
+from playlist.playlist import Playlist
+from playlist.shuffle import LazyPermutation, ShuffleEngine
+
+
+@pytest.fixture
+def playlist():
+    return Playlist("Test Playlist", [Song() for _ in range(20)])
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 17, 1000])
+def test_permutation_covers_every_index_once(size):
+    permutation = LazyPermutation(size, random.Random(1))
+
+    assert sorted(permutation[position] for position in range(size)) == list(
+        range(size)
+    )
+
+    with pytest.raises(IndexError):
+        permutation[size]
+
+
+def test_permutation_is_shuffled():
+    permutation = LazyPermutation(1000, random.Random(1))
+
+    assert [permutation[position] for position in range(1000)] != list(range(1000))
+
+
+def test_no_repeat_plays_every_song_once_per_round(playlist):
+    shuffle_engine = ShuffleEngine(ShuffleMode.NO_REPEAT, seed=1)
+
+    for _ in range(3):
+        played = [shuffle_engine.next_song(playlist) for _ in range(20)]
+        assert set(song.uid for song in played) == set(
+            song.uid for song in playlist.songs
+        )
+
+
+def test_no_repeat_follows_playlist_edits(playlist):
+    shuffle_engine = ShuffleEngine(ShuffleMode.NO_REPEAT, seed=1)
+    played = [shuffle_engine.next_song(playlist) for _ in range(10)]
+
+    removed = next(song for song in playlist.songs if song not in played)
+    playlist.remove_song(removed)
+    added = Song()
+    playlist.add_song(added)
+
+    rest = [shuffle_engine.next_song(playlist) for _ in range(10)]
+
+    assert added in rest
+    assert removed not in rest
+    assert not set(song.uid for song in played) & set(song.uid for song in rest)
+
+
+def test_mark_played_skips_song(playlist):
+    shuffle_engine = ShuffleEngine(ShuffleMode.NO_REPEAT, seed=1)
+    shuffle_engine.mark_played(playlist, playlist.songs[0])
+
+    played = [shuffle_engine.next_song(playlist) for _ in range(19)]
+
+    assert playlist.songs[0] not in played
+
+
+def test_uniform_avoids_immediate_repeat():
+    playlist = Playlist("Test Playlist", [Song(), Song()])
+    shuffle_engine = ShuffleEngine(ShuffleMode.UNIFORM, seed=1)
+
+    previous = shuffle_engine.next_song(playlist)
+    repeats = 0
+    for _ in range(100):
+        song = shuffle_engine.next_song(playlist)
+        repeats += song is previous
+        previous = song
+
+    assert repeats < 50
+
+
+def test_least_played_prefers_unplayed_songs(playlist):
+    for song in playlist.songs[1:]:
+        song.play_count = 50
+    shuffle_engine = ShuffleEngine(ShuffleMode.LEAST_PLAYED, seed=1)
+
+    picks = [shuffle_engine.next_song(playlist) for _ in range(200)]
+
+    assert picks.count(playlist.songs[0]) > 40
+
+
+def test_off_returns_nothing(playlist):
+    shuffle_engine = ShuffleEngine(ShuffleMode.OFF)
+
+    assert shuffle_engine.next_song(playlist) is None
+    assert ShuffleEngine(ShuffleMode.UNIFORM).next_song(Playlist()) is None
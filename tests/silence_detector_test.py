@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from silence_detector import (
+    END,
+    PLAY,
+    SKIP,
+    SilenceBoundaries,
+    SilenceDetector,
+)
+
+SAMPLERATE = 1000
+BLOCK_FRAMES = 500
+
+
+def make_block(level: int = 0) -> bytes:
+    frames = np.arange(BLOCK_FRAMES * 2)
+    return (np.sin(frames * 0.1) * level).astype(np.int16).tobytes()
+
+
+SILENCE = make_block()
+MUSIC = make_block(10000)
+
+
+@pytest.fixture
+def found():
+    return []
+
+
+@pytest.fixture
+def silence_detector(found):
+    return SilenceDetector(SAMPLERATE, 2, on_boundaries_found=found.append)
+
+
+def test_is_silent():
+    silence_detector = SilenceDetector(SAMPLERATE, 2)
+
+    assert silence_detector.is_silent(SILENCE)
+    assert silence_detector.is_silent(make_block(5))
+    assert not silence_detector.is_silent(MUSIC)
+    assert silence_detector.is_silent(b"")
+
+
+def test_single_click_breaks_silence():
+    samples = np.zeros(BLOCK_FRAMES * 2, dtype=np.int16)
+    samples[100] = 20000
+
+    assert not SilenceDetector(SAMPLERATE, 2).is_silent(samples.tobytes())
+
+
+def test_skips_leading_silence(silence_detector, found):
+    assert [silence_detector.process(SILENCE) for _ in range(3)] == [SKIP] * 3
+    assert silence_detector.process(MUSIC) == PLAY
+
+    assert found == [SilenceBoundaries(1.5, 0.0)]
+
+
+def test_gives_up_on_silent_module(silence_detector):
+    actions = [silence_detector.process(SILENCE) for _ in range(121)]
+
+    assert actions[-1] == END
+    assert actions[:-2] == [SKIP] * 119
+
+
+def test_ends_after_trailing_silence(silence_detector, found):
+    assert silence_detector.process(MUSIC) == PLAY
+    assert [silence_detector.process(SILENCE) for _ in range(4)] == [
+        PLAY,
+        PLAY,
+        PLAY,
+        END,
+    ]
+
+    # A long pause is not known to be the end of the module
+    assert found == []
+
+
+def test_remembers_silence_before_module_end(silence_detector, found):
+    silence_detector.process(MUSIC)
+    silence_detector.process(SILENCE)
+    silence_detector.process(SILENCE)
+    silence_detector.finished()
+
+    assert found == [SilenceBoundaries(0.0, 0.5)]
+
+
+def test_short_silence_before_module_end_is_not_remembered(silence_detector, found):
+    silence_detector.process(MUSIC)
+    silence_detector.process(SILENCE)
+    silence_detector.finished()
+
+    assert found == []
+
+
+def test_skips_leading_silence_without_trailing_end(found):
+    silence_detector = SilenceDetector(SAMPLERATE, 0, None, found.append)
+
+    assert silence_detector.process(SILENCE) == SKIP
+    assert silence_detector.process(MUSIC) == PLAY
+    assert [silence_detector.process(SILENCE) for _ in range(30)] == [PLAY] * 30
+
+
+def test_ends_without_skipping_leading_silence():
+    silence_detector = SilenceDetector(
+        SAMPLERATE, 2, SilenceBoundaries(3.0, 0.0), skip_leading_silence=False
+    )
+
+    assert silence_detector.get_start_position() == 0
+    assert [silence_detector.process(SILENCE) for _ in range(4)] == [PLAY] * 3 + [END]
+
+
+def test_short_pause_does_not_end(silence_detector):
+    silence_detector.process(MUSIC)
+    silence_detector.process(SILENCE)
+    silence_detector.process(SILENCE)
+    silence_detector.process(MUSIC)
+
+    assert [silence_detector.process(SILENCE) for _ in range(3)] == [PLAY] * 3
+
+
+def test_uses_cached_boundaries(found):
+    silence_detector = SilenceDetector(
+        SAMPLERATE, 2, SilenceBoundaries(3.0, 5.0), found.append
+    )
+    assert silence_detector.get_start_position() == 3
+
+    silence_detector.set_position(3.0)
+    actions = [silence_detector.process(MUSIC) for _ in range(5)]
+
+    assert actions == [PLAY] * 4 + [END]
+    assert found == []
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from player_backends.Song import Song
+from player_backends.song_detail_store import (
+    SongDetails,
+    SongDetailStore,
+    get_song_detail_store,
+    set_song_detail_store,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SongDetailStore(str(tmp_path / "song_details.db"), batch_size=2)
+    set_song_detail_store(store)
+    yield store
+    set_song_detail_store(None)
+    store.close()
+
+
+@pytest.fixture
+def song():
+    song = Song(filename="tests/knallhatten.mod", title="Knallhatten")
+    song.message_raw = "raw message"
+    song.warnings = "warning"
+    song.credits["instruments"].append({"index": 1, "name": "bass"})
+    return song
+
+
+def test_equality_by_uid():
+    song = Song(title="A")
+    same_song = Song(uid=song.uid, title="B")
+
+    assert song == same_song
+    assert hash(song) == hash(same_song)
+    assert song != Song(title="A")
+    assert len({song, same_song}) == 1
+
+
+def test_song_is_slotted():
+    with pytest.raises(AttributeError):
+        Song().unknown_field = 1
+
+
+def test_new_song_has_no_details_in_memory():
+    song = Song()
+    assert song.details is None
+    assert song.message_raw == ""
+    assert song.credits["instruments"] == []
+
+
+def test_offload_and_load(store, song):
+    store.offload([song])
+
+    assert song.details is None
+    assert song.message_raw == "raw message"
+    assert song.warnings == "warning"
+    assert song.credits["instruments"][0]["name"] == "bass"
+
+
+def test_offload_writes_batches(store, song):
+    store.offload([song])
+    assert store.pending
+
+    other_song = Song()
+    other_song.warnings = "other"
+    store.offload([other_song])
+
+    assert not store.pending
+    assert store.get(song.uid).message_raw == "raw message"
+    assert store.get(other_song.uid).warnings == "other"
+
+
+def test_offload_skips_unchanged_details(store, song):
+    store.offload([song])
+    store.flush()
+
+    assert song.message_raw == "raw message"
+    assert song.release_details() is None
+
+
+def test_empty_details_are_not_stored(store):
+    song = Song()
+    song.message_raw = ""
+    store.offload([song])
+    store.flush()
+
+    assert store.get(song.uid) is None
+    assert song.get_details() == SongDetails()
+
+
+def test_json_round_trip(store, song):
+    store.offload([song])
+
+    loaded_song = Song.from_json(song.to_json())
+
+    assert loaded_song == song
+    assert loaded_song.title == "Knallhatten"
+    assert loaded_song.message_raw == "raw message"
+    assert loaded_song.credits["instruments"][0]["name"] == "bass"
+
+
+def test_to_dict_does_not_load_details(store, song):
+    store.offload([song])
+
+    data = song.to_dict()
+
+    assert data["warnings"] == "warning"
+    assert song.details is None
+    assert "details" not in data
+    json.dumps(data)
+
+
+def test_store_is_optional(song):
+    assert get_song_detail_store() is None
+    assert song.message_raw == "raw message"
@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import patch
+
+from player_backends.libuade.uade_state_pool import UADEStatePool
+
+
+@pytest.fixture
+def libuade():
+    with patch("player_backends.libuade.uade_state_pool.libuade") as libuade:
+        libuade.uade_new_state.side_effect = range(100, 200)
+        libuade.uade_stop.return_value = 0
+        yield libuade
+
+
+@pytest.fixture
+def state_pool(libuade):
+    return UADEStatePool(2)
+
+
+def test_acquire_creates_state(state_pool, libuade):
+    state_ptr = state_pool.acquire("test")
+
+    assert state_ptr == 100
+    assert state_pool.get_leaks() == ["test"]
+    assert state_pool.get_stats()["created"] == 1
+
+
+def test_release_reuses_state(state_pool, libuade):
+    state_ptr = state_pool.acquire()
+    state_pool.release(state_ptr, playing=True)
+
+    assert state_pool.acquire() == state_ptr
+    libuade.uade_stop.assert_called_once_with(state_ptr)
+    libuade.uade_new_state.assert_called_once()
+    assert state_pool.get_stats()["reused"] == 1
+
+
+def test_release_without_song_does_not_stop(state_pool, libuade):
+    state_pool.release(state_pool.acquire())
+
+    libuade.uade_stop.assert_not_called()
+    assert state_pool.get_stats()["idle"] == 1
+
+
+def test_release_beyond_max_size_destroys(state_pool, libuade):
+    state_ptrs = [state_pool.acquire() for _ in range(3)]
+    for state_ptr in state_ptrs:
+        state_pool.release(state_ptr)
+
+    assert state_pool.get_stats()["idle"] == 2
+    libuade.uade_cleanup_state.assert_called_once_with(state_ptrs[2])
+    assert state_pool.get_leaks() == []
+
+
+def test_release_discards_state_that_cannot_stop(state_pool, libuade):
+    libuade.uade_stop.return_value = -1
+    state_ptr = state_pool.acquire()
+    state_pool.release(state_ptr, playing=True)
+
+    libuade.uade_cleanup_state.assert_called_once_with(state_ptr)
+    assert state_pool.get_stats()["idle"] == 0
+
+
+def test_discard(state_pool, libuade):
+    state_ptr = state_pool.acquire()
+    state_pool.discard(state_ptr)
+
+    libuade.uade_cleanup_state.assert_called_once_with(state_ptr)
+    assert state_pool.get_leaks() == []
+
+
+def test_set_max_size_trims_idle(state_pool, libuade):
+    state_ptrs = [state_pool.acquire() for _ in range(2)]
+    for state_ptr in state_ptrs:
+        state_pool.release(state_ptr)
+
+    state_pool.set_max_size(0)
+
+    assert state_pool.get_stats()["idle"] == 0
+    assert libuade.uade_cleanup_state.call_count == 2
+
+
+def test_acquire_fails_without_state(state_pool, libuade):
+    libuade.uade_new_state.side_effect = None
+    libuade.uade_new_state.return_value = None
+
+    with pytest.raises(RuntimeError):
+        state_pool.acquire()
+
+
+def test_close(state_pool, libuade):
+    state_pool.release(state_pool.acquire())
+    state_pool.acquire("leaked")
+
+    state_pool.close()
+
+    assert state_pool.get_stats()["idle"] == 0
+    assert state_pool.get_leaks() == ["leaked"]
@@ -0,0 +1,124 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from http_session import HttpSession
+from network_engine import CancellationToken, OperationCancelled
+from web_helper import HEADER_PROBE_SIZE, DownloadRejected, WebHelper
+
+MODULE_DATA = bytes(range(256)) * 1024
+
+
+def make_response(data, status_code=200, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {
+        "content-disposition": "attachment; filename=knallhatten.mod",
+        "content-length": str(len(data)),
+        **(headers or {}),
+    }
+    response.iter_content.side_effect = lambda chunk_size: (
+        data[i : i + chunk_size] for i in range(0, len(data), chunk_size)
+    )
+    response.__enter__.return_value = response
+    return response
+
+
+@pytest.fixture
+def web_helper():
+    return WebHelper(MagicMock(spec=HttpSession))
+
+
+def test_download_module_file_streams_to_disk(web_helper, tmp_path):
+    web_helper.session.get.return_value = make_response(MODULE_DATA)
+    progress = []
+
+    filename = web_helper.download_module_file(
+        1, str(tmp_path), progress_callback=lambda r, t: progress.append((r, t))
+    )
+
+    assert os.path.basename(filename) == "knallhatten.mod"
+    assert os.path.dirname(os.path.dirname(filename)) == str(tmp_path)
+    with open(filename, "rb") as f:
+        assert f.read() == MODULE_DATA
+    assert progress[-1] == (len(MODULE_DATA), len(MODULE_DATA))
+    assert not os.path.exists(tmp_path / "1.part")
+    assert web_helper.session.get.call_args.kwargs["stream"] is True
+
+
+def test_downloads_with_the_same_file_name_are_kept_apart(web_helper, tmp_path):
+    web_helper.session.get.side_effect = [
+        make_response(MODULE_DATA),
+        make_response(MODULE_DATA[:1000]),
+    ]
+
+    first = web_helper.download_module_file(1, str(tmp_path))
+    second = web_helper.download_module_file(2, str(tmp_path))
+
+    assert first != second
+    assert os.path.getsize(first) == len(MODULE_DATA)
+    assert os.path.getsize(second) == 1000
+
+
+def test_download_module_file_resumes_partial_download(web_helper, tmp_path):
+    (tmp_path / "1.part").write_bytes(MODULE_DATA[:1000])
+    web_helper.session.get.return_value = make_response(
+        MODULE_DATA[1000:], status_code=206
+    )
+
+    filename = web_helper.download_module_file(1, str(tmp_path))
+
+    assert web_helper.session.get.call_args.kwargs["headers"] == {"Range": "bytes=1000-"}
+    with open(filename, "rb") as f:
+        assert f.read() == MODULE_DATA
+
+
+def test_download_module_file_restarts_when_range_is_ignored(web_helper, tmp_path):
+    (tmp_path / "1.part").write_bytes(b"stale")
+    web_helper.session.get.return_value = make_response(MODULE_DATA)
+
+    filename = web_helper.download_module_file(1, str(tmp_path))
+
+    with open(filename, "rb") as f:
+        assert f.read() == MODULE_DATA
+
+
+def test_download_module_file_rejects_unsupported_header(web_helper, tmp_path):
+    response = make_response(MODULE_DATA)
+    web_helper.session.get.return_value = response
+    headers = []
+
+    def header_check(header, filename):
+        headers.append((len(header), filename))
+        return False
+
+    with pytest.raises(DownloadRejected):
+        web_helper.download_module_file(1, str(tmp_path), header_check=header_check)
+
+    assert headers == [(HEADER_PROBE_SIZE, "knallhatten.mod")]
+    assert not os.path.exists(tmp_path / "1.part")
+
+
+def test_download_module_file_probes_small_files(web_helper, tmp_path):
+    web_helper.session.get.return_value = make_response(MODULE_DATA[:100])
+    header_check = MagicMock(return_value=True)
+
+    web_helper.download_module_file(1, str(tmp_path), header_check=header_check)
+
+    header_check.assert_called_once_with(MODULE_DATA[:100], "knallhatten.mod")
+
+
+def test_download_module_file_keeps_partial_file_when_cancelled(web_helper, tmp_path):
+    web_helper.session.get.return_value = make_response(MODULE_DATA)
+    token = CancellationToken()
+
+    def progress_callback(received, total):
+        token.cancel()
+
+    with pytest.raises(OperationCancelled):
+        web_helper.download_module_file(
+            1, str(tmp_path), token, progress_callback=progress_callback
+        )
+
+    assert os.path.getsize(tmp_path / "1.part") > 0
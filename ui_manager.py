@@ -21,7 +21,13 @@ from PySide6.QtWidgets import (
 # import pyqtspinner
 
 from icons import Icons
-from playing_modes import ModArchiveSource, PlayingMode, PlayingSource, LocalSource
+from playing_modes import (
+    ModArchiveSource,
+    PlayingMode,
+    PlayingSource,
+    LocalSource,
+    ShuffleMode,
+)
 
 
 class UIManager(QObject):
@@ -152,6 +158,16 @@ class UIManager(QObject):
             lambda index: self.on_local_source_changed(LocalSource(index))
         )
 
+        self.shuffle_mode_label = QLabel("Shuffle")
+        self.shuffle_mode_combo_box = QComboBox()
+        self.shuffle_mode_combo_box.addItem("Off")
+        self.shuffle_mode_combo_box.addItem("Random")
+        self.shuffle_mode_combo_box.addItem("No Repeat")
+        self.shuffle_mode_combo_box.addItem("Least Played")
+        self.shuffle_mode_combo_box.currentIndexChanged.connect(
+            lambda index: self.on_shuffle_mode_changed(ShuffleMode(index))
+        )
+
     def setup_additional_buttons(self) -> None:
         self.settings_button = QPushButton("Settings")
         self.settings_button.clicked.connect(self.main_window.open_settings_dialog)
@@ -237,6 +253,8 @@ class UIManager(QObject):
         playing_layout.addLayout(artist_layout)
         playing_layout.addWidget(self.local_source_label)
         playing_layout.addWidget(self.local_source_combo_box)
+        playing_layout.addWidget(self.shuffle_mode_label)
+        playing_layout.addWidget(self.shuffle_mode_combo_box)
 
         self.playing_group_box = QGroupBox("Playing Settings")
         self.playing_group_box.setLayout(playing_layout)
@@ -316,6 +334,12 @@ class UIManager(QObject):
         self.filename_label.setText("Loading...")
         self.message_scroll_area.verticalScrollBar().setValue(0)
 
+    def update_download_progress(self, received: int, total: int) -> None:
+        if total:
+            self.filename_label.setText(f"Loading... {received * 100 // total}%")
+        else:
+            self.filename_label.setText(f"Loading... {received // 1024} KB")
+
     @Slot(str)
     def update_title_label(self, text: str) -> None:
         self.title_label.setText(text)
@@ -416,11 +440,15 @@ class UIManager(QObject):
             self.modarchive_source_combo_box.hide()
             self.local_source_label.show()
             self.local_source_combo_box.show()
+            self.shuffle_mode_label.show()
+            self.shuffle_mode_combo_box.show()
         else:
             self.modarchive_source_label.show()
             self.modarchive_source_combo_box.show()
             self.local_source_label.hide()
             self.local_source_combo_box.hide()
+            self.shuffle_mode_label.hide()
+            self.shuffle_mode_combo_box.hide()
 
     def on_modarchive_source_changed(self, source: ModArchiveSource) -> None:
         if self.playing_engine:
@@ -437,6 +465,10 @@ class UIManager(QObject):
         if self.playing_engine:
             self.playing_engine.set_local_source(source)
 
+    def on_shuffle_mode_changed(self, mode: ShuffleMode) -> None:
+        if self.playing_engine:
+            self.playing_engine.set_shuffle_mode(mode)
+
     def load_settings(self) -> None:
         self.update_source_input()
 
@@ -531,6 +563,12 @@ class UIManager(QObject):
         elif source == LocalSource.FOLDER:
             self.local_source_combo_box.setCurrentIndex(1)
 
+    def get_shuffle_mode(self) -> ShuffleMode:
+        return ShuffleMode(max(0, self.shuffle_mode_combo_box.currentIndex()))
+
+    def set_shuffle_mode(self, mode: ShuffleMode) -> None:
+        self.shuffle_mode_combo_box.setCurrentIndex(mode.value)
+
     def load_fonts_from_dir(self, directory: str) -> set[str]:
         families = set()
         for file_info in QDir(directory).entryInfoList(["*.ttf"]):
@@ -1,70 +1,226 @@
+import os
 import random
-from typing import Optional, List
-from bs4 import BeautifulSoup, Tag
+import tempfile
+from typing import Callable, Optional, List
 from loguru import logger
 import requests
+from cache.module_metadata_cache import ModuleMetadataCache
+from http_session import HttpSession, get_shared_session
+from modarchive_page import (
+    ModArchivePage,
+    get_module_format_from_url,
+    get_module_id_from_url,
+)
+from network_engine import CancellationToken
 from player_backends.Song import Song
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_ATTEMPTS = 3
+HEADER_PROBE_SIZE = 16 * 1024
+
+MODARCHIVE_URL = "https://modarchive.org"
+MODARCHIVE_API_URL = "https://api.modarchive.org"
+MSM_URL = "https://modsamplemaster.thegang.nu"
+
+
+class DownloadRejected(Exception):
+    pass
+
 
 class WebHelper:
+    def __init__(
+        self, session: Optional[HttpSession] = None, base_url: Optional[str] = None
+    ) -> None:
+        self.session = session if session else get_shared_session()
+
+        # A base URL override sends all requests to one host, like the offline stand-in server
+        if base_url:
+            base_url = base_url.rstrip("/")
+        self.base_url: str = base_url or MODARCHIVE_URL
+        self.api_url: str = base_url or MODARCHIVE_API_URL
+        self.msm_url: str = base_url or MSM_URL
+
+        # Formats and sizes seen on parsed pages are collected here, if set
+        self.metadata_cache: Optional[ModuleMetadataCache] = None
+
+    def record_page_metadata(self, page: ModArchivePage) -> None:
+        if self.metadata_cache:
+            self.metadata_cache.update_from_page(page.get_module_metadata())
+
+    def record_url_metadata(self, module_url: str) -> None:
+        module_id = get_module_id_from_url(module_url)
+
+        if self.metadata_cache and module_id is not None:
+            self.metadata_cache.update(module_id, get_module_format_from_url(module_url))
+
     def get_msm_url(self, song: Song) -> str:
-        return f"https://modsamplemaster.thegang.nu/module.php?sha1={song.sha1}"
+        return f"{self.msm_url}/module.php?sha1={song.sha1}"
 
-    def download_module_file(self, module_id: int, temp_dir: str) -> Optional[str]:
-        filename: Optional[str] = None
-        # module_link: Optional[str] = None
+    def download_module_file(
+        self,
+        module_id: int,
+        temp_dir: str,
+        token: Optional[CancellationToken] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        header_check: Optional[Callable[[bytes, str], bool]] = None,
+        throttle: Optional[Callable[[int], None]] = None,
+    ) -> Optional[str]:
+        url: str = f"{self.api_url}/downloads.php?moduleid={module_id}"
 
-        url: str = f"https://api.modarchive.org/downloads.php?moduleid={module_id}"
-        response: requests.Response = requests.get(url)
-        response.raise_for_status()
+        # Partial downloads are kept so an interrupted transfer can be resumed with a range request
+        part_file_path: str = os.path.join(temp_dir, f"{module_id}.part")
 
-        if response.status_code == 200:
-            module_filename: str = response.headers.get(
-                "content-disposition", f"{module_id}.mod"
-            ).split("filename=")[-1]
-            # module_link = f"https://modarchive.org/module.php?{module_id}"
+        try:
+            filename = self.stream_to_file(
+                url,
+                module_id,
+                part_file_path,
+                token,
+                progress_callback,
+                header_check,
+                throttle,
+            )
+        except DownloadRejected:
+            os.remove(part_file_path)
+            raise
 
-            temp_file_path: str = f"{temp_dir}/{module_filename}"
-            with open(temp_file_path, "wb") as temp_file:
-                temp_file.write(response.content)
-            filename = temp_file_path
+        if filename:
+            # A directory of its own, other modules may be downloaded under the same name
+            filename = os.path.join(tempfile.mkdtemp(dir=temp_dir), filename)
+            os.replace(part_file_path, filename)
             logger.info(f"Module downloaded to: {filename}")
+        return filename
+
+    def stream_to_file(
+        self,
+        url: str,
+        module_id: int,
+        part_file_path: str,
+        token: Optional[CancellationToken],
+        progress_callback: Optional[Callable[[int, int], None]],
+        header_check: Optional[Callable[[bytes, str], bool]],
+        throttle: Optional[Callable[[int], None]],
+    ) -> Optional[str]:
+        module_filename: str = f"{module_id}.mod"
+        header_checked = header_check is None
+
+        for attempt in range(DOWNLOAD_ATTEMPTS):
+            offset = (
+                os.path.getsize(part_file_path) if os.path.exists(part_file_path) else 0
+            )
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+            try:
+                with self.session.get(url, headers=headers, stream=True) as response:
+                    if response.status_code == 416:
+                        logger.warning(f"Cannot resume download of {module_id}, restarting")
+                        os.remove(part_file_path)
+                        continue
+
+                    response.raise_for_status()
+
+                    module_filename = self.get_download_filename(response, module_id)
+
+                    # Server ignored the range, start over
+                    if response.status_code != 206:
+                        offset = 0
+
+                    total = int(response.headers.get("content-length", 0))
+                    if total:
+                        total += offset
+                    received = offset
+
+                    with open(part_file_path, "ab" if offset else "wb") as part_file:
+                        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                            if token:
+                                token.raise_if_cancelled()
+
+                            part_file.write(chunk)
+                            received += len(chunk)
+
+                            if throttle:
+                                throttle(len(chunk))
+
+                            if progress_callback:
+                                progress_callback(received, total)
+
+                            if not header_checked and (
+                                received >= HEADER_PROBE_SIZE or received == total
+                            ):
+                                header_checked = True
+                                part_file.flush()
+                                self.check_header(
+                                    part_file_path, module_filename, header_check
+                                )
+                break
+            except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == DOWNLOAD_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"Download of {module_id} interrupted, resuming: {e}")
         else:
             logger.error(f"Failed to download module with ID: {module_id}")
-        return filename
+            return None
+
+        # Small files end before the probe threshold
+        if not header_checked:
+            self.check_header(part_file_path, module_filename, header_check)
+
+        return module_filename
+
+    def get_download_filename(self, response: requests.Response, module_id: int) -> str:
+        module_filename: str = response.headers.get(
+            "content-disposition", f"{module_id}.mod"
+        ).split("filename=")[-1]
+        return os.path.basename(module_filename.strip('"')) or f"{module_id}.mod"
+
+    def check_header(
+        self,
+        part_file_path: str,
+        module_filename: str,
+        header_check: Optional[Callable[[bytes, str], bool]],
+    ) -> None:
+        if header_check is None:
+            return
+
+        with open(part_file_path, "rb") as part_file:
+            header = part_file.read(HEADER_PROBE_SIZE)
+
+        if not header_check(header, module_filename):
+            raise DownloadRejected(
+                f'No player backend supports "{module_filename}", download aborted'
+            )
 
     def get_random_module_id(self) -> Optional[int]:
-        url: str = "https://modarchive.org/index.php?request=view_player&query=random"
-        response: requests.Response = requests.get(url)
+        url: str = f"{self.base_url}/index.php?request=view_player&query=random"
+        response: requests.Response = self.session.get(url)
         response.raise_for_status()
 
-        soup: BeautifulSoup = BeautifulSoup(response.content, "html.parser")
-        result = soup.find("a", href=True, string=True, class_="standard-link")
-        link_tag: Optional[Tag] = result if isinstance(result, Tag) else None
-        if link_tag:
-            href = link_tag["href"]
-            module_url: str = href[0] if isinstance(href, list) else href
-            if isinstance(module_url, list):
-                module_url = module_url[0]
-            if isinstance(module_url, str):
-                module_id: str = module_url.split("=")[-1].split("#")[0]
-                return int(module_id)
+        page = ModArchivePage.parse(response.content)
+        self.record_page_metadata(page)
+
+        module_url: Optional[str] = page.standard_link_with_text
+        if module_url:
+            self.record_url_metadata(module_url)
+            module_id: str = module_url.split("=")[-1].split("#")[0]
+            return int(module_id)
         return None
 
     def get_member_module_url_list(self, member_id: int) -> List[str]:
         url: str = (
-            f"https://modarchive.org/index.php?request=view_member_favourites_text&query={member_id}"
+            f"{self.base_url}/index.php?request=view_member_favourites_text&query={member_id}"
         )
 
-        response: requests.Response = requests.get(url)
+        response: requests.Response = self.session.get(url)
         response.raise_for_status()
 
-        soup: BeautifulSoup = BeautifulSoup(response.content, "html.parser")
-        result = soup.find("textarea")
+        page = ModArchivePage.parse(response.content)
 
-        if result:
-            favorite_modules: str = result.text
-            return favorite_modules.split("\n")
+        if page.textarea_text is not None:
+            module_urls = page.textarea_text.split("\n")
+
+            for module_url in module_urls:
+                self.record_url_metadata(module_url)
+            return module_urls
         return []
 
     def get_member_module_id_list(self, member_id: int) -> List[int]:
@@ -89,69 +245,82 @@ class WebHelper:
 
     def get_random_artist_module_id(self, artist: str) -> Optional[int]:
         url: str = (
-            f"https://modarchive.org/index.php?request=search&search_type=guessed_artist&query={artist}"
+            f"{self.base_url}/index.php?request=search&search_type=guessed_artist&query={artist}"
         )
 
-        response: requests.Response = requests.get(url)
+        response: requests.Response = self.session.get(url)
         response.raise_for_status()
 
-        soup: BeautifulSoup = BeautifulSoup(response.content, "html.parser")
+        page = ModArchivePage.parse(response.content)
 
         # Get pagination number
-        pagination = soup.find("select", class_="pagination")
-        if pagination:
-            if isinstance(pagination, Tag):
-                options = pagination.find_all("option")
-                if options:
-                    last_page = int(options[-1].text)
+        if page.has_pagination:
+            if page.pagination_options:
+                last_page = page.get_last_page()
 
-                    # Get a random page number
-                    page_number = random.randint(1, last_page)
+                # Get a random page number
+                page_number = random.randint(1, last_page)
 
-                    # Get the page with the random number
-                    url = f"{url}&page={page_number}#mods"
+                # Get the page with the random number
+                url = f"{url}&page={page_number}#mods"
 
-                    response = requests.get(url)
-                    response.raise_for_status()
+                response = self.session.get(url)
+                response.raise_for_status()
+
+                page = ModArchivePage.parse(response.content)
+                self.record_page_metadata(page)
 
-                    soup = BeautifulSoup(response.content, "html.parser")
-
-                    # Get all a tags with title "Download"
-                    download_links = soup.find_all("a", title="Download")
-                    if download_links:
-                        download_link = random.choice(download_links)
-                        module_id: str = (
-                            download_link["href"].split("=")[-1].split("#")[0]
-                        )
-                        return int(module_id)
-                    else:
-                        logger.error("No download links found on the page")
+                # Get all a tags with title "Download"
+                module_ids = page.get_download_link_ids()
+                if module_ids:
+                    return random.choice(module_ids)
                 else:
-                    logger.error("No pagination options found")
+                    logger.error("No download links found on the page")
             else:
-                logger.error("No pagination tag found")
+                logger.error("No pagination options found")
         else:
             logger.error("No pagination found")
         return None
 
+    def get_artist_module_id_list(self, artist: str) -> List[int]:
+        url: str = (
+            f"{self.base_url}/index.php?request=search&search_type=guessed_artist&query={artist}"
+        )
+
+        response: requests.Response = self.session.get(url)
+        response.raise_for_status()
+
+        page = ModArchivePage.parse(response.content)
+        self.record_page_metadata(page)
+
+        last_page = page.get_last_page()
+        ids: List[int] = page.get_download_link_ids()
+
+        for page_number in range(2, last_page + 1):
+            response = self.session.get(f"{url}&page={page_number}#mods")
+            response.raise_for_status()
+
+            page = ModArchivePage.parse(response.content)
+            self.record_page_metadata(page)
+            ids.extend(page.get_download_link_ids())
+
+        logger.info(f'Found {len(ids)} modules by "{artist}" on {last_page} pages')
+        return ids
+
     def lookup_modarchive_mod_url(self, song: Song) -> str:
+        # Modules played from The Mod Archive do not need a search
+        if song.modarchive_id:
+            return f"{self.base_url}/module.php?{song.modarchive_id}"
+
         logger.info(f"Looking up ModArchive URL for song: {song}")
         def search_modarchive(query: str, search_type: str) -> Optional[str]:
-            url = f"https://modarchive.org/index.php?request=search&query={query}&submit=Find&search_type={search_type}"
-            response = requests.get(url)
+            url = f"{self.base_url}/index.php?request=search&query={query}&submit=Find&search_type={search_type}"
+            response = self.session.get(url)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                page = ModArchivePage.parse(response.content)
                 # Check if there are search results
-                search_results_header = soup.find(
-                    "h1", class_="site-wide-page-head-title", string="Search Results"
-                )
-                if search_results_header:
-                    result = soup.find("a", class_="standard-link", href=True)
-                    if result and isinstance(result, Tag):
-                        href = result["href"]
-                        if isinstance(href, list):
-                            href = href[0]
-                        return "https://modarchive.org/" + href
+                if page.has_search_results and page.standard_link:
+                    return f"{self.base_url}/{page.standard_link}"
             return None
 
         filename = song.filename.split("/")[-1]
@@ -167,8 +336,11 @@ class WebHelper:
         if song:
             url = self.get_msm_url(song)
         if url:
-            # Check if the link returns a 404
-            response = requests.get(url)
+            # Check if the link returns a 404 without downloading the page
+            response = self.session.head(url, allow_redirects=True)
+            if response.status_code in (405, 501):
+                with self.session.get(url, stream=True) as response:
+                    pass
             if response.status_code == 200:
                 return url
         return ""